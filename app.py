@@ -1,10 +1,16 @@
+import os
+import shutil
+import tempfile
+
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 import requests
-import io
 
 from modules import crud
+from modules.events import format_tanggal
+from modules.export import EXPORT_FORMATS, export_to_file
+from modules.statistik import cached_statistics, filter_fingerprint
 from modules.utils import safe_float, parse_date_safe, to_db_date_str
 from modules.map_visualization import create_map
 from modules.wilayah import (
@@ -14,8 +20,20 @@ from modules.wilayah import (
     get_kecamatan
 )
 from login import login, logout
-from pdf import generate_event_pdf, generate_multiple_events_pdf
-from modules.infografis.service import generate_infografis_rob
+from pdf import (
+    generate_event_pdf,
+    generate_events_zip,
+    generate_multiple_events_pdf
+)
+from modules.infografis.service import (
+    generate_comparison_rob,
+    generate_infografis_rob,
+    generate_timelapse_rob,
+    month_days,
+    previous_month
+)
+from modules.infografis.timelapse import TIMELAPSE_FORMATS
+from modules.infografis.renditions import RENDITIONS
 
 
 # ======================== KONFIGURASI ========================
@@ -71,6 +89,10 @@ role = st.session_state.role
 st.sidebar.markdown(f"👤 Login sebagai: **{role.upper()}**")
 logout()
 
+# ======================== MIGRASI AGREGAT ========================
+# Sekali per proses (flag internal): tabel agregat, indeks grup, backfill
+crud.ensure_aggregate_tables()
+
 # ======================== DATA WILAYAH ========================
 wil_df = load_wilayah_csv()
 
@@ -100,17 +122,54 @@ kab_filter = st.sidebar.selectbox(
 )
 
 # ======================== HELPER ========================
-def load_dashboard_data():
-    return crud.fetch_filtered_data(
+def dashboard_filters():
+    return dict(
         start_date=to_db_date_str(start_date) if start_date else None,
         end_date=to_db_date_str(end_date) if end_date else None,
         provinsi=prov_filter or None,
         kabupaten=kab_filter or None
     )
 
+def load_dashboard_data():
+    return crud.fetch_filtered_frame(**dashboard_filters())
+
 def fmt_waktu(val):
     return "-" if not val else str(val)
 
+# Hasil "Siapkan" (export / ZIP) disimpan sebagai PATH file sementara di
+# session_state, bukan bytes → memori sesi tidak tumbuh dengan ukuran
+# hasil. Satu file per slot; disiapkan ulang → file lama dihapus.
+def store_prepared(slot, file_obj, **info):
+    drop_prepared(slot)
+    with file_obj, tempfile.NamedTemporaryFile(delete=False) as tmp:
+        shutil.copyfileobj(file_obj, tmp)
+    st.session_state[slot] = dict(info, path=tmp.name)
+
+def drop_prepared(slot):
+    old = st.session_state.pop(slot, None)
+    if old:
+        try:
+            os.remove(old["path"])
+        except OSError:
+            pass
+
+def get_prepared(slot, key):
+    """Info hasil siap-unduh jika masih cocok dengan `key` (filter dll.)"""
+    prepared = st.session_state.get(slot)
+    if not prepared or prepared["key"] != key:
+        return None
+    if not os.path.exists(prepared["path"]):
+        drop_prepared(slot)
+        return None
+    return prepared
+
+def prepared_download_button(prepared, label, file_name, mime, key):
+    # File dibuka saat tombol digambar. Streamlit 1.38 belum mendukung
+    # data lazy: isi file dibaca ke media store selama tombol tampil,
+    # jadi puncak memori per render tetap ~ukuran file.
+    with open(prepared["path"], "rb") as f:
+        st.download_button(label, f, file_name, mime, key=key)
+
 # ======================== NOTIFIKASI ========================
 if "notif" in st.session_state:
     if st.session_state["notif"] == "tambah":
@@ -128,22 +187,125 @@ if menu == "Dashboard":
 
     st.subheader("📍 Peta Kejadian Banjir Rob")
 
-    data = load_dashboard_data()
-    if not data:
+    df = load_dashboard_data()
+    if df.empty:
         st.info("Belum ada data.")
     else:
-        create_map(data, prov_filter, kab_filter)
+        create_map(df, prov_filter, kab_filter)
 
-        df = pd.DataFrame(data)
         st.dataframe(df, use_container_width=True)
 
-        st.download_button(
-            "📥 Download CSV",
-            df.to_csv(index=False).encode(),
-            "data_banjir_rob.csv",
-            "text/csv",
-            key="csv_dash"
+        # ===== EXPORT (ON-DEMAND, STREAMING DARI DATABASE) =====
+        c_fmt, c_btn = st.columns([2, 1])
+        with c_fmt:
+            fmt = st.selectbox(
+                "Format Export",
+                list(EXPORT_FORMATS),
+                format_func=lambda f: EXPORT_FORMATS[f]["label"],
+                key="export_fmt"
+            )
+            with_height = st.checkbox(
+                "Tambah kolom Ketinggian_cm (angka dari teks Ketinggian)",
+                key="export_height"
+            )
+        with c_btn:
+            st.write("")
+            siapkan = st.button("📦 Siapkan File", key="export_prepare")
+
+        # Hasil disimpan di session_state → tombol download tetap ada
+        # setelah rerun (klik download memicu rerun tanpa klik "Siapkan")
+        export_key = (
+            fmt, with_height, tuple(sorted(dashboard_filters().items()))
+        )
+        if siapkan:
+            try:
+                with st.spinner("Menyiapkan file export..."):
+                    f_export, n_export = export_to_file(
+                        fmt, with_height=with_height, **dashboard_filters()
+                    )
+                store_prepared(
+                    "export_file", f_export,
+                    key=export_key, rows=n_export, fmt=fmt
+                )
+            except RuntimeError as e:
+                drop_prepared("export_file")
+                st.error(f"❌ {e}")
+
+        prepared = get_prepared("export_file", export_key)
+        if prepared:
+            info = EXPORT_FORMATS[prepared["fmt"]]
+            prepared_download_button(
+                prepared,
+                f"📥 Download {info['label']} ({prepared['rows']:,} baris)",
+                f"data_banjir_rob.{info['ext']}",
+                info["mime"],
+                key="csv_dash"
+            )
+
+        # ===== BUNDLE PDF PER KEJADIAN (ZIP) =====
+        # Sama seperti export: hasil + laporan di session_state → tombol
+        # download bertahan setelah rerun
+        zip_key = (
+            tuple(sorted(dashboard_filters().items())), crud.data_version()
         )
+        if st.button("🗂️ Siapkan ZIP PDF per Kejadian", key="pdf_zip_prepare"):
+            with st.spinner(f"Membuat {len(df):,} PDF..."):
+                f_zip, laporan = generate_events_zip(
+                    df.to_dict(orient="records")
+                )
+            store_prepared("pdf_zip", f_zip, key=zip_key, report=laporan)
+
+        prepared = get_prepared("pdf_zip", zip_key)
+        if prepared:
+            laporan = prepared["report"]
+            st.caption(
+                f"📄 {laporan['ok']:,}/{laporan['total']:,} PDF · "
+                f"{laporan['elapsed']:,.1f} s · "
+                f"{laporan['pdf_per_second']:,.1f} PDF/detik"
+            )
+            for gagal in laporan["failed"]:
+                st.warning(f"⚠️ {gagal['file_name']}: {gagal['error']}")
+
+            prepared_download_button(
+                prepared,
+                "📥 Download ZIP PDF",
+                "laporan_kejadian_rob.zip",
+                "application/zip",
+                key="pdf_zip_dash"
+            )
+
+        # ===== STATISTIK =====
+        with st.expander("📊 Statistik Kejadian", expanded=False):
+            stats = cached_statistics(
+                filter_fingerprint(
+                    dashboard_filters(), df, crud.data_version()
+                ),
+                df
+            )
+
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("Total Kejadian", f"{stats['total']:,}")
+            m2.metric("Hari Terdampak", f"{stats['hari_terdampak']:,}")
+            m3.metric("Kecamatan Terdampak", f"{stats['kecamatan_terdampak']:,}")
+            m4.metric(
+                "Ketinggian Maks",
+                "-" if stats["tinggi_max"] is None
+                else f"{stats['tinggi_max']:,.0f} cm"
+            )
+
+            st.markdown("**Tren Kejadian Harian**")
+            st.line_chart(stats["tren"])
+
+            s1, s2 = st.columns(2)
+            with s1:
+                st.markdown("**Kejadian per Bulan**")
+                st.bar_chart(stats["per_bulan"])
+            with s2:
+                st.markdown("**Top 10 Kabupaten Terdampak**")
+                st.bar_chart(stats["top_kabupaten"])
+
+            st.markdown("**Distribusi Ketinggian Genangan (cm)**")
+            st.bar_chart(stats["distribusi_tinggi"])
 
         # ===== SOROTAN TERBARU =====
         st.subheader("📰 Sorotan Terbaru")
@@ -154,7 +316,7 @@ if menu == "Dashboard":
                     f"""
                     **{row['Lokasi']}**  
                     🏙 {row['Kabupaten']}, {row['Provinsi']}  
-                    📅 {row['Tanggal']} ⏰ {fmt_waktu(row.get("Waktu"))}
+                    📅 {format_tanggal(row['Tanggal'])} ⏰ {fmt_waktu(row.get("Waktu"))}
                     """
                 )
 
@@ -184,9 +346,8 @@ if menu == "Dashboard":
         )
 
         if tanggal_pilih:
-            df["Tanggal_norm"] = pd.to_datetime(
-                df["Tanggal"], errors="coerce"
-            ).dt.date
+            # Tanggal sudah datetime64 (frame kejadian bertipe)
+            df["Tanggal_norm"] = df["Tanggal"].dt.date
 
             tgl = pd.to_datetime(tanggal_pilih).date()
             df_tgl = df[df["Tanggal_norm"] == tgl]
@@ -205,7 +366,7 @@ if menu == "Dashboard":
                 st.download_button(
                     "📄 Download PDF Kejadian",
                     generate_event_pdf(rec.to_dict()),
-                    f"laporan_{rec['Tanggal']}_{rec['Lokasi']}.pdf",
+                    f"laporan_{format_tanggal(rec['Tanggal'])}_{rec['Lokasi']}.pdf",
                     "application/pdf",
                     key="dash_pdf_single"
                 )
@@ -252,7 +413,7 @@ elif menu == "Tambah Data":
         gambar = st.text_input("Link Gambar")
 
         if st.form_submit_button("💾 Simpan"):
-            crud.insert_data(
+            tersimpan = crud.insert_data(
                 tanggal=to_db_date_str(tgl),
                 waktu=waktu,
                 lokasi=lokasi,
@@ -266,8 +427,9 @@ elif menu == "Tambah Data":
                 sumber=sumber,
                 gambar=gambar
             )
-            st.session_state["notif"] = "tambah"
-            st.rerun()
+            if tersimpan:
+                st.session_state["notif"] = "tambah"
+                st.rerun()
 
 # ======================================================
 # ======================== KELOLA DATA =================
@@ -276,12 +438,12 @@ elif menu == "Kelola Data":
 
     st.subheader("🛠 Kelola Data Banjir Rob")
 
-    data = crud.fetch_all_data()
-    if not data:
+    # Nilai mentah (typed=False) → form edit tidak kehilangan presisi
+    df = crud.fetch_all_frame(typed=False)
+    if df.empty:
         st.info("Belum ada data.")
         st.stop()
 
-    df = pd.DataFrame(data)
     st.dataframe(df, use_container_width=True)
 
     no = st.selectbox("Pilih No Data", df["No"], key="edit_no")
@@ -361,7 +523,7 @@ elif menu == "Kelola Data":
         gambar_u = st.text_input("Gambar", rec.get("Gambar", ""))
 
         if st.form_submit_button("💾 Simpan Perubahan"):
-            crud.update_data(
+            tersimpan = crud.update_data(
                 no_id=no,
                 tanggal=to_db_date_str(tgl_u),
                 waktu=waktu_u,
@@ -376,13 +538,14 @@ elif menu == "Kelola Data":
                 sumber=sumber_u,
                 gambar=gambar_u
             )
-            st.session_state["notif"] = "update"
-            st.rerun()
+            if tersimpan:
+                st.session_state["notif"] = "update"
+                st.rerun()
 
     if st.button("🗑 Hapus Data"):
-        crud.delete_data(no)
-        st.session_state["notif"] = "hapus"
-        st.rerun()
+        if crud.delete_data(no):
+            st.session_state["notif"] = "hapus"
+            st.rerun()
 
 
 # ======================================================
@@ -401,57 +564,226 @@ elif menu == "Infografis Rob":
         horizontal=True
     )
 
+    choropleth = st.checkbox(
+        "Warna sesuai frekuensi kejadian (choropleth)",
+        key="info_choropleth",
+        disabled=(mode != "Rekap Bulanan")
+    ) and mode == "Rekap Bulanan"
+
     teks = st.text_input(
         "Teks Periode (judul pada gambar)",
         datetime.now().strftime("%d %B %Y")
     )
 
+    format_output = st.selectbox(
+        "Format Output",
+        ["png", "png_palette", "webp", "jpeg", "svg", "pdf"],
+        format_func=lambda p: {
+            "png": "PNG (kompresi cepat)",
+            "png_palette": "PNG 256 warna (ringan)",
+            "webp": "WebP (WhatsApp / web)",
+            "jpeg": "JPEG (WhatsApp / web)",
+            "svg": "SVG (vektor, tajam di semua ukuran)",
+            "pdf": "PDF (vektor, siap cetak)"
+        }[p],
+        key="info_format"
+    )
+
+    rendisi = st.multiselect(
+        "Rendisi Tambahan (opsional)",
+        list(RENDITIONS),
+        format_func=lambda r: RENDITIONS[r]["label"],
+        key="info_renditions",
+        disabled=format_output in ("svg", "pdf")
+    )
+
     if st.button("📊 Generate Infografis"):
 
-        data = crud.fetch_filtered_data(
-            start_date=to_db_date_str(tgl_awal),
-            end_date=to_db_date_str(tgl_akhir)
-        )
+        # ✅ Kecamatan terdampak langsung dari tabel agregat harian
+        #    (tanpa menarik seluruh baris kejadian)
+        kecamatan_counts = None
+        if choropleth:
+            # ✅ Jumlah kejadian per kecamatan: satu query GROUP BY
+            kecamatan_counts = crud.fetch_kecamatan_counts(
+                start_date=to_db_date_str(tgl_awal),
+                end_date=to_db_date_str(tgl_akhir)
+            )
+            kecamatan_list = list(kecamatan_counts)
+        else:
+            kecamatan_list = crud.fetch_affected_kecamatan(
+                start_date=to_db_date_str(tgl_awal),
+                end_date=to_db_date_str(tgl_akhir)
+            )
 
-        if not data:
+        if not kecamatan_list:
             st.warning("⚠️ Tidak ada data pada periode tersebut")
             st.stop()
 
-        df = pd.DataFrame(data)
-
-        # ✅ UPDATED: kirim list kecamatan saja (service yang urus segalanya)
-        kecamatan_list = (
-            df["Kecamatan"]
-            .dropna()
-            .astype(str)
-            .unique()
-            .tolist()
-        )
-
         hasil = generate_infografis_rob(
             affected_areas=kecamatan_list,              # ✅ PARAMETER RESMI
             tanggal=teks,
-            rekap_bul=(mode == "Rekap Bulanan")          # ✅ SWITCH ENGINE
+            rekap_bul=(mode == "Rekap Bulanan"),         # ✅ SWITCH ENGINE
+            output_profile=format_output,
+            renditions=[] if format_output in ("svg", "pdf") else rendisi,
+            affected_counts=kecamatan_counts
         )
 
         if hasil["success"]:
             img = hasil["image"]
 
-            st.image(
-                img,
-                caption=f"Infografis Rob ({hasil['kategori'].upper()})",
-                use_column_width=True
-            )
+            if img is not None:
+                st.image(
+                    img,
+                    caption=f"Infografis Rob ({hasil['kategori'].upper()})",
+                    use_column_width=True
+                )
+            else:
+                st.info("ℹ️ Format vektor: pratinjau tidak ditampilkan, silakan download file.")
 
-            buf = io.BytesIO()
-            img.save(buf, format="PNG")
-            buf.seek(0)
+            st.caption(
+                f"📦 {hasil['size_bytes'] / 1024:,.0f} KB · "
+                f"encode {hasil['encode_time'] * 1000:,.0f} ms"
+            )
 
+            # ✅ bytes hasil encode service (tanpa encode ulang)
             st.download_button(
                 "⬇️ Download Infografis",
-                buf,
+                hasil["data"],
                 hasil["file_name"],
-                "image/png"
+                hasil["mime"]
             )
+
+            # ===== LEGENDA LANJUTAN (OVERFLOW) =====
+            for i, page in enumerate(hasil.get("legend_pages", []), start=2):
+                if page["image"] is not None:
+                    st.image(
+                        page["image"],
+                        caption=f"Legenda lanjutan ({i})",
+                        use_column_width=True
+                    )
+                st.download_button(
+                    f"⬇️ Download Legenda {i}",
+                    page["data"],
+                    page["file_name"],
+                    hasil["mime"],
+                    key=f"info_legend_{i}"
+                )
+            # ===== RENDISI TAMBAHAN =====
+            for rend in hasil.get("renditions", []):
+                st.download_button(
+                    f"⬇️ {RENDITIONS[rend['name']]['label']} · "
+                    f"{rend['width']}×{rend['height']} · "
+                    f"{rend['size_bytes'] / 1024:,.0f} KB",
+                    rend["data"],
+                    rend["file_name"],
+                    rend["mime"],
+                    key=f"info_rendition_{rend['name']}"
+                )
         else:
             st.error(hasil["error"])
+
+    # ===== TIME-LAPSE BULANAN =====
+    with st.expander("🎞️ Time-lapse Rekap Bulanan"):
+        bulan_tl = st.text_input(
+            "Bulan (YYYY-MM)",
+            datetime.now().strftime("%Y-%m"),
+            key="tl_bulan"
+        )
+        format_tl = st.selectbox(
+            "Format Animasi",
+            list(TIMELAPSE_FORMATS),
+            format_func=lambda f: TIMELAPSE_FORMATS[f]["label"],
+            key="tl_format"
+        )
+
+        if st.button("🎞️ Generate Time-lapse"):
+            try:
+                hari = month_days(bulan_tl)
+            except (ValueError, TypeError):
+                st.error("❌ Format bulan harus YYYY-MM")
+                st.stop()
+
+            # ✅ Satu query agregat harian untuk sebulan penuh
+            rows = crud.fetch_daily_summary(
+                start_date=hari[0].strftime("%Y-%m-%d"),
+                end_date=hari[-1].strftime("%Y-%m-%d")
+            )
+
+            with st.spinner("Merender frame..."):
+                hasil_tl = generate_timelapse_rob(
+                    rows, bulan_tl, output_format=format_tl
+                )
+
+            if hasil_tl["success"]:
+                if format_tl == "mp4":
+                    st.video(hasil_tl["data"])
+                else:
+                    st.image(hasil_tl["data"], use_column_width=True)
+
+                st.caption(
+                    f"🎞️ {hasil_tl['frames']} frame · "
+                    f"📦 {hasil_tl['size_bytes'] / 1024:,.0f} KB · "
+                    f"render {hasil_tl['render_time']:,.1f} s · "
+                    f"encode {hasil_tl['encode_time']:,.1f} s"
+                )
+                st.download_button(
+                    "⬇️ Download Time-lapse",
+                    hasil_tl["data"],
+                    hasil_tl["file_name"],
+                    hasil_tl["mime"],
+                    key="tl_download"
+                )
+            else:
+                st.error(hasil_tl["error"])
+
+    # ===== PERBANDINGAN PERIODE =====
+    with st.expander("⚖️ Perbandingan Bulan Ini vs Bulan Lalu"):
+        bulan_cmp = st.text_input(
+            "Bulan (YYYY-MM)",
+            datetime.now().strftime("%Y-%m"),
+            key="cmp_bulan"
+        )
+
+        if st.button("⚖️ Generate Perbandingan"):
+            try:
+                hari = month_days(bulan_cmp)
+                awal_lalu = month_days(previous_month(bulan_cmp))[0]
+            except (ValueError, TypeError):
+                st.error("❌ Format bulan harus YYYY-MM")
+                st.stop()
+
+            # ✅ Kedua periode dalam satu query agregat
+            rows = crud.fetch_period_comparison(
+                awal_lalu.strftime("%Y-%m-%d"),
+                hari[0].strftime("%Y-%m-%d"),
+                hari[-1].strftime("%Y-%m-%d")
+            )
+
+            hasil_cmp = generate_comparison_rob(rows, bulan_cmp)
+
+            if hasil_cmp["success"]:
+                st.image(hasil_cmp["image"], use_column_width=True)
+
+                ringkas = hasil_cmp["summary"]
+                c1, c2, c3 = st.columns(3)
+                c1.metric("Baru", len(ringkas["baru"]))
+                c2.metric("Berlanjut", len(ringkas["berlanjut"]))
+                c3.metric("Berakhir", len(ringkas["berakhir"]))
+
+                st.download_button(
+                    "⬇️ Download Perbandingan",
+                    hasil_cmp["data"],
+                    hasil_cmp["file_name"],
+                    hasil_cmp["mime"],
+                    key="cmp_download"
+                )
+                for i, page in enumerate(hasil_cmp["legend_pages"], start=2):
+                    st.download_button(
+                        f"⬇️ Download Legenda {i}",
+                        page["data"],
+                        page["file_name"],
+                        hasil_cmp["mime"],
+                        key=f"cmp_legend_{i}"
+                    )
+            else:
+                st.error(hasil_cmp["error"])
@@ -0,0 +1,159 @@
+"""
+Benchmark jalur data CRUD & Dashboard terhadap SQLite shim lokal.
+
+Mengukur per kombinasi filter:
+- fetch_filtered_data (latency query + materialisasi baris)
+- konstruksi DataFrame
+- fetch_filtered_frame (streaming fetchmany → DataFrame kolomnar)
+- build_map (folium, tanpa render Streamlit)
+- export CSV (seperti tombol "📥 Download CSV")
+
+Contoh:
+    python benchmarks/bench_crud.py --rows 10000 100000
+    python benchmarks/bench_crud.py --rows 1000000 --indexes --map-limit 5000
+    python benchmarks/bench_crud.py --output hasil.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pandas as pd  # noqa: E402
+
+from benchmarks.sqlite_shim import (  # noqa: E402
+    connection_factory,
+    seed_database,
+)
+
+DEFAULT_ROWS = (10_000, 100_000)
+
+
+def _timeit(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), result
+
+
+def filter_combinations(db_path):
+    """Kombinasi filter representatif, nilai diambil dari data seed"""
+    import sqlite3
+
+    conn = sqlite3.connect(str(db_path))
+    prov, kab = conn.execute(
+        "SELECT `Provinsi`, `Kabupaten` FROM `rob` "
+        "GROUP BY `Provinsi`, `Kabupaten` ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()
+    conn.close()
+
+    return {
+        "tanpa_filter": {},
+        "rentang_1_bulan": {"start_date": "2023-06-01", "end_date": "2023-06-30"},
+        "rentang_1_tahun": {"start_date": "2023-01-01", "end_date": "2023-12-31"},
+        "provinsi": {"provinsi": prov},
+        "kabupaten": {"provinsi": prov, "kabupaten": kab},
+        "provinsi_1_bulan": {
+            "start_date": "2023-06-01",
+            "end_date": "2023-06-30",
+            "provinsi": prov,
+        },
+    }
+
+
+def run(rows, repeat, indexes, map_limit, workdir):
+    from modules import crud
+    from modules.map_visualization import build_map
+
+    db_path = Path(workdir) / f"rob_{rows}.sqlite"
+
+    t0 = time.perf_counter()
+    seed_database(db_path, rows, with_indexes=indexes)
+    print(f"\n== {rows:,} baris (seed {time.perf_counter() - t0:,.1f}s"
+          f"{', dengan index' if indexes else ''}) ==")
+
+    crud.set_connection_factory(connection_factory(db_path))
+    results = []
+
+    try:
+        for name, filters in filter_combinations(db_path).items():
+            t_fetch, data = _timeit(
+                lambda: crud.fetch_filtered_data(**filters), repeat
+            )
+            t_df, df = _timeit(lambda: pd.DataFrame(data), repeat)
+            t_frame, _ = _timeit(
+                lambda: crud.fetch_filtered_frame(**filters), repeat
+            )
+
+            sample = data[:map_limit] if map_limit else data
+            t_map, _ = _timeit(lambda: build_map(sample), 1)
+
+            t_csv, csv = _timeit(
+                lambda: df.to_csv(index=False).encode(), repeat
+            )
+
+            res = {
+                "rows": rows,
+                "filter": name,
+                "result_rows": len(data),
+                "fetch_ms": t_fetch * 1000,
+                "dataframe_ms": t_df * 1000,
+                "fetch_frame_ms": t_frame * 1000,
+                "map_rows": len(sample),
+                "map_ms": t_map * 1000,
+                "csv_ms": t_csv * 1000,
+                "csv_bytes": len(csv),
+            }
+            results.append(res)
+
+            print(
+                f"{name:<18} n={res['result_rows']:>8,}  "
+                f"fetch={res['fetch_ms']:>8,.1f}ms  "
+                f"df={res['dataframe_ms']:>7,.1f}ms  "
+                f"frame={res['fetch_frame_ms']:>8,.1f}ms  "
+                f"map({res['map_rows']:,})={res['map_ms']:>8,.1f}ms  "
+                f"csv={res['csv_ms']:>7,.1f}ms"
+            )
+    finally:
+        crud.set_connection_factory(None)
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", nargs="+", type=int,
+                        default=list(DEFAULT_ROWS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--indexes", action="store_true",
+                        help="Buat index Tanggal/Provinsi/Kabupaten")
+    parser.add_argument("--map-limit", type=int, default=20_000,
+                        help="Batas baris untuk build_map (0 = semua)")
+    parser.add_argument("--output", type=Path,
+                        help="Simpan hasil ke file JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.rows:
+            results += run(
+                rows, args.repeat, args.indexes, args.map_limit, workdir
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
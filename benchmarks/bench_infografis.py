@@ -0,0 +1,260 @@
+"""
+Benchmark pipeline render infografis rob (harian & bulanan).
+
+Setiap kasus (engine × jumlah kecamatan) dijalankan di proses terpisah
+agar peak RSS tidak saling tercampur. Kecamatan diambil acak (seed tetap)
+dari GDB bawaan → hasil reprodusibel.
+
+Contoh:
+    python benchmarks/bench_infografis.py
+    python benchmarks/bench_infografis.py --sizes 1 10 --repeat 5
+    python benchmarks/bench_infografis.py --backends matplotlib raster
+    python benchmarks/bench_infografis.py --save-baseline
+    python benchmarks/bench_infografis.py --compare        # exit 1 jika regresi
+
+Baseline (benchmarks/baselines/infografis.json) wajib di-commit dan dibuat
+ulang dengan --save-baseline di mesin CI yang sama setiap kali perubahan
+performa disengaja. Butuh GDB asli (git lfs pull), bukan pointer LFS.
+Kasus yang tidak ada di baseline dianggap gagal, bukan dilewati.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+BASELINE_FILE = BASE_DIR / "benchmarks" / "baselines" / "infografis.json"
+
+ENGINES = ("harian", "bulanan")
+BACKENDS = ("matplotlib", "raster")
+DEFAULT_SIZES = (1, 10, 100, 1000)
+SEED = 20240101
+
+# Tahap yang lebih cepat dari ini tidak dicek regresinya (noise)
+MIN_STAGE_SECONDS = 0.005
+
+
+# ============================================================
+# DATA SINTETIS
+# ============================================================
+
+def sample_areas(size, seed=SEED):
+    """Ambil `size` nama kecamatan unik dari GDB bawaan"""
+    import geopandas as gpd
+    from modules.infografis.warningtools import GDB_KECAMATAN
+
+    names = sorted(
+        gpd.read_file(GDB_KECAMATAN, ignore_geometry=True)["NAMOBJ"]
+        .dropna()
+        .astype(str)
+        .unique()
+    )
+    rng = random.Random(seed)
+    return rng.sample(names, min(size, len(names)))
+
+
+# ============================================================
+# WORKER (PROSES TERPISAH)
+# ============================================================
+
+def _peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: byte
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _render(engine, areas, recorder, backend=None):
+    from modules.infografis.warningtools import (
+        plot_rob_affected_areas as plot_harian,
+    )
+    from modules.infografis.warningtoolsmonthly import (
+        plot_rob_affected_areas as plot_bulanan,
+    )
+
+    if engine == "harian":
+        return plot_harian(
+            affected_areas=areas,
+            tanggal_rekap="BENCHMARK",
+            recorder=recorder,
+            backend=backend,
+        )
+    return plot_bulanan(
+        affected_areas=areas,
+        tanggal_rekap="BENCHMARK",
+        recorder=recorder,
+        backend=backend,
+    )
+
+
+def run_case(engine, size, repeat, backend=None):
+    """Jalankan satu kasus; return statistik per tahap + peak RSS"""
+    from modules.infografis.profiling import StageRecorder
+
+    areas = sample_areas(size)
+
+    # Warmup: isi cache asset (background, font) seperti di produksi
+    _render(engine, areas[:1], None, backend)
+
+    runs = []
+    for _ in range(repeat):
+        rec = StageRecorder()
+        with rec.stage("total"):
+            _render(engine, areas, rec, backend)
+        runs.append(rec.totals())
+
+    stages = {}
+    for name in runs[0]:
+        values = [r.get(name, 0.0) for r in runs]
+        stages[name] = {
+            "median": statistics.median(values),
+            "min": min(values),
+        }
+
+    return {
+        "engine": engine,
+        "backend": backend or "default",
+        "size": len(areas),
+        "repeat": repeat,
+        "stages": stages,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def run_suite(engines, sizes, repeat, backends=(None,)):
+    results = []
+    ctx = get_context("spawn")
+
+    for engine in engines:
+        for backend in backends:
+            for size in sizes:
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+                    res = ex.submit(
+                        run_case, engine, size, repeat, backend
+                    ).result()
+                results.append(res)
+                _print_case(res)
+
+    return results
+
+
+# ============================================================
+# LAPORAN & BASELINE
+# ============================================================
+
+def machine_info():
+    """Identitas mesin; angka baseline hanya sebanding di mesin yang sama"""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _key(res):
+    return f"{res['engine']}:{res.get('backend', 'default')}:{res['size']}"
+
+
+def _print_case(res):
+    parts = "  ".join(
+        f"{name}={v['median'] * 1000:,.0f}ms"
+        for name, v in res["stages"].items()
+    )
+    print(
+        f"[{res['engine']:>7}/{res.get('backend', 'default'):<10} "
+        f"n={res['size']:>4}] {parts}  "
+        f"peak_rss={res['peak_rss_mb']:,.0f}MB"
+    )
+
+
+def compare(results, baseline, tolerance):
+    """Return daftar regresi (pesan) terhadap baseline"""
+    regressions = []
+    base = {_key(r): r for r in baseline.get("results", [])}
+
+    for res in results:
+        ref = base.get(_key(res))
+        if not ref:
+            regressions.append(f"{_key(res)}: tidak ada di baseline")
+            continue
+
+        for name, v in res["stages"].items():
+            old = ref["stages"].get(name, {}).get("median")
+            if old is None or old < MIN_STAGE_SECONDS:
+                continue
+            if v["median"] > old * (1 + tolerance):
+                regressions.append(
+                    f"{_key(res)} {name}: "
+                    f"{old * 1000:,.0f}ms → {v['median'] * 1000:,.0f}ms"
+                )
+
+        old_rss = ref.get("peak_rss_mb")
+        if old_rss and res["peak_rss_mb"] > old_rss * (1 + tolerance):
+            regressions.append(
+                f"{_key(res)} peak_rss: "
+                f"{old_rss:,.0f}MB → {res['peak_rss_mb']:,.0f}MB"
+            )
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES),
+                        choices=ENGINES)
+    parser.add_argument("--sizes", nargs="+", type=int,
+                        default=list(DEFAULT_SIZES))
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS,
+                        help="Backend peta (default: bawaan engine)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path,
+                        help="Simpan hasil ke file JSON")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"Tulis hasil sebagai baseline ({BASELINE_FILE.name})")
+    parser.add_argument("--compare", action="store_true",
+                        help="Bandingkan dengan baseline, exit 1 jika regresi")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Batas kenaikan relatif sebelum dianggap regresi")
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        args.engines, args.sizes, args.repeat, args.backends or (None,)
+    )
+    payload = {"seed": SEED, "machine": machine_info(), "results": results}
+
+    if args.output:
+        args.output.write_text(json.dumps(payload, indent=2))
+
+    if args.save_baseline:
+        BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE_FILE.write_text(json.dumps(payload, indent=2))
+        print(f"Baseline disimpan: {BASELINE_FILE}")
+
+    if args.compare:
+        if not BASELINE_FILE.exists():
+            print(f"Baseline belum ada: {BASELINE_FILE}")
+            return 1
+        baseline = json.loads(BASELINE_FILE.read_text())
+        if baseline.get("machine") != payload["machine"]:
+            print(f"PERINGATAN mesin berbeda dari baseline: {baseline.get('machine')}")
+        regressions = compare(results, baseline, args.tolerance)
+        for msg in regressions:
+            print(f"REGRESI {msg}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
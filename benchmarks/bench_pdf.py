@@ -0,0 +1,123 @@
+"""
+Benchmark waktu build PDF laporan (satu kejadian & rekap multi kejadian).
+
+Membandingkan stylesheet ter-cache (modules.pdf_template) dengan kondisi
+"dingin": cache dikosongkan sebelum tiap PDF → stylesheet & geometri
+halaman dibangun ulang seperti implementasi lama. Hanya itu yang
+di-cache; flowable & page template selalu dibuat baru per dokumen pada
+kedua kondisi, jadi selisihnya = keuntungan cache yang tersisa.
+Data sintetis tanpa URL gambar → tidak ada akses jaringan.
+
+Contoh:
+    python benchmarks/bench_pdf.py
+    python benchmarks/bench_pdf.py --single 200 --rekap-size 500 --repeat 5
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from modules import pdf_template  # noqa: E402
+from pdf import generate_event_pdf, generate_multiple_events_pdf  # noqa: E402
+
+SEED = 11
+
+
+# ============================================================
+# DATA SINTETIS
+# ============================================================
+
+def make_records(n, rng):
+    kecamatan = ["Penjaringan", "Semarang Utara", "Pekalongan Utara",
+                 "Medan Belawan", "Muara Angke", "Tanjung Priok"]
+    return [
+        {
+            "No": i,
+            "Tanggal": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "Waktu": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            "Lokasi": f"Pesisir {rng.choice(kecamatan)} {i}",
+            "Kecamatan": rng.choice(kecamatan),
+            "Kabupaten": "Kota Contoh",
+            "Provinsi": "Provinsi Contoh",
+            "Latitude": round(rng.uniform(-8, 2), 6),
+            "Longitude": round(rng.uniform(95, 140), 6),
+            "Ketinggian": str(rng.randint(10, 120)),
+            "Dampak": "Genangan di permukiman dan jalan pesisir. " * rng.randint(1, 6),
+            "Sumber": "Laporan BPBD setempat",
+            "Gambar": None,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def _time(fn, cold):
+    if cold:
+        pdf_template.clear_cache()
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def bench_single(records, cold):
+    """Waktu per PDF satu kejadian (detik) untuk tiap record"""
+    return [_time(lambda r=r: generate_event_pdf(r), cold) for r in records]
+
+
+def bench_rekap(records, repeat, cold):
+    return [
+        _time(lambda: generate_multiple_events_pdf(records, "BENCHMARK"), cold)
+        for _ in range(repeat)
+    ]
+
+
+def _row(name, values):
+    med = statistics.median(values)
+    print(f"{name:<34} {med * 1000:>10,.2f} ms  (min {min(values) * 1000:,.2f})")
+    return med
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--single", type=int, default=100,
+                        help="Jumlah PDF satu kejadian")
+    parser.add_argument("--rekap-size", type=int, default=500,
+                        help="Jumlah kejadian dalam satu PDF rekap")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(SEED)
+    single = make_records(args.single, rng)
+    rekap = make_records(args.rekap_size, rng)
+
+    # Warmup: import font / modul reportlab
+    generate_event_pdf(single[0])
+
+    print(f"\nPDF satu kejadian ({args.single:,} PDF, median per PDF)")
+    cold = _row("dingin (stylesheet dibangun ulang)", bench_single(single, True))
+    warm = _row("stylesheet ter-cache", bench_single(single, False))
+    print(f"{'percepatan':<34} {cold / warm:>10,.2f}×")
+
+    print(f"\nPDF rekap ({args.rekap_size:,} kejadian, {args.repeat}× ulang)")
+    cold = _row("dingin (stylesheet dibangun ulang)",
+                bench_rekap(rekap, args.repeat, True))
+    warm = _row("stylesheet ter-cache", bench_rekap(rekap, args.repeat, False))
+    print(f"{'percepatan':<34} {cold / warm:>10,.2f}×")
+    print(f"{'per kejadian (ter-cache)':<34} "
+          f"{warm / args.rekap_size * 1000:>10,.3f} ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Benchmark utilitas normalisasi tanggal / koordinat.
+
+Membandingkan versi skalar (parse_date_safe, safe_float) yang dipanggil
+per baris dengan versi batch (parse_date_series, safe_float_series).
+Kesetaraan hasil diuji di tests/test_utils.py (pytest).
+
+Contoh:
+    python benchmarks/bench_utils.py
+    python benchmarks/bench_utils.py --size 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pandas as pd  # noqa: E402
+
+from modules.utils import (  # noqa: E402
+    parse_date_safe,
+    parse_date_series,
+    safe_float,
+    safe_float_series,
+)
+
+SEED = 7
+
+
+# ============================================================
+# DATA SINTETIS (CAMPURAN FORMAT SEPERTI DATA LAPANGAN)
+# ============================================================
+
+def make_dates(n, rng):
+    start = date(2020, 1, 1)
+    out = []
+    for _ in range(n):
+        d = start + timedelta(days=rng.randrange(2000))
+        r = rng.random()
+        if r < 0.70:
+            out.append(d.strftime("%Y-%m-%d"))
+        elif r < 0.80:
+            out.append(d.strftime("%d/%m/%Y"))
+        elif r < 0.85:
+            out.append(d.strftime("%d-%m-%Y"))
+        elif r < 0.88:
+            out.append(f" {d.strftime('%m/%d/%Y')} ")
+        elif r < 0.93:
+            out.append(d)
+        elif r < 0.96:
+            out.append(None)
+        else:
+            out.append(rng.choice(["", "-", "kemarin", "2024-13-45"]))
+    return out
+
+
+def make_coords(n, rng):
+    out = []
+    for _ in range(n):
+        v = round(rng.uniform(-11, 141), 6)
+        r = rng.random()
+        if r < 0.50:
+            out.append(str(v))
+        elif r < 0.70:
+            out.append(str(v).replace(".", ","))
+        elif r < 0.80:
+            out.append(v)
+        elif r < 0.88:
+            out.append(Decimal(str(v)))
+        elif r < 0.94:
+            out.append(f"  {v} ")
+        elif r < 0.97:
+            out.append(None)
+        else:
+            out.append(rng.choice(["", "abc", "1.2.3"]))
+    return out
+
+
+def make_decimal_coords(n, rng):
+    """Kolom DECIMAL seperti dikembalikan mysql.connector"""
+    return [
+        None if rng.random() < 0.03 else Decimal(str(round(rng.uniform(-11, 141), 6)))
+        for _ in range(n)
+    ]
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def _time(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(SEED)
+    dates = make_dates(args.size, rng)
+    coords = make_coords(args.size, rng)
+
+    date_series = pd.Series(dates, dtype=object)
+    decimals = make_decimal_coords(args.size, rng)
+    texts = [str(v) if v is not None else None for v in decimals]
+
+    coord_series = pd.Series(coords, dtype=object)
+    decimal_series = pd.Series(decimals, dtype=object)
+    text_series = pd.Series(texts, dtype=object)
+
+    rows = [
+        ("parse_date_safe (loop)",
+         _time(lambda: [parse_date_safe(v) for v in dates])),
+        ("parse_date_series",
+         _time(lambda: parse_date_series(date_series))),
+        ("safe_float (loop) campuran",
+         _time(lambda: [safe_float(v, None) for v in coords])),
+        ("safe_float_series campuran",
+         _time(lambda: safe_float_series(coord_series))),
+        ("safe_float (loop) Decimal",
+         _time(lambda: [safe_float(v, None) for v in decimals])),
+        ("safe_float_series Decimal",
+         _time(lambda: safe_float_series(decimal_series))),
+        ("safe_float (loop) teks",
+         _time(lambda: [safe_float(v, None) for v in texts])),
+        ("safe_float_series teks",
+         _time(lambda: safe_float_series(text_series))),
+    ]
+
+    print(f"\n{args.size:,} nilai")
+    for name, sec in rows:
+        print(f"{name:<30} {sec * 1000:>10,.1f} ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+SQLite shim berperilaku mirip mysql.connector untuk benchmark lokal.
+
+- Placeholder `%s` (MySQL) diterjemahkan ke `?` (SQLite)
+- cursor(dictionary=True) mengembalikan baris sebagai dict
+- Backtick identifier sudah didukung SQLite apa adanya
+
+Dipakai lewat modules.crud.set_connection_factory(...).
+"""
+
+import random
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+WILAYAH_CSV = BASE_DIR / "data" / "referensi" / "wil_kecamatan.csv"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS `rob` (
+    `No` INTEGER PRIMARY KEY AUTOINCREMENT,
+    `Tanggal` DATE,
+    `Waktu` VARCHAR(32),
+    `Lokasi` VARCHAR(255),
+    `Kecamatan` VARCHAR(128),
+    `Kabupaten` VARCHAR(128),
+    `Provinsi` VARCHAR(128),
+    `Latitude` DECIMAL(10, 6),
+    `Longitude` DECIMAL(10, 6),
+    `Ketinggian` VARCHAR(64),
+    `Dampak` TEXT,
+    `Gambar` TEXT,
+    `Sumber` VARCHAR(255)
+)
+"""
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_rob_tanggal ON `rob` (`Tanggal`)",
+    "CREATE INDEX IF NOT EXISTS idx_rob_provinsi ON `rob` (`Provinsi`)",
+    "CREATE INDEX IF NOT EXISTS idx_rob_kabupaten ON `rob` (`Kabupaten`)",
+)
+
+
+def _translate(sql):
+    return sql.replace("%s", "?")
+
+
+class ShimCursor:
+    def __init__(self, conn, dictionary=False):
+        self._cur = conn.cursor()
+        self._dictionary = dictionary
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def column_names(self):
+        return tuple(d[0] for d in self._cur.description or ())
+
+    def execute(self, sql, params=()):
+        self._cur.execute(_translate(sql), tuple(params or ()))
+
+    def executemany(self, sql, seq):
+        self._cur.executemany(_translate(sql), seq)
+
+    def _wrap(self, rows):
+        if not self._dictionary:
+            return rows
+        cols = self.column_names
+        return [dict(zip(cols, r)) for r in rows]
+
+    def fetchone(self):
+        row = self._cur.fetchone()
+        if row is None:
+            return None
+        return self._wrap([row])[0]
+
+    def fetchmany(self, size=1):
+        return self._wrap(self._cur.fetchmany(size))
+
+    def fetchall(self):
+        return self._wrap(self._cur.fetchall())
+
+    def close(self):
+        self._cur.close()
+
+
+class ShimConnection:
+    def __init__(self, path):
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+
+    def cursor(self, dictionary=False, buffered=None, **_):
+        return ShimCursor(self._conn, dictionary=dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+    def is_connected(self):
+        return True
+
+
+def connection_factory(path):
+    """Factory untuk crud.set_connection_factory"""
+    return lambda: ShimConnection(path)
+
+
+# ============================================================
+# SEED DATA SINTETIS
+# ============================================================
+
+def seed_database(path, rows, seed=42, with_indexes=False, batch=10_000):
+    """Buat tabel `rob` berisi `rows` kejadian sintetis"""
+    path = Path(path)
+    if path.exists():
+        path.unlink()
+
+    wil = pd.read_csv(WILAYAH_CSV).dropna().to_records(index=False)
+    rng = random.Random(seed)
+    start = date(2022, 1, 1)
+
+    conn = sqlite3.connect(str(path))
+    conn.execute(SCHEMA)
+    if with_indexes:
+        for ddl in INDEXES:
+            conn.execute(ddl)
+
+    sql = (
+        "INSERT INTO `rob` (`Tanggal`, `Waktu`, `Lokasi`, `Kecamatan`, "
+        "`Kabupaten`, `Provinsi`, `Latitude`, `Longitude`, `Ketinggian`, "
+        "`Dampak`, `Gambar`, `Sumber`) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+
+    done = 0
+    while done < rows:
+        n = min(batch, rows - done)
+        buf = []
+        for _ in range(n):
+            kec, kab, prov = wil[rng.randrange(len(wil))]
+            tgl = start + timedelta(days=rng.randrange(365 * 3))
+            low = rng.randrange(10, 80, 5)
+            buf.append((
+                tgl.isoformat(),
+                f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+                f"Pesisir {kec}",
+                kec,
+                kab,
+                prov,
+                round(rng.uniform(-11.0, 6.0), 6),
+                round(rng.uniform(95.0, 141.0), 6),
+                f"{low}-{low + rng.randrange(5, 40, 5)}",
+                "Genangan di permukiman warga",
+                "",
+                "BPBD",
+            ))
+        conn.executemany(sql, buf)
+        done += n
+
+    conn.commit()
+    conn.close()
+    return path
@@ -1,15 +1,52 @@
 # modules/crud.py
+import pandas as pd
 import streamlit as st
 import mysql.connector
 from mysql.connector import Error
 
+from modules.events import to_event_frame
+from modules.utils import parse_ketinggian, to_db_date_str
+
 TABLE_NAME = "rob"
+AGG_HARIAN = "rob_agg_harian"
+AGG_BULANAN = "rob_agg_bulanan"
+
+# Factory koneksi alternatif (benchmark / pengujian lokal).
+# None → pakai MySQL dari secrets.toml
+_connection_factory = None
+
+# Naik setiap insert / update / delete di proses ini (kunci cache murah)
+_data_version = 0
+
 
 # =====================================================
 # KONEKSI DATABASE
 # =====================================================
+def set_connection_factory(factory):
+    """
+    Ganti sumber koneksi, mis. SQLite shim untuk benchmark.
+    factory() harus mengembalikan objek mirip mysql.connector
+    (cursor(dictionary=...), commit(), close()). None → kembali ke MySQL.
+    """
+    global _connection_factory
+    _connection_factory = factory
+
+
+def data_version():
+    """Penghitung tulis proses ini; berubah → cache turunan data basi"""
+    return _data_version
+
+
+def _bump_version():
+    global _data_version
+    _data_version += 1
+
+
 def get_db_connection():
     """Buat koneksi ke database menggunakan kredensial dari secrets.toml"""
+    if _connection_factory is not None:
+        return _connection_factory()
+
     try:
         conn = mysql.connector.connect(
             host=st.secrets["mysql"]["host"],
@@ -28,69 +65,43 @@ def get_db_connection():
 # =====================================================
 # READ
 # =====================================================
-def fetch_all_data():
-    """Ambil seluruh data dari tabel"""
-    conn = get_db_connection()
-    if not conn:
-        return []
+COLUMNS = [
+    "No",
+    "Tanggal",
+    "Waktu",
+    "Lokasi",
+    "Kecamatan",
+    "Kabupaten",
+    "Provinsi",
+    "Latitude",
+    "Longitude",
+    "Ketinggian",
+    "Dampak",
+    "Gambar",
+    "Sumber",
+]
 
-    cur = conn.cursor(dictionary=True)
-    cur.execute(f"""
+ORDER_BY = " ORDER BY `Tanggal` DESC, `Waktu` DESC, `No` DESC"
+
+
+def _select_sql():
+    cols = ",\n            ".join(f"`{c}`" for c in COLUMNS)
+    return f"""
         SELECT
-            `No`,
-            `Tanggal`,
-            `Waktu`,
-            `Lokasi`,
-            `Kecamatan`,
-            `Kabupaten`,
-            `Provinsi`,
-            `Latitude`,
-            `Longitude`,
-            `Ketinggian`,
-            `Dampak`,
-            `Gambar`,
-            `Sumber`
+            {cols}
         FROM `{TABLE_NAME}`
-        ORDER BY `Tanggal` DESC, `Waktu` DESC, `No` DESC
-    """)
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
-    return rows
+    """
 
 
-def fetch_filtered_data(
+def _build_filtered_query(
     start_date=None,
     end_date=None,
     provinsi=None,
     kabupaten=None,
     kecamatan=None
 ):
-    """Ambil data berdasarkan filter opsional"""
-    conn = get_db_connection()
-    if not conn:
-        return []
-
-    cur = conn.cursor(dictionary=True)
-
-    q = f"""
-        SELECT
-            `No`,
-            `Tanggal`,
-            `Waktu`,
-            `Lokasi`,
-            `Kecamatan`,
-            `Kabupaten`,
-            `Provinsi`,
-            `Latitude`,
-            `Longitude`,
-            `Ketinggian`,
-            `Dampak`,
-            `Gambar`,
-            `Sumber`
-        FROM `{TABLE_NAME}`
-        WHERE 1=1
-    """
+    """Susun query SELECT + parameter untuk filter opsional"""
+    q = _select_sql() + " WHERE 1=1"
     params = []
 
     if start_date:
@@ -113,15 +124,173 @@ def fetch_filtered_data(
         q += " AND `Kecamatan` LIKE %s"
         params.append(f"%{kecamatan}%")
 
-    q += " ORDER BY `Tanggal` DESC, `Waktu` DESC, `No` DESC"
+    q += ORDER_BY
+    return q, tuple(params)
+
 
-    cur.execute(q, tuple(params))
+def fetch_all_data():
+    """Ambil seluruh data dari tabel"""
+    conn = get_db_connection()
+    if not conn:
+        return []
+
+    cur = conn.cursor(dictionary=True)
+    cur.execute(_select_sql() + ORDER_BY)
+    rows = cur.fetchall()
+    cur.close()
+    conn.close()
+    return rows
+
+
+def fetch_filtered_data(
+    start_date=None,
+    end_date=None,
+    provinsi=None,
+    kabupaten=None,
+    kecamatan=None
+):
+    """Ambil data berdasarkan filter opsional"""
+    conn = get_db_connection()
+    if not conn:
+        return []
+
+    cur = conn.cursor(dictionary=True)
+
+    q, params = _build_filtered_query(
+        start_date, end_date, provinsi, kabupaten, kecamatan
+    )
+
+    cur.execute(q, params)
     rows = cur.fetchall()
     cur.close()
     conn.close()
     return rows
 
 
+def iter_filtered_batches(
+    start_date=None,
+    end_date=None,
+    provinsi=None,
+    kabupaten=None,
+    kecamatan=None,
+    batch_size=5000
+):
+    """
+    Stream data terfilter per batch (list of tuple, urutan = COLUMNS).
+    Cursor unbuffered → baris diambil dari server sedikit demi sedikit,
+    memori terbatas berapa pun jumlah hasilnya.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return
+
+    cur = conn.cursor(buffered=False)
+    try:
+        q, params = _build_filtered_query(
+            start_date, end_date, provinsi, kabupaten, kecamatan
+        )
+        cur.execute(q, params)
+
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        # Generator bisa dihentikan di tengah → jangan crash saat tutup
+        try:
+            cur.close()
+        except Error:
+            pass
+        conn.close()
+
+
+def _batch_to_frame(rows):
+    """Batch tuple → DataFrame kolomnar (tanpa dict per baris)"""
+    cols = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+    return pd.DataFrame(
+        {name: list(values) for name, values in zip(COLUMNS, cols)},
+        columns=COLUMNS
+    )
+
+
+def iter_filtered_frames(batch_size=20000, **filters):
+    """Stream data terfilter sebagai potongan DataFrame"""
+    for rows in iter_filtered_batches(batch_size=batch_size, **filters):
+        yield _batch_to_frame(rows)
+
+
+def fetch_filtered_frame(
+    start_date=None,
+    end_date=None,
+    provinsi=None,
+    kabupaten=None,
+    kecamatan=None,
+    batch_size=20000,
+    typed=True
+):
+    """
+    Versi DataFrame dari fetch_filtered_data: baris di-stream per batch
+    dan langsung disusun kolomnar → puncak memori jauh lebih kecil.
+
+    typed=True  → frame kejadian bertipe (modules.events): kategori
+                  wilayah, koordinat float32, Tanggal datetime64.
+    typed=False → nilai mentah dari database (untuk form edit).
+    """
+    frames = list(iter_filtered_frames(
+        batch_size=batch_size,
+        start_date=start_date,
+        end_date=end_date,
+        provinsi=provinsi,
+        kabupaten=kabupaten,
+        kecamatan=kecamatan
+    ))
+
+    if not frames:
+        df = _batch_to_frame([])
+    elif len(frames) == 1:
+        df = frames[0]
+    else:
+        df = pd.concat(frames, ignore_index=True, copy=False)
+
+    return to_event_frame(df) if typed else df
+
+
+def fetch_all_frame(batch_size=20000, typed=True):
+    """Versi DataFrame dari fetch_all_data (streaming)"""
+    return fetch_filtered_frame(batch_size=batch_size, typed=typed)
+
+
+# =====================================================
+# TRANSAKSI TULIS (KEJADIAN + AGREGAT)
+# =====================================================
+def _write_transaction(write):
+    """
+    Jalankan write(conn, cur) dalam SATU transaksi: tulis kejadian dan
+    agregat commit bersama, gagal di mana pun → rollback semuanya
+    (agregat tidak pernah tertinggal dari tabel kejadian).
+    Return True jika ter-commit.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return False
+
+    cur = conn.cursor()
+    try:
+        write(conn, cur)
+        conn.commit()
+    except Error as e:
+        conn.rollback()
+        st.error(f"❌ Gagal menyimpan data: {e}")
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+    _bump_version()
+    return True
+
+
 # =====================================================
 # CREATE
 # =====================================================
@@ -139,12 +308,8 @@ def insert_data(
     gambar,
     sumber
 ):
-    """Tambahkan satu data baru ke tabel"""
-    conn = get_db_connection()
-    if not conn:
-        return
-
-    cur = conn.cursor()
+    """Tambahkan satu data baru ke tabel. Return True jika tersimpan."""
+    key = (tanggal, provinsi, kabupaten, kecamatan)
     sql = f"""
         INSERT INTO `{TABLE_NAME}` (
             `Tanggal`,
@@ -162,24 +327,25 @@ def insert_data(
         ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
     """
 
-    cur.execute(sql, (
-        tanggal,
-        waktu,
-        lokasi,
-        kecamatan,
-        kabupaten,
-        provinsi,
-        latitude,
-        longitude,
-        ketinggian,
-        dampak,
-        gambar,
-        sumber
-    ))
+    def write(conn, cur):
+        keys = _lock_groups(conn, [key])
+        cur.execute(sql, (
+            tanggal,
+            waktu,
+            lokasi,
+            kecamatan,
+            kabupaten,
+            provinsi,
+            latitude,
+            longitude,
+            ketinggian,
+            dampak,
+            gambar,
+            sumber
+        ))
+        _refresh_aggregates(conn, keys)
 
-    conn.commit()
-    cur.close()
-    conn.close()
+    return _write_transaction(write)
 
 
 # =====================================================
@@ -200,12 +366,8 @@ def update_data(
     gambar,
     sumber
 ):
-    """Perbarui data berdasarkan ID"""
-    conn = get_db_connection()
-    if not conn:
-        return
-
-    cur = conn.cursor()
+    """Perbarui data berdasarkan ID. Return True jika tersimpan."""
+    new_key = (tanggal, provinsi, kabupaten, kecamatan)
     sql = f"""
         UPDATE `{TABLE_NAME}` SET
             `Tanggal`=%s,
@@ -223,38 +385,419 @@ def update_data(
         WHERE `No`=%s
     """
 
-    cur.execute(sql, (
-        tanggal,
-        waktu,
-        lokasi,
-        kecamatan,
-        kabupaten,
-        provinsi,
-        latitude,
-        longitude,
-        ketinggian,
-        dampak,
-        gambar,
-        sumber,
-        no_id
-    ))
+    def write(conn, cur):
+        keys = _lock_groups(conn, [_event_key(conn, no_id), new_key])
+        cur.execute(sql, (
+            tanggal,
+            waktu,
+            lokasi,
+            kecamatan,
+            kabupaten,
+            provinsi,
+            latitude,
+            longitude,
+            ketinggian,
+            dampak,
+            gambar,
+            sumber,
+            no_id
+        ))
+        _refresh_aggregates(conn, keys)
 
-    conn.commit()
-    cur.close()
-    conn.close()
+    return _write_transaction(write)
 
 
 # =====================================================
 # DELETE
 # =====================================================
 def delete_data(no_id):
-    """Hapus data berdasarkan ID"""
-    conn = get_db_connection()
+    """Hapus data berdasarkan ID. Return True jika terhapus."""
+    def write(conn, cur):
+        keys = _lock_groups(conn, [_event_key(conn, no_id)])
+        cur.execute(f"DELETE FROM `{TABLE_NAME}` WHERE `No`=%s", (no_id,))
+        _refresh_aggregates(conn, keys)
+
+    return _write_transaction(write)
+
+
+# =====================================================
+# AGREGAT HARIAN / BULANAN (MATERIALIZED)
+# =====================================================
+# Ringkasan per (hari|bulan, provinsi, kabupaten, kecamatan):
+# jumlah kejadian + ketinggian maksimum (cm, dari teks `Ketinggian`).
+# Dijaga inkremental di insert/update/delete: hanya grup yang
+# tersentuh yang dihitung ulang dari tabel kejadian (via indeks grup).
+# Baris agregat grup dikunci SEBELUM kejadian ditulis → penulis grup
+# yang sama berantre, hitung ulang tidak saling timpa (_lock_groups).
+# DDL + backfill = migrasi, dijalankan SEKALI saat startup
+# (ensure_aggregate_tables), tidak pernah di jalur tulis: DDL MySQL
+# melakukan commit implisit atas transaksi yang sedang berjalan.
+
+_AGG_DDL = (
+    f"""
+    CREATE TABLE IF NOT EXISTS `{AGG_HARIAN}` (
+        `Tanggal` DATE NOT NULL,
+        `Provinsi` VARCHAR(128) NOT NULL,
+        `Kabupaten` VARCHAR(128) NOT NULL,
+        `Kecamatan` VARCHAR(128) NOT NULL,
+        `Jumlah` INT NOT NULL,
+        `Ketinggian_Max` DECIMAL(8, 2) NULL,
+        PRIMARY KEY (`Tanggal`, `Provinsi`, `Kabupaten`, `Kecamatan`)
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS `{AGG_BULANAN}` (
+        `Bulan` CHAR(7) NOT NULL,
+        `Provinsi` VARCHAR(128) NOT NULL,
+        `Kabupaten` VARCHAR(128) NOT NULL,
+        `Kecamatan` VARCHAR(128) NOT NULL,
+        `Jumlah` INT NOT NULL,
+        `Ketinggian_Max` DECIMAL(8, 2) NULL,
+        PRIMARY KEY (`Bulan`, `Provinsi`, `Kabupaten`, `Kecamatan`)
+    )
+    """,
+)
+
+# Indeks pencarian grup di tabel kejadian (refresh inkremental)
+GROUP_INDEX = "idx_rob_agg_grup"
+_GROUP_INDEX_DDL = (
+    f"CREATE INDEX `{GROUP_INDEX}` ON `{TABLE_NAME}` "
+    f"(`Tanggal`, `Kecamatan`, `Kabupaten`, `Provinsi`)"
+)
+ER_DUP_KEYNAME = 1061
+
+_agg_ready = False
+
+
+def _norm_key(tanggal, provinsi, kabupaten, kecamatan):
+    """Kunci grup agregat; None → '' (kolom kunci NOT NULL)"""
+    return (
+        to_db_date_str(tanggal),
+        provinsi or "",
+        kabupaten or "",
+        kecamatan or "",
+    )
+
+
+def _month_range(bulan):
+    """'YYYY-MM' → (awal bulan, awal bulan berikutnya)"""
+    y, m = int(bulan[:4]), int(bulan[5:7])
+    ny, nm = (y + 1, 1) if m == 12 else (y, m + 1)
+    return f"{y:04d}-{m:02d}-01", f"{ny:04d}-{nm:02d}-01"
+
+
+def _summarize(values):
+    heights = [h for h in map(parse_ketinggian, values) if h is not None]
+    return len(values), (max(heights) if heights else None)
+
+
+def ensure_aggregate_tables(conn=None):
+    """
+    Migrasi agregat (startup): buat tabel agregat + indeks grup jika
+    belum ada. Jika tabel agregat masih kosong sementara tabel kejadian
+    berisi → isi awal (backfill) otomatis.
+    """
+    global _agg_ready
+    if _agg_ready:
+        return True
+
+    own = conn is None
+    conn = conn or get_db_connection()
     if not conn:
+        return False
+
+    try:
+        cur = conn.cursor()
+        try:
+            for ddl in _AGG_DDL:
+                cur.execute(ddl)
+
+            try:
+                cur.execute(_GROUP_INDEX_DDL)
+            except Error as e:
+                if e.errno != ER_DUP_KEYNAME:
+                    raise
+
+            cur.execute(f"SELECT COUNT(*) FROM `{AGG_HARIAN}`")
+            agg_empty = cur.fetchone()[0] == 0
+            cur.execute(f"SELECT COUNT(*) FROM `{TABLE_NAME}`")
+            has_events = cur.fetchone()[0] > 0
+            conn.commit()
+        finally:
+            cur.close()
+
+        # Backfill satu transaksi; gagal → tabel tetap kosong dan
+        # _agg_ready tidak di-set → dicoba lagi pada panggilan berikutnya
+        if agg_empty and has_events:
+            rebuild_aggregates(conn)
+    finally:
+        if own:
+            conn.close()
+
+    _agg_ready = True
+    return True
+
+
+def _event_key(conn, no_id):
+    """
+    Kunci grup agregat milik satu kejadian (sebelum diubah/dihapus).
+    Locking read: mengunci baris kejadian tanpa membuka snapshot baca.
+    """
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT `Tanggal`, `Provinsi`, `Kabupaten`, `Kecamatan` "
+        f"FROM `{TABLE_NAME}` WHERE `No`=%s FOR UPDATE",
+        (no_id,)
+    )
+    row = cur.fetchone()
+    cur.close()
+    return tuple(row) if row else None
+
+
+def _group_where(prov, kab, kec):
+    """
+    Predikat grup dengan kesetaraan biasa (indeks grup terpakai).
+    Kunci '' juga mencocokkan NULL lewat cabang IS NULL eksplisit
+    (bukan COALESCE, yang memaksa full scan).
+    """
+    q, params = "", []
+    for col, val in (("Kecamatan", kec), ("Kabupaten", kab), ("Provinsi", prov)):
+        if val:
+            q += f" AND `{col}`=%s"
+            params.append(val)
+        else:
+            q += f" AND (`{col}`='' OR `{col}` IS NULL)"
+    return q, params
+
+
+def _lock_groups(conn, keys):
+    """
+    Kunci baris agregat (harian + bulanan) milik grup `keys` sampai
+    commit. INSERT … ON DUPLICATE KEY UPDATE membuat baris placeholder
+    bila belum ada, lalu memegang X-lock → transaksi lain untuk grup yang
+    sama menunggu di sini, SEBELUM menulis kejadiannya.
+    Dipanggil sebelum snapshot baca pertama transaksi, jadi hitung ulang
+    sesudahnya melihat semua kejadian yang sudah di-commit penulis lain.
+    Return: kunci grup ternormalisasi (urut → urutan kunci konsisten)
+    """
+    keys = {_norm_key(*k) for k in keys if k and k[0]}
+    keys = sorted(k for k in keys if k[0] is not None)  # tanggal valid
+    months = sorted({(k[0][:7],) + k[1:] for k in keys})
+
+    cur = conn.cursor()
+    for table, period_col, group in (
+        (AGG_HARIAN, "Tanggal", keys),
+        (AGG_BULANAN, "Bulan", months),
+    ):
+        for key in group:
+            cur.execute(
+                f"INSERT INTO `{table}` (`{period_col}`, `Provinsi`, "
+                f"`Kabupaten`, `Kecamatan`, `Jumlah`, `Ketinggian_Max`) "
+                f"VALUES (%s, %s, %s, %s, 0, NULL) "
+                f"ON DUPLICATE KEY UPDATE `Jumlah`=`Jumlah`",
+                key
+            )
+    cur.close()
+    return keys
+
+
+def _refresh_aggregates(conn, keys):
+    """
+    Hitung ulang grup agregat yang tersentuh (dalam transaksi yang sama).
+    keys: hasil _lock_groups (baris agregat sudah terkunci).
+    Error dilempar ke pemanggil → transaksi kejadian ikut di-rollback.
+    """
+    if not keys:
+        return
+
+    cur = conn.cursor()
+
+    # ---------- HARIAN ----------
+    for tanggal, prov, kab, kec in keys:
+        where_grp, params = _group_where(prov, kab, kec)
+        cur.execute(
+            f"SELECT `Ketinggian` FROM `{TABLE_NAME}` "
+            f"WHERE `Tanggal`=%s" + where_grp,
+            (tanggal, *params)
+        )
+        jumlah, tinggi = _summarize([r[0] for r in cur.fetchall()])
+        _write_agg_row(cur, AGG_HARIAN, "Tanggal",
+                       (tanggal, prov, kab, kec), jumlah, tinggi)
+
+    # ---------- BULANAN ----------
+    for bulan, prov, kab, kec in sorted({(k[0][:7],) + k[1:] for k in keys}):
+        awal, akhir = _month_range(bulan)
+        where_grp, params = _group_where(prov, kab, kec)
+        cur.execute(
+            f"SELECT `Ketinggian` FROM `{TABLE_NAME}` "
+            f"WHERE `Tanggal` >= %s AND `Tanggal` < %s" + where_grp,
+            (awal, akhir, *params)
+        )
+        jumlah, tinggi = _summarize([r[0] for r in cur.fetchall()])
+        _write_agg_row(cur, AGG_BULANAN, "Bulan",
+                       (bulan, prov, kab, kec), jumlah, tinggi)
+
+    cur.close()
+
+
+def _write_agg_row(cur, table, period_col, key, jumlah, tinggi):
+    where = (
+        f"WHERE `{period_col}`=%s "
+        f"AND `Provinsi`=%s AND `Kabupaten`=%s AND `Kecamatan`=%s"
+    )
+    if jumlah == 0:
+        cur.execute(f"DELETE FROM `{table}` {where}", key)
         return
 
+    # Baris sudah ada & terkunci (_lock_groups)
+    cur.execute(
+        f"UPDATE `{table}` SET `Jumlah`=%s, `Ketinggian_Max`=%s {where}",
+        (jumlah, tinggi) + key
+    )
+
+
+def rebuild_aggregates(conn=None, batch_size=20000):
+    """Bangun ulang seluruh tabel agregat dari tabel kejadian"""
+    own = conn is None
+    conn = conn or get_db_connection()
+    if not conn:
+        return False
+
+    harian, bulanan = {}, {}
+
+    cur = conn.cursor(buffered=False)
+    cur.execute(
+        f"SELECT `Tanggal`, `Provinsi`, `Kabupaten`, `Kecamatan`, "
+        f"`Ketinggian` FROM `{TABLE_NAME}`"
+    )
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        for tanggal, prov, kab, kec, tinggi in rows:
+            if not tanggal:
+                continue
+            key = _norm_key(tanggal, prov, kab, kec)
+            if key[0] is None:
+                continue
+            h = parse_ketinggian(tinggi)
+            for agg, k in ((harian, key), (bulanan, (key[0][:7],) + key[1:])):
+                jumlah, tmax = agg.get(k, (0, None))
+                if h is not None and (tmax is None or h > tmax):
+                    tmax = h
+                agg[k] = (jumlah + 1, tmax)
+    cur.close()
+
     cur = conn.cursor()
-    cur.execute(f"DELETE FROM `{TABLE_NAME}` WHERE `No`=%s", (no_id,))
+    for table, period_col, agg in (
+        (AGG_HARIAN, "Tanggal", harian),
+        (AGG_BULANAN, "Bulan", bulanan),
+    ):
+        cur.execute(f"DELETE FROM `{table}`")
+        cur.executemany(
+            f"INSERT INTO `{table}` (`{period_col}`, `Provinsi`, `Kabupaten`, "
+            f"`Kecamatan`, `Jumlah`, `Ketinggian_Max`) "
+            f"VALUES (%s, %s, %s, %s, %s, %s)",
+            [k + v for k, v in agg.items()]
+        )
     conn.commit()
     cur.close()
-    conn.close()
\ No newline at end of file
+
+    if own:
+        conn.close()
+    return True
+
+
+def _fetch_agg(sql, params):
+    conn = get_db_connection()
+    if not conn:
+        return []
+
+    ensure_aggregate_tables(conn)
+    cur = conn.cursor(dictionary=True)
+    cur.execute(sql, params)
+    rows = cur.fetchall()
+    cur.close()
+    conn.close()
+    return rows
+
+
+def _agg_where(period_col, start, end, provinsi, kabupaten):
+    q, params = " WHERE 1=1", []
+    if start:
+        q += f" AND `{period_col}` >= %s"
+        params.append(start)
+    if end:
+        q += f" AND `{period_col}` <= %s"
+        params.append(end)
+    if provinsi:
+        q += " AND `Provinsi` LIKE %s"
+        params.append(f"%{provinsi}%")
+    if kabupaten:
+        q += " AND `Kabupaten` LIKE %s"
+        params.append(f"%{kabupaten}%")
+    return q, params
+
+
+def fetch_affected_kecamatan(start_date=None, end_date=None):
+    """Daftar kecamatan terdampak (terbaru lebih dulu) dari agregat harian"""
+    where, params = _agg_where("Tanggal", start_date, end_date, None, None)
+    rows = _fetch_agg(
+        f"SELECT `Kecamatan`, MAX(`Tanggal`) AS `Terakhir` "
+        f"FROM `{AGG_HARIAN}`{where} AND `Kecamatan` <> '' "
+        f"GROUP BY `Kecamatan` ORDER BY `Terakhir` DESC, `Kecamatan`",
+        tuple(params)
+    )
+    return [r["Kecamatan"] for r in rows]
+
+
+def fetch_kecamatan_counts(start_date=None, end_date=None):
+    """Jumlah kejadian per kecamatan dalam periode (satu query GROUP BY)"""
+    where, params = _agg_where("Tanggal", start_date, end_date, None, None)
+    rows = _fetch_agg(
+        f"SELECT `Kecamatan`, SUM(`Jumlah`) AS `Jumlah` "
+        f"FROM `{AGG_HARIAN}`{where} AND `Kecamatan` <> '' "
+        f"GROUP BY `Kecamatan`",
+        tuple(params)
+    )
+    return {r["Kecamatan"]: int(r["Jumlah"]) for r in rows}
+
+
+def fetch_period_comparison(prev_start, start, end):
+    """
+    Jumlah kejadian per kecamatan untuk dua periode berurutan dalam SATU
+    query: Lalu = [prev_start, start), Kini = [start, end]
+    """
+    where, params = _agg_where("Tanggal", prev_start, end, None, None)
+    return _fetch_agg(
+        f"SELECT `Kecamatan`, "
+        f"SUM(CASE WHEN `Tanggal` < %s THEN `Jumlah` ELSE 0 END) AS `Lalu`, "
+        f"SUM(CASE WHEN `Tanggal` >= %s THEN `Jumlah` ELSE 0 END) AS `Kini` "
+        f"FROM `{AGG_HARIAN}`{where} AND `Kecamatan` <> '' "
+        f"GROUP BY `Kecamatan`",
+        (start, start, *params)
+    )
+
+
+def fetch_daily_summary(start_date=None, end_date=None,
+                        provinsi=None, kabupaten=None):
+    """Baris agregat harian (Tanggal, wilayah, Jumlah, Ketinggian_Max)"""
+    where, params = _agg_where(
+        "Tanggal", start_date, end_date, provinsi, kabupaten
+    )
+    return _fetch_agg(
+        f"SELECT * FROM `{AGG_HARIAN}`{where} ORDER BY `Tanggal`",
+        tuple(params)
+    )
+
+
+def fetch_monthly_summary(start_month=None, end_month=None,
+                          provinsi=None, kabupaten=None):
+    """Baris agregat bulanan; start/end_month format 'YYYY-MM'"""
+    where, params = _agg_where(
+        "Bulan", start_month, end_month, provinsi, kabupaten
+    )
+    return _fetch_agg(
+        f"SELECT * FROM `{AGG_BULANAN}`{where} ORDER BY `Bulan`",
+        tuple(params)
+    )
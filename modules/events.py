@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from modules.utils import parse_date_series, safe_float_series
+
+# ======================== MODEL KEJADIAN BERTIPE ========================
+# Representasi kolomnar kejadian rob, dibuat SEKALI di batas modules.crud:
+# - Provinsi / Kabupaten / Kecamatan → category
+# - Latitude / Longitude             → float32 (NaN jika tidak valid)
+# - Tanggal                          → datetime64[ns] (NaT jika tidak valid)
+# - Ketinggian_cm                    → float32 (angka dari teks Ketinggian)
+# Teks asli (`Ketinggian`, `Dampak`, dst.) tetap disimpan apa adanya.
+# Konsumen (peta, PDF, statistik) tidak perlu parse ulang per baris.
+
+CATEGORICAL_COLUMNS = ["Provinsi", "Kabupaten", "Kecamatan"]
+COORD_COLUMNS = ["Latitude", "Longitude"]
+HEIGHT_COLUMN = "Ketinggian_cm"
+
+_NUMBER_PATTERN = r"(\d+(?:[.,]\d+)?)"
+
+
+def extract_ketinggian(series):
+    """
+    Versi vektor dari utils.parse_ketinggian:
+    angka terbesar di tiap teks `Ketinggian` (cm), NaN jika tidak ada.
+    """
+    s = series.astype("string")
+    nums = s.str.extractall(_NUMBER_PATTERN)[0]
+    if nums.empty:
+        return pd.Series(np.nan, index=series.index, dtype="float64")
+
+    values = pd.to_numeric(nums.str.replace(",", ".", regex=False),
+                           errors="coerce")
+    return values.groupby(level=0).max().reindex(series.index)
+
+
+def is_event_frame(df):
+    return isinstance(df, pd.DataFrame) and df.attrs.get("typed_events", False)
+
+
+def to_event_frame(data):
+    """
+    list[dict] / DataFrame mentah → DataFrame kejadian bertipe.
+    Idempoten: frame yang sudah bertipe dikembalikan apa adanya.
+    """
+    if is_event_frame(data):
+        return data
+
+    df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+    out = df.copy(deep=False)
+
+    if "No" in out:
+        out["No"] = pd.to_numeric(out["No"], errors="coerce").astype("Int64")
+
+    if "Tanggal" in out:
+        out["Tanggal"] = parse_date_series(out["Tanggal"])
+
+    for col in COORD_COLUMNS:
+        if col in out:
+            out[col] = safe_float_series(out[col]).astype("float32")
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in out:
+            out[col] = out[col].astype("category")
+
+    if "Ketinggian" in out:
+        out[HEIGHT_COLUMN] = extract_ketinggian(out["Ketinggian"]).astype("float32")
+
+    out.attrs["typed_events"] = True
+    return out
+
+
+def valid_coords_mask(df):
+    """Boolean mask baris dengan koordinat valid"""
+    return df["Latitude"].notna().to_numpy() & df["Longitude"].notna().to_numpy()
+
+
+def format_tanggal(val, fmt="%Y-%m-%d"):
+    """Tanggal (Timestamp / date / str) → teks untuk tampilan & nama file"""
+    if val is None or val is pd.NaT:
+        return ""
+    if isinstance(val, float) and np.isnan(val):
+        return ""
+    if hasattr(val, "strftime"):
+        return val.strftime(fmt)
+    return str(val)
+
+
+def to_display_record(row):
+    """
+    Satu baris frame bertipe → dict teks untuk PDF / tampilan
+    (tanggal diformat, NaN → None, kategori → str).
+    """
+    rec = dict(row)
+    for key, val in rec.items():
+        if key == "Tanggal":
+            rec[key] = format_tanggal(val) or None
+        elif isinstance(val, (float, np.floating)) and np.isnan(val):
+            rec[key] = None
+        elif val is pd.NA or val is pd.NaT:
+            rec[key] = None
+        elif isinstance(val, np.floating):
+            # float32 → float tanpa ekor presisi (-6.2, bukan -6.1999998)
+            rec[key] = round(float(val), 6)
+        elif isinstance(val, np.integer):
+            rec[key] = int(val)
+    return rec
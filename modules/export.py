@@ -0,0 +1,199 @@
+# modules/export.py
+import csv
+import gzip
+import io
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+
+from modules import crud
+from modules.events import HEIGHT_COLUMN
+from modules.utils import parse_ketinggian, safe_float
+
+# =====================================================
+# FORMAT EXPORT
+# =====================================================
+EXPORT_FORMATS = {
+    "csv": {"label": "CSV", "ext": "csv", "mime": "text/csv"},
+    "csv_gz": {"label": "CSV (gzip)", "ext": "csv.gz", "mime": "application/gzip"},
+    "xlsx": {
+        "label": "Excel (XLSX)",
+        "ext": "xlsx",
+        "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    },
+    "parquet": {
+        "label": "Parquet",
+        "ext": "parquet",
+        "mime": "application/vnd.apache.parquet",
+    },
+}
+
+# File kecil tetap di memori, besar otomatis pindah ke disk
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# Export menulis nilai TERSIMPAN apa adanya (kolom crud.COLUMNS).
+# Kolom turunan Ketinggian_cm hanya jika diminta (with_height=True).
+_HEIGHT_INDEX = crud.COLUMNS.index("Ketinggian")
+
+
+def export_columns(with_height=False):
+    return crud.COLUMNS + ([HEIGHT_COLUMN] if with_height else [])
+
+
+def _with_height(batches):
+    """Tambahkan ketinggian numerik (cm) di akhir tiap baris"""
+    for rows in batches:
+        yield [r + (parse_ketinggian(r[_HEIGHT_INDEX]),) for r in rows]
+
+
+def _cell(val):
+    """Nilai sel untuk CSV / XLSX"""
+    if val is None:
+        return ""
+    if isinstance(val, Decimal):
+        return float(val)
+    if isinstance(val, (date, datetime)):
+        return val.isoformat()
+    return val
+
+
+# =====================================================
+# WRITER PER FORMAT (STREAMING PER BATCH)
+# =====================================================
+def _write_csv(batches, out, columns):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    writer = csv.writer(text, lineterminator="\n")
+    writer.writerow(columns)
+
+    n = 0
+    for rows in batches:
+        writer.writerows([_cell(v) for v in r] for r in rows)
+        n += len(rows)
+
+    text.flush()
+    text.detach()  # jangan tutup `out`
+    return n
+
+
+def _write_csv_gz(batches, out, columns):
+    with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) as gz:
+        return _write_csv(batches, gz, columns)
+
+
+def _write_xlsx(batches, out, columns):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("Export XLSX membutuhkan paket openpyxl")
+
+    # write_only → baris langsung di-stream ke file sementara openpyxl
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Banjir Rob")
+    ws.append(columns)
+
+    n = 0
+    for rows in batches:
+        for r in rows:
+            ws.append([_cell(v) for v in r])
+        n += len(rows)
+
+    wb.save(out)
+    return n
+
+
+def _to_float(val, name, row):
+    """Nilai numerik Parquet; teks tak terbaca → error (bukan kosong diam-diam)"""
+    if val is None or val == "":
+        return None
+    num = safe_float(val, None)
+    if num is None:
+        raise RuntimeError(
+            f"Kolom {name} No={row[0]} tidak numerik ({val!r}); "
+            f"gunakan export CSV / XLSX untuk nilai apa adanya"
+        )
+    return num
+
+
+def _write_parquet(batches, out, columns):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Export Parquet membutuhkan paket pyarrow")
+
+    numeric = {
+        "No": pa.int64(),
+        "Latitude": pa.float64(),
+        "Longitude": pa.float64(),
+        HEIGHT_COLUMN: pa.float64(),
+    }
+    schema = pa.schema([
+        (c, numeric.get(c, pa.string())) for c in columns
+    ])
+
+    def column(rows, i, name):
+        if name == "No":
+            return [int(r[i]) if r[i] is not None else None for r in rows]
+        if name in numeric:
+            return [_to_float(r[i], name, r) for r in rows]
+        return [
+            None if r[i] is None
+            else r[i].isoformat() if isinstance(r[i], (date, datetime))
+            else str(r[i])
+            for r in rows
+        ]
+
+    n = 0
+    writer = pq.ParquetWriter(out, schema, compression="zstd")
+    try:
+        for rows in batches:
+            arrays = [
+                pa.array(column(rows, i, name), type=schema.field(name).type)
+                for i, name in enumerate(columns)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            n += len(rows)
+    finally:
+        writer.close()
+    return n
+
+
+_WRITERS = {
+    "csv": _write_csv,
+    "csv_gz": _write_csv_gz,
+    "xlsx": _write_xlsx,
+    "parquet": _write_parquet,
+}
+
+
+# =====================================================
+# API
+# =====================================================
+def export_filtered(fmt, out, batch_size=5000, with_height=False, **filters):
+    """
+    Tulis data terfilter ke file-like biner `out` secara streaming.
+    Nilai ditulis seperti tersimpan di database; with_height=True
+    menambah kolom turunan Ketinggian_cm (angka dari teks Ketinggian).
+    filters: start_date, end_date, provinsi, kabupaten, kecamatan
+    Return: jumlah baris
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Format export tidak dikenal: {fmt}")
+
+    batches = crud.iter_filtered_batches(batch_size=batch_size, **filters)
+    if with_height:
+        batches = _with_height(batches)
+    return _WRITERS[fmt](batches, out, export_columns(with_height))
+
+
+def export_to_file(fmt, batch_size=5000, with_height=False, **filters):
+    """
+    Export on-demand ke SpooledTemporaryFile (pindah ke disk jika besar).
+    Return: (file, jumlah_baris) — file sudah di-seek ke awal.
+    """
+    tmp = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    n = export_filtered(
+        fmt, tmp, batch_size=batch_size, with_height=with_height, **filters
+    )
+    tmp.seek(0)
+    return tmp, n
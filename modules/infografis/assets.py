@@ -0,0 +1,80 @@
+from pathlib import Path
+from functools import lru_cache
+import threading
+
+from matplotlib import font_manager
+from PIL import Image, ImageFont
+
+# ============================================================
+# ASSET REGISTRY (BACKGROUND + FONT)
+# ============================================================
+# Background di-decode sekali ke RGBA dan disimpan di memori.
+# Kunci cache memakai (mtime_ns, size) file → otomatis invalid
+# bila file background / font diganti.
+
+DEFAULT_FONT_FAMILY = "DejaVu Sans"
+
+_lock = threading.Lock()
+_backgrounds = {}
+
+
+def _file_key(path):
+    st = Path(path).stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def get_background(path):
+    """
+    Background RGBA ter-cache.
+    ⚠️ Image dipakai bersama → JANGAN digambar langsung, pakai .copy()
+    """
+    path = Path(path)
+
+    if not path.exists():
+        raise FileNotFoundError(f"Background tidak ditemukan: {path}")
+
+    key = _file_key(path)
+
+    with _lock:
+        cached = _backgrounds.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+    img = Image.open(path).convert("RGBA")
+    img.load()
+
+    with _lock:
+        _backgrounds[path] = (key, img)
+
+    return img
+
+
+@lru_cache(maxsize=8)
+def _resolve_font_path(family, weight):
+    return font_manager.findfont(
+        font_manager.FontProperties(family=family, weight=weight)
+    )
+
+
+def get_font_path(family=DEFAULT_FONT_FAMILY, weight="normal"):
+    """Path font TTF (findfont hanya sekali per family & weight)"""
+    return _resolve_font_path(family, weight)
+
+
+@lru_cache(maxsize=64)
+def _load_font(font_path, size, file_key):
+    return ImageFont.truetype(font_path, size)
+
+
+def get_font(size, font_path=None):
+    """FreeTypeFont ter-memoize per (font, ukuran)"""
+    font_path = font_path or get_font_path()
+    return _load_font(font_path, int(size), _file_key(font_path))
+
+
+def clear_cache():
+    """Kosongkan seluruh cache asset (mis. setelah deploy asset baru)"""
+    with _lock:
+        _backgrounds.clear()
+    _resolve_font_path.cache_clear()
+    _load_font.cache_clear()
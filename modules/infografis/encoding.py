@@ -0,0 +1,163 @@
+import io
+import time
+from pathlib import Path
+
+from PIL import Image
+
+# ============================================================
+# OUTPUT PROFILE
+# ============================================================
+# - png          : PNG kompresi cepat (zlib level 1), lossless
+# - png_palette  : PNG 256 warna (quantize), file jauh lebih kecil
+# - webp / jpeg  : untuk kanal pesan (WhatsApp, Telegram, dll)
+# - svg / pdf    : vektor (vector.py) — tajam di semua ukuran, file kecil
+
+OUTPUT_PROFILES = {
+    "png": {
+        "format": "PNG",
+        "ext": "png",
+        "mime": "image/png",
+        "options": {"compress_level": 1, "dpi": (300, 300)},
+    },
+    "png_palette": {
+        "format": "PNG",
+        "ext": "png",
+        "mime": "image/png",
+        "quantize": 256,
+        "options": {"optimize": True, "dpi": (300, 300)},
+    },
+    "webp": {
+        "format": "WEBP",
+        "ext": "webp",
+        "mime": "image/webp",
+        "options": {"quality": 85, "method": 4},
+    },
+    "jpeg": {
+        "format": "JPEG",
+        "ext": "jpg",
+        "mime": "image/jpeg",
+        "mode": "RGB",
+        "options": {"quality": 88, "optimize": True, "dpi": (300, 300)},
+    },
+    "svg": {
+        "format": "SVG",
+        "ext": "svg",
+        "mime": "image/svg+xml",
+        "vector": True,
+    },
+    "pdf": {
+        "format": "PDF",
+        "ext": "pdf",
+        "mime": "application/pdf",
+        "vector": True,
+    },
+}
+
+DEFAULT_PROFILE = "png"
+
+
+def get_profile(name=None):
+    name = name or DEFAULT_PROFILE
+    if name not in OUTPUT_PROFILES:
+        raise ValueError(
+            f"Output profile tidak dikenal: {name} "
+            f"(pilihan: {', '.join(OUTPUT_PROFILES)})"
+        )
+    return OUTPUT_PROFILES[name]
+
+
+def _prepare(img, profile):
+    if profile.get("mode") == "RGB" and img.mode != "RGB":
+        # Ratakan alpha ke latar putih (JPEG tidak punya kanal alpha)
+        flat = Image.new("RGB", img.size, (255, 255, 255))
+        flat.paste(img, mask=img.getchannel("A") if "A" in img.getbands() else None)
+        return flat
+
+    if profile.get("quantize"):
+        return img.quantize(
+            colors=profile["quantize"],
+            method=Image.Quantize.FASTOCTREE
+        )
+
+    return img
+
+
+# ============================================================
+# ENCODE SEKALI → BYTES DIPAKAI UNTUK DISK & DOWNLOAD
+# ============================================================
+
+def encode_image(img, profile=None):
+    """
+    Encode PIL.Image sesuai output profile.
+
+    Return:
+    {
+        profile: str,
+        data: bytes,
+        ext: str,
+        mime: str,
+        size_bytes: int,
+        encode_time: float (detik)
+    }
+    """
+    name = profile or DEFAULT_PROFILE
+    prof = get_profile(name)
+
+    if prof.get("vector"):
+        raise ValueError(f"Profile {name} vektor, pakai encode_vector")
+
+    t0 = time.perf_counter()
+    buf = io.BytesIO()
+    _prepare(img, prof).save(buf, format=prof["format"], **prof["options"])
+    data = buf.getvalue()
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "profile": name,
+        "data": data,
+        "ext": prof["ext"],
+        "mime": prof["mime"],
+        "size_bytes": len(data),
+        "encode_time": elapsed,
+    }
+
+
+def encode_vector(docs, profile):
+    """
+    Encode dokumen vektor [utama, legenda lanjutan...].
+    - svg : satu file per dokumen → legenda lanjutan di `pages`
+    - pdf : semua dokumen jadi halaman dalam SATU file, `pages` kosong
+
+    Return: dict seperti encode_image + pages: [bytes]
+    """
+    from .vector import to_pdf, to_svg
+
+    prof = get_profile(profile)
+    if not prof.get("vector"):
+        raise ValueError(f"Profile {profile} bukan vektor")
+
+    t0 = time.perf_counter()
+    if prof["format"] == "PDF":
+        data, pages = to_pdf(docs), []
+    else:
+        data, pages = to_svg(docs[0]), [to_svg(d) for d in docs[1:]]
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "profile": profile,
+        "data": data,
+        "ext": prof["ext"],
+        "mime": prof["mime"],
+        "size_bytes": len(data),
+        "encode_time": elapsed,
+        "pages": pages,
+    }
+
+
+def write_encoded(encoded, path):
+    """Tulis bytes hasil encode ke disk. Return False jika gagal (read-only)."""
+    try:
+        Path(path).write_bytes(encoded["data"])
+        return True
+    except OSError:
+        return False
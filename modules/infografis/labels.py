@@ -0,0 +1,125 @@
+from collections import defaultdict
+
+# ============================================================
+# LABEL PLACEMENT (ANTI TABRAKAN)
+# ============================================================
+# Semua perhitungan di koordinat piksel (display), sehingga bisa
+# dipakai backend matplotlib maupun backend raster.
+# Kotak label yang sudah ditempatkan disimpan di spatial grid (hash
+# per sel) → cek tabrakan hanya ke tetangga, bukan ke semua label.
+
+# Arah kandidat (dx, dy) — urutan = prioritas
+DIRECTIONS = (
+    (1.0, 1.0), (-1.0, 1.0), (1.0, -1.0), (-1.0, -1.0),
+    (1.4, 0.0), (-1.4, 0.0), (0.0, 1.4), (0.0, -1.4),
+)
+RADIUS_STEPS = (1.0, 1.6, 2.3, 3.2)
+
+# Offset dasar label dari titik (point): kanan-atas
+LABEL_OFFSET_PT = (34.0, 20.0)
+
+
+def label_offset(px_per_pt, y_down):
+    """
+    Offset dasar (dx, dy) piksel untuk place_labels.
+    "Atas" = +y di koordinat display matplotlib (y ke atas), tetapi -y
+    di gambar raster (y ke bawah) → dy dibalik agar kedua backend sama.
+    """
+    dx, dy = LABEL_OFFSET_PT
+    return dx * px_per_pt, (-dy if y_down else dy) * px_per_pt
+
+
+class LabelGrid:
+    """Spatial grid untuk bounding box (x0, y0, x1, y1)"""
+
+    def __init__(self, cell_size):
+        self.cell = max(float(cell_size), 1.0)
+        self.cells = defaultdict(list)
+
+    def _keys(self, box):
+        c = self.cell
+        x0, y0, x1, y1 = box
+        for ix in range(int(x0 // c), int(x1 // c) + 1):
+            for iy in range(int(y0 // c), int(y1 // c) + 1):
+                yield ix, iy
+
+    def add(self, box):
+        for key in self._keys(box):
+            self.cells[key].append(box)
+
+    def overlap_area(self, box):
+        x0, y0, x1, y1 = box
+        total = 0.0
+        seen = set()
+        for key in self._keys(box):
+            for other in self.cells.get(key, ()):
+                if id(other) in seen:
+                    continue
+                seen.add(id(other))
+                w = min(x1, other[2]) - max(x0, other[0])
+                h = min(y1, other[3]) - max(y0, other[1])
+                if w > 0 and h > 0:
+                    total += w * h
+        return total
+
+
+def _box(cx, cy, w, h):
+    return (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)
+
+
+def place_labels(anchors, sizes, base_offset=(46.0, 26.0),
+                 anchor_size=10.0, bounds=None):
+    """
+    Pilih posisi pusat label (piksel) yang tidak saling tumpang tindih.
+
+    anchors     : [(x, y)] titik lokasi (piksel)
+    sizes       : [(w, h)] ukuran kotak label (piksel)
+    base_offset : jarak dasar (dx, dy) label dari titik
+    bounds      : (x0, y0, x1, y1) area gambar; kandidat di luar ditolak
+    Return      : [(lx, ly)] sejajar dengan anchors
+    """
+    if not anchors:
+        return []
+
+    max_w = max(w for w, _ in sizes)
+    max_h = max(h for _, h in sizes)
+    grid = LabelGrid(max(max_w, max_h))
+
+    # Titik lokasi juga rintangan → label tidak menutupi titik lain
+    half = anchor_size / 2
+    for x, y in anchors:
+        grid.add((x - half, y - half, x + half, y + half))
+
+    bx, by = base_offset
+    placed = []
+
+    for (x, y), (w, h) in zip(anchors, sizes):
+        best, best_cost = None, None
+
+        for step in RADIUS_STEPS:
+            for dx, dy in DIRECTIONS:
+                cx = x + dx * bx * step
+                cy = y + dy * by * step
+                box = _box(cx, cy, w, h)
+
+                if bounds and (
+                    box[0] < bounds[0] or box[1] < bounds[1]
+                    or box[2] > bounds[2] or box[3] > bounds[3]
+                ):
+                    continue
+
+                cost = grid.overlap_area(box)
+                if best_cost is None or cost < best_cost:
+                    best, best_cost = (cx, cy), cost
+                if cost == 0:
+                    break
+            if best_cost == 0:
+                break
+
+        if best is None:
+            best = (x + bx, y + by)
+
+        grid.add(_box(best[0], best[1], w, h))
+        placed.append(best)
+
+    return placed
@@ -0,0 +1,144 @@
+import math
+from functools import lru_cache
+
+from .assets import get_font
+
+# ============================================================
+# LEGEND LAYOUT ENGINE
+# ============================================================
+# - Ukuran teks diukur sekali per (teks, ukuran font) → cache getbbox
+# - Pilih ukuran font terbesar + kolom paling sedikit yang muat
+# - Batas kolom diturunkan dari lebar panel ÷ (label terlebar + gutter),
+#   bukan konstanta → nama pendek memakai seluruh lebar panel
+# - Jika tetap tidak muat di ukuran terkecil → pecah ke beberapa halaman
+# Kompleksitas linear terhadap jumlah entri (jumlah ukuran font konstan).
+
+DEFAULT_SIZES = (42, 38, 34, 30, 26, 22)
+COL_GUTTER = 20
+
+
+@lru_cache(maxsize=16384)
+def measure_text(text, size, font_path):
+    """Lebar & tinggi teks (px) dari getbbox, ter-cache"""
+    x0, y0, x1, y1 = get_font(size, font_path).getbbox(text)
+    return x1 - x0, y1 - y0
+
+
+def _fit_text(text, max_width, size, font_path):
+    """Potong teks dengan elipsis agar muat di kolom"""
+    if measure_text(text, size, font_path)[0] <= max_width:
+        return text
+
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if measure_text(text[:mid] + "…", size, font_path)[0] <= max_width:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + "…"
+
+
+def layout_legend(
+    labels,
+    width,
+    font_path,
+    height=None,
+    max_height=None,
+    top=150,
+    bottom=40,
+    margin_x=40,
+    sizes=DEFAULT_SIZES,
+    line_height=1.25,
+    max_cols=None,
+):
+    """
+    Hitung tata letak legenda.
+
+    height     : tinggi panel tetap (mis. setinggi background), atau
+    max_height : batas tinggi; panel menyusut mengikuti isi.
+    max_cols   : batas kolom tambahan (opsional); default hanya dibatasi
+                 lebar panel ÷ (label terlebar + COL_GUTTER)
+
+    Return dict: size, cols, col_width, row_height, rows_per_page,
+                 height, pages (list[list[str]])
+    """
+    if height is None and max_height is None:
+        raise ValueError("height atau max_height wajib diisi")
+
+    labels = list(labels)
+    n = len(labels)
+    limit = height or max_height
+    usable_w = width - 2 * margin_x
+    usable_h = limit - top - bottom
+
+    def fit(size):
+        """(kolom maks. yang muat — 0 jika satu kolom pun tidak —,
+        tinggi baris, baris tersedia)"""
+        row_h = int(round(size * line_height))
+        widest = max(
+            (measure_text(t, size, font_path)[0] for t in labels),
+            default=0
+        )
+        cols_fit = usable_w // (widest + COL_GUTTER)
+        if max_cols:
+            cols_fit = min(cols_fit, max_cols)
+        return cols_fit, row_h, max(usable_h // row_h, 1)
+
+    chosen = None
+    for size in sizes:
+        cols_fit, row_h, rows_avail = fit(size)
+        # Kolom paling sedikit yang menampung semua entri di satu halaman
+        cols = max(math.ceil(n / rows_avail), 1)
+        if cols <= cols_fit:
+            chosen = (size, cols, row_h, rows_avail)
+            break
+
+    if chosen is None:
+        # Overflow → ukuran terkecil, kolom maksimal yang masih muat
+        # (label terlalu panjang dipotong elipsis oleh _fit_text)
+        size = sizes[-1]
+        cols_fit, row_h, rows_avail = fit(size)
+        chosen = (size, max(cols_fit, 1), row_h, rows_avail)
+
+    size, cols, row_h, rows_avail = chosen
+    col_w = usable_w // cols
+    per_page = cols * rows_avail
+
+    fitted = [_fit_text(t, col_w - COL_GUTTER, size, font_path) for t in labels]
+    pages = [
+        fitted[i:i + per_page] for i in range(0, max(n, 1), per_page)
+    ]
+
+    if height is not None:
+        panel_h = height
+    else:
+        rows_used = math.ceil(min(n, per_page) / cols) if n else 0
+        panel_h = min(max_height, top + rows_used * row_h + bottom)
+
+    return {
+        "size": size,
+        "cols": cols,
+        "col_width": col_w,
+        "row_height": row_h,
+        "rows_per_page": rows_avail,
+        "height": panel_h,
+        "pages": pages,
+    }
+
+
+def draw_legend_items(draw, items, layout, font_path, x0=40, y0=150,
+                      fill="white"):
+    """Gambar satu halaman entri legenda (row-major)"""
+    font = get_font(layout["size"], font_path)
+    cols = layout["cols"]
+
+    for i, text in enumerate(items):
+        col = i % cols
+        row = i // cols
+        draw.text(
+            (x0 + col * layout["col_width"], y0 + row * layout["row_height"]),
+            text,
+            fill=fill,
+            font=font
+        )
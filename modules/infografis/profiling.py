@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+# ============================================================
+# STAGE RECORDER (OPT-IN)
+# ============================================================
+# Dipakai engine, service & benchmark untuk mencatat per tahap render:
+# wall time, CPU time, dan selisih memori (RSS).
+# Jika recorder=None → tanpa overhead (nullcontext).
+
+logger = logging.getLogger("infografis.profiling")
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+
+
+def current_rss():
+    """RSS proses saat ini (byte), None jika tidak didukung OS"""
+    if _PAGE_SIZE is None:
+        return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StageRecorder:
+    """Catat wall time, CPU time & delta RSS per tahap (urutan dipertahankan)"""
+
+    def __init__(self, name="infografis"):
+        self.name = name
+        self.stages = []
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        rss0 = current_rss()
+        cpu0 = time.process_time()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            t1 = time.perf_counter()
+            rss1 = current_rss()
+            self.stages.append({
+                "stage": name,
+                "start": t0 - self._t0,
+                "wall": t1 - t0,
+                "cpu": time.process_time() - cpu0,
+                "mem_delta": (
+                    rss1 - rss0 if rss0 is not None and rss1 is not None
+                    else None
+                ),
+                "thread": threading.get_ident(),
+            })
+
+    def totals(self):
+        """Total wall time per nama tahap"""
+        out = {}
+        for s in self.stages:
+            out[s["stage"]] = out.get(s["stage"], 0.0) + s["wall"]
+        return out
+
+    # ========================================================
+    # EXPORT
+    # ========================================================
+    def to_dict(self):
+        """Ringkasan untuk result dict service (detik / byte)"""
+        return {
+            "stages": [
+                {
+                    "stage": s["stage"],
+                    "wall": round(s["wall"], 6),
+                    "cpu": round(s["cpu"], 6),
+                    "mem_delta": s["mem_delta"],
+                }
+                for s in self.stages
+            ],
+            "total_wall": round(sum(s["wall"] for s in self.stages), 6),
+            "rss": current_rss(),
+        }
+
+    def log_json(self, level=logging.INFO, **extra):
+        """Satu baris log JSON per tahap (structured logging)"""
+        for s in self.stages:
+            logger.log(level, json.dumps({
+                "event": "render_stage",
+                "render": self.name,
+                "stage": s["stage"],
+                "wall_ms": round(s["wall"] * 1000, 3),
+                "cpu_ms": round(s["cpu"] * 1000, 3),
+                "mem_delta": s["mem_delta"],
+                **extra,
+            }))
+
+    def write_chrome_trace(self, path):
+        """Tulis file trace (buka di chrome://tracing atau Perfetto)"""
+        pid = os.getpid()
+        events = [
+            {
+                "name": s["stage"],
+                "cat": self.name,
+                "ph": "X",
+                "ts": round(s["start"] * 1e6, 1),
+                "dur": round(s["wall"] * 1e6, 1),
+                "pid": pid,
+                "tid": s["thread"],
+                "args": {
+                    "cpu_ms": round(s["cpu"] * 1000, 3),
+                    "mem_delta": s["mem_delta"],
+                },
+            }
+            for s in self.stages
+        ]
+        Path(path).write_text(json.dumps({"traceEvents": events}))
+        return str(path)
+
+
+def stage(recorder, name):
+    """Context manager tahap; aman dipanggil dengan recorder=None"""
+    if recorder is None:
+        return nullcontext()
+    return recorder.stage(name)
@@ -0,0 +1,271 @@
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw
+
+from .assets import get_font, get_font_path
+from .labels import label_offset, place_labels
+
+# ============================================================
+# BACKEND RASTER (TANPA CARTOPY / MATPLOTLIB)
+# ============================================================
+# Engine hanya memakai PlateCarree (lon/lat = identitas), sehingga
+# polygon cukup dipetakan linear ke piksel lalu digambar Pillow.
+# Anti-alias: mask digambar SUPERSAMPLE× lebih besar lalu reduce()
+# (rata-rata kotak) sebelum di-alpha-composite ke kanvas.
+# Ketebalan garis / ukuran font dalam "point" seperti matplotlib,
+# dikonversi lewat dpi viewport → tampilan setara backend matplotlib.
+
+EXTENT_INDONESIA = (94.0, 142.0, -12.0, 8.0)  # (lon0, lon1, lat0, lat1)
+SUPERSAMPLE = 3
+
+# Pola garis "--" matplotlib (dash, gap) dalam kelipatan linewidth
+DASHED = (3.7, 1.6)
+
+
+def content_extent(bounds, extent=EXTENT_INDONESIA):
+    """Extent isi data (minx, miny, maxx, maxy) yang dipotong ke `extent`"""
+    x0, y0, x1, y1 = bounds
+    return (
+        max(float(x0), extent[0]),
+        min(float(x1), extent[1]),
+        max(float(y0), extent[2]),
+        min(float(y1), extent[3]),
+    )
+
+
+def make_viewport(extent, width, fig_width_in, height=None, ss=SUPERSAMPLE):
+    """
+    Viewport piksel untuk extent (lon0, lon1, lat0, lat1), dipakai
+    kedua backend (matplotlib: ukuran figure; raster: ukuran kanvas).
+    fig_width_in: lebar peta dalam inch → dpi efektif (point → piksel)
+    height=None  : mengikuti rasio aspek extent (tanpa distorsi)
+    """
+    x0, x1, y0, y1 = extent
+    width = int(round(width))
+    if height is None:
+        height = int(round(width * (y1 - y0) / (x1 - x0)))
+
+    return {
+        "extent": extent,
+        "width": width,
+        "height": int(height),
+        "ss": int(ss),
+        "dpi": width / float(fig_width_in),
+        "sx": width / (x1 - x0),
+        "sy": height / (y1 - y0),
+    }
+
+
+def to_pixels(coords, vp, scale=1):
+    """lon/lat (N, 2) → piksel (N, 2); y ke bawah seperti gambar"""
+    coords = np.asarray(coords, dtype="float64").reshape(-1, 2)
+    x0, _, _, y1 = vp["extent"]
+    px = np.empty_like(coords)
+    px[:, 0] = (coords[:, 0] - x0) * vp["sx"] * scale
+    px[:, 1] = (y1 - coords[:, 1]) * vp["sy"] * scale
+    return px
+
+
+def pt_to_px(points, vp, scale=1):
+    return points * vp["dpi"] / 72.0 * scale
+
+
+def _rgb(color):
+    return ImageColor.getrgb(color)[:3]
+
+
+def _composite(canvas, mask, color, alpha, ss):
+    """Mask supersample → reduce (anti-alias) → alpha composite warna"""
+    if ss > 1:
+        mask = mask.reduce(ss)
+    if alpha < 1:
+        mask = mask.point([int(v * alpha) for v in range(256)])
+
+    layer = Image.new("RGBA", canvas.size, _rgb(color) + (255,))
+    layer.putalpha(mask)
+    canvas.alpha_composite(layer)
+
+
+def _dash_segments(pts, dash, gap):
+    """Pecah polyline (N, 2) menjadi potongan garis putus-putus"""
+    seg = np.hypot(*np.diff(pts, axis=0).T)
+    cum = np.concatenate(([0.0], np.cumsum(seg)))
+    total = cum[-1]
+    if total <= 0:
+        return []
+
+    starts = np.arange(0.0, total, dash + gap)
+    ends = np.minimum(starts + dash, total)
+    i_start = np.searchsorted(cum, starts, side="right")
+    i_end = np.searchsorted(cum, ends, side="left")
+
+    out = []
+    for s, e, a, b in zip(starts, ends, i_start, i_end):
+        xs = np.concatenate(([s], cum[a:b], [e]))
+        out.append(np.column_stack((
+            np.interp(xs, cum, pts[:, 0]),
+            np.interp(xs, cum, pts[:, 1]),
+        )))
+    return out
+
+
+# ============================================================
+# POLYGON
+# ============================================================
+
+def draw_polygons(canvas, rings, vp, select=None, fill=None, outline=None,
+                  linewidth=0.0, linestyle="-", alpha=1.0):
+    """
+    Gambar polygon (hasil spatial.flatten_rings) ke kanvas RGBA.
+
+    select    : mask bool per geometri (None = semua)
+    linewidth : ketebalan garis tepi (point)
+    linestyle : "-" atau "--"
+    """
+    ss = vp["ss"]
+    size = (vp["width"] * ss, vp["height"] * ss)
+
+    ring_sel = np.ones(len(rings["owner"]), dtype=bool)
+    if select is not None:
+        ring_sel = np.asarray(select, dtype=bool)[rings["owner"]]
+
+    if not ring_sel.any():
+        return
+
+    pts = to_pixels(rings["coords"], vp, scale=ss)
+    offsets = rings["offsets"]
+
+    def ring(i):
+        return pts[offsets[i]:offsets[i + 1]]
+
+    if fill:
+        mask = Image.new("L", size, 0)
+        draw = ImageDraw.Draw(mask)
+        ext, holed = rings["exterior"], rings["holed"]
+
+        # Ring luar ber-lubang → lubang → ring luar sederhana
+        # (enclave di dalam lubang digambar ulang di pass terakhir)
+        for sel, value in (
+            (ring_sel & ext & holed, 255),
+            (ring_sel & ~ext, 0),
+            (ring_sel & ext & ~holed, 255),
+        ):
+            for i in np.flatnonzero(sel):
+                p = ring(i)
+                if len(p) >= 3:
+                    draw.polygon(p.ravel().tolist(), fill=value)
+
+        _composite(canvas, mask, fill, alpha, ss)
+
+    if outline and linewidth > 0:
+        mask = Image.new("L", size, 0)
+        draw = ImageDraw.Draw(mask)
+        width_px = pt_to_px(linewidth, vp, scale=ss)
+        dash = None
+        if linestyle == "--":
+            dash = (DASHED[0] * width_px, DASHED[1] * width_px)
+
+        for i in np.flatnonzero(ring_sel):
+            p = ring(i)
+            parts = _dash_segments(p, *dash) if dash else [p]
+            for part in parts:
+                if len(part) >= 2:
+                    draw.line(part.ravel().tolist(), fill=255,
+                              width=max(1, int(round(width_px))),
+                              joint="curve")
+
+        _composite(canvas, mask, outline, alpha, ss)
+
+
+# ============================================================
+# ANOTASI (TITIK + LEADER LINE + LABEL)
+# ============================================================
+
+def _arc(p0, p1, rad=0.15, n=16):
+    """Kurva bezier kuadratik setara connectionstyle arc3 (y ke bawah)"""
+    (x0, y0), (x1, y1) = p0, p1
+    dx, dy = x1 - x0, y1 - y0
+    cx, cy = (x0 + x1) / 2 - rad * dy, (y0 + y1) / 2 + rad * dx
+    t = np.linspace(0.0, 1.0, n)[:, None]
+    return ((1 - t) ** 2 * np.array([x0, y0])
+            + 2 * (1 - t) * t * np.array([cx, cy])
+            + t ** 2 * np.array([x1, y1]))
+
+
+def layout_annotations(anchors, names, vp, fontsize=12, pad=0.35):
+    """
+    Tata letak anotasi (piksel viewport), dipakai backend raster & vektor.
+    Return dict: anchors, positions, sizes, names, font, pad
+    """
+    font = get_font(pt_to_px(fontsize, vp), get_font_path(weight="bold"))
+    pad_px = pt_to_px(pad * fontsize, vp)
+
+    anchors_px = to_pixels(anchors, vp)
+    names = [str(n) for n in names]
+    boxes = [font.getbbox(n) for n in names]
+    sizes = [(b[2] - b[0] + 2 * pad_px, b[3] - b[1] + 2 * pad_px)
+             for b in boxes]
+
+    positions = place_labels(
+        [tuple(p) for p in anchors_px],
+        sizes,
+        base_offset=label_offset(vp["dpi"] / 72.0, y_down=True),
+        anchor_size=pt_to_px(14, vp),
+        bounds=(0, 0, vp["width"], vp["height"]),
+    )
+
+    return {
+        "anchors": anchors_px,
+        "positions": positions,
+        "sizes": sizes,
+        "names": names,
+        "font": font,
+        "pad": pad_px,
+    }
+
+
+def draw_annotations(canvas, anchors, names, vp, fontsize=12, pad=0.35,
+                     color="#C62828", box_color="#B71C1C"):
+    """Titik lokasi + label merah + leader line (BMKG style)"""
+    if not len(anchors):
+        return
+
+    ss = vp["ss"]
+    ann = layout_annotations(anchors, names, vp, fontsize, pad)
+    anchors_px, positions = ann["anchors"], ann["positions"]
+
+    # Garis, titik & kotak label di overlay supersample (anti-alias)
+    overlay = Image.new("RGBA", (vp["width"] * ss, vp["height"] * ss))
+    draw = ImageDraw.Draw(overlay)
+    line_w = max(1, int(round(pt_to_px(1.6, vp, scale=ss))))
+    radius = pt_to_px(np.sqrt(70.0) / 2, vp, scale=ss)
+    edge_w = max(1, int(round(pt_to_px(1.2, vp, scale=ss))))
+    line_rgb = _rgb(color)
+
+    for (x, y), (lx, ly) in zip(anchors_px, positions):
+        curve = _arc((x * ss, y * ss), (lx * ss, ly * ss))
+        draw.line(curve.ravel().tolist(), fill=line_rgb, width=line_w,
+                  joint="curve")
+
+    for x, y in anchors_px * ss:
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius),
+                     fill=line_rgb, outline="white", width=edge_w)
+
+    box_rgb = _rgb(box_color)
+    for (lx, ly), (w, h) in zip(positions, ann["sizes"]):
+        draw.rounded_rectangle(
+            ((lx - w / 2) * ss, (ly - h / 2) * ss,
+             (lx + w / 2) * ss, (ly + h / 2) * ss),
+            radius=ann["pad"] * ss,
+            fill=box_rgb,
+        )
+
+    canvas.alpha_composite(overlay.reduce(ss))
+
+    # Teks langsung di resolusi akhir (FreeType sudah anti-alias)
+    draw = ImageDraw.Draw(canvas)
+    for (lx, ly), name in zip(positions, ann["names"]):
+        draw.text((lx, ly), name, fill="white", font=ann["font"], anchor="mm")
+
+
+def new_canvas(vp):
+    return Image.new("RGBA", (vp["width"], vp["height"]), (0, 0, 0, 0))
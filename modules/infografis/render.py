@@ -0,0 +1,73 @@
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
+
+# ============================================================
+# RASTERISASI FIGURE (TANPA PNG ROUND-TRIP)
+# ============================================================
+
+def _alpha_bbox(alpha, pad):
+    """Bounding box piksel non-transparan (x0, y0, x1, y1) + padding"""
+    rows = np.flatnonzero(alpha.any(axis=1))
+    cols = np.flatnonzero(alpha.any(axis=0))
+
+    if rows.size == 0 or cols.size == 0:
+        return None
+
+    h, w = alpha.shape
+    return (
+        max(int(cols[0]) - pad, 0),
+        max(int(rows[0]) - pad, 0),
+        min(int(cols[-1]) + 1 + pad, w),
+        min(int(rows[-1]) + 1 + pad, h),
+    )
+
+
+def new_figure(width_px, height_px, width_in):
+    """
+    Figure yang dirender TEPAT width_px × height_px piksel.
+    width_in menentukan skala point → piksel (dpi = width_px / width_in),
+    jadi ukuran font & garis tetap sama berapa pun resolusi target.
+    """
+    dpi = width_px / float(width_in)
+    # +0.01 px: cegah int(inch * dpi) di Agg membulatkan ke bawah 1 piksel
+    return plt.figure(
+        figsize=((width_px + 0.01) / dpi, (height_px + 0.01) / dpi),
+        dpi=dpi,
+        facecolor="none",
+    )
+
+
+def figure_to_image(fig, dpi=150, transparent=True, tight=True, pad_inches=0.1):
+    """
+    Render figure matplotlib langsung di FigureCanvasAgg dan kembalikan
+    PIL.Image RGBA tanpa encode/decode PNG.
+
+    dpi=None → pakai dpi figure apa adanya (mis. dari new_figure).
+    Crop `tight` dihitung dari kanal alpha (NumPy), setara dengan
+    bbox_inches="tight" untuk figure transparan.
+    Figure TIDAK ditutup di sini — pemanggil tetap wajib plt.close(fig).
+    """
+    if transparent:
+        fig.patch.set_alpha(0)
+
+    if dpi is not None:
+        fig.set_dpi(dpi)
+    dpi = fig.dpi
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+
+    rgba = np.asarray(canvas.buffer_rgba())
+    h, w = rgba.shape[:2]
+
+    # Zero-copy: Image berbagi memori dengan buffer renderer Agg
+    img = Image.frombuffer("RGBA", (w, h), rgba, "raw", "RGBA", 0, 1)
+
+    if tight:
+        box = _alpha_bbox(rgba[..., 3], int(round(pad_inches * dpi)))
+        if box is not None and box != (0, 0, w, h):
+            # crop() menyalin region → aman walau figure ditutup setelahnya
+            return img.crop(box)
+
+    return img.copy()
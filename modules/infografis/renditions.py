@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from .encoding import encode_image
+
+# ============================================================
+# MULTI-RENDISI DARI SATU RENDER
+# ============================================================
+# Satu gambar final → beberapa ukuran untuk kanal distribusi.
+# Piramida satu arah: target diurutkan dari terbesar, tiap level
+# diperkecil dengan reduce(2) (rata-rata kotak, murah) selama masih
+# ≥ 2× target, lalu SATU resize LANCZOS ke ukuran akhir.
+# Level reduce dipakai ulang untuk target berikutnya (lebih kecil),
+# jadi gambar penuh hanya dibaca sekali.
+# Encode paralel di thread (Pillow melepas GIL saat encode).
+# Rendisi ukuran penuh dengan profil sama seperti file utama memakai
+# bytes hasil encode utama (primary) → tidak di-encode ulang.
+
+RENDITIONS = {
+    "print": {"label": "Cetak (ukuran penuh, PNG)", "width": None, "profile": "png"},
+    "web": {"label": "Web (1920 px, WebP)", "width": 1920, "profile": "webp"},
+    "whatsapp": {"label": "WhatsApp (1280 px, JPEG)", "width": 1280, "profile": "jpeg"},
+    "thumbnail": {"label": "Thumbnail (480 px, WebP)", "width": 480, "profile": "webp"},
+}
+
+MAX_WORKERS = 4
+
+
+def get_rendition(name):
+    if name not in RENDITIONS:
+        raise ValueError(
+            f"Rendisi tidak dikenal: {name} "
+            f"(pilihan: {', '.join(RENDITIONS)})"
+        )
+    return RENDITIONS[name]
+
+
+def build_pyramid(img, widths):
+    """
+    Turunkan gambar ke beberapa lebar sekaligus.
+    widths: iterable lebar target (None = ukuran asli)
+    Return: {lebar_target: PIL.Image}
+    """
+    out = {}
+    level = img
+
+    for width in sorted(set(widths), key=lambda w: -(w or img.width)):
+        if width is None or width >= img.width:
+            out[width] = img
+            continue
+
+        while level.width // 2 >= width:
+            level = level.reduce(2)
+
+        if level.width == width:
+            out[width] = level
+        else:
+            height = max(1, round(level.height * width / level.width))
+            out[width] = level.resize((width, height), Image.Resampling.LANCZOS)
+
+    return out
+
+
+def render_renditions(img, names, max_workers=MAX_WORKERS, primary=None):
+    """
+    Buat & encode semua rendisi dari satu gambar.
+    primary: hasil encode_image(img) yang sudah ada (opsional)
+    Return: list dict hasil encode_image + name, width, height
+    """
+    specs = [(name, get_rendition(name)) for name in names]
+    pyramid = build_pyramid(img, [spec["width"] for _, spec in specs])
+
+    def encode(item):
+        name, spec = item
+        scaled = pyramid[spec["width"]]
+        if (primary is not None and scaled is img
+                and primary["profile"] == spec["profile"]):
+            encoded = dict(primary, encode_time=0.0)
+        else:
+            encoded = encode_image(scaled, spec["profile"])
+        encoded.update(name=name, width=scaled.width, height=scaled.height)
+        return encoded
+
+    if len(specs) <= 1:
+        return [encode(item) for item in specs]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(specs))) as ex:
+        return list(ex.map(encode, specs))
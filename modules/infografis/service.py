@@ -1,12 +1,24 @@
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from modules.events import to_event_frame
 
 # ================= IMPORT ENGINE =================
 # Harian
 from .warningtools import plot_rob_affected_areas as plot_rob_harian
+from .warningtools import build_vector_document as vector_rob_harian
 
 # Bulanan
 from .warningtoolsmonthly import plot_rob_affected_areas as plot_rob_bulanan
+from .warningtoolsmonthly import build_vector_document as vector_rob_bulanan
+from .warningtoolsmonthly import plot_rob_comparison
+
+from .encoding import encode_image, encode_vector, get_profile, write_encoded
+from .profiling import StageRecorder, stage
+from .renditions import get_rendition, render_renditions
+from .timelapse import FPS, FRAME_WIDTH, TIMELAPSE_FORMATS, render_timelapse
 
 
 # ============================================================
@@ -24,6 +36,96 @@ OUTPUT_SEBARAN.mkdir(parents=True, exist_ok=True)
 OUTPUT_REKAP.mkdir(parents=True, exist_ok=True)
 
 
+def _render_raster(affected_areas, tanggal, rekap_bul, output_profile,
+                   save_path, recorder, backend, counts=None):
+    """
+    Render PIL.Image via engine lalu encode SEKALI.
+    Return: (PIL.Image, hasil encode, [halaman legenda lanjutan])
+    """
+
+    # ================= BULANAN =================
+    # save_path=None → engine tidak encode sendiri, service encode SEKALI
+    if rekap_bul:
+        final_img, legend_pages = plot_rob_bulanan(
+            affected_areas_list=affected_areas,
+            save_path=None,
+            tanggal_rekap=tanggal,
+            rekap_bul=True,
+            return_legend_pages=True,
+            recorder=recorder,
+            backend=backend,
+            counts=counts
+        )
+
+    # ================= HARIAN ==================
+    else:
+        final_img, legend_pages = plot_rob_harian(
+            affected_areas=affected_areas,
+            save_path=None,
+            tanggal_rekap=tanggal,
+            rekap_bul=False,
+            return_legend_pages=True,
+            recorder=recorder,
+            backend=backend
+        )
+
+    if final_img is None:
+        raise RuntimeError(
+            "plot_rob_* tidak mengembalikan PIL.Image"
+        )
+
+    # ========================================================
+    # ENCODE SEKALI → BYTES UNTUK DISK & DOWNLOAD
+    # ========================================================
+    with stage(recorder, "encode"):
+        encoded = encode_image(final_img, output_profile)
+
+        # Halaman legenda lanjutan (jika wilayah terlalu banyak)
+        pages = []
+        for no, page_img in enumerate(legend_pages, start=2):
+            page_enc = encode_image(page_img, output_profile)
+            pages.append({
+                "image": page_img,
+                "data": page_enc["data"],
+                "file_name": f"{save_path.stem}_legenda{no}.{page_enc['ext']}"
+            })
+
+    return final_img, encoded, pages
+
+
+def _save_legend_pages(pages, save_path):
+    """Tulis halaman legenda lanjutan di samping file utama (+ file_path)"""
+    for page in pages:
+        page_path = save_path.parent / page["file_name"]
+        page_saved = write_encoded(page, page_path)
+        page["file_path"] = str(page_path) if page_saved else None
+    return pages
+
+
+def _is_event_records(data):
+    return isinstance(data, pd.DataFrame) or (
+        isinstance(data, (list, tuple)) and bool(data)
+        and isinstance(data[0], dict)
+    )
+
+
+def areas_from_events(records):
+    """
+    Rekaman kejadian (list[dict] / DataFrame / frame bertipe) →
+    (nama kecamatan terdampak, {kecamatan: jumlah kejadian}) lewat
+    frame kejadian bertipe (kolom Kecamatan kategori, tanpa loop baris).
+    """
+    ev = to_event_frame(records)
+    if "Kecamatan" not in ev or ev.empty:
+        return [], {}
+
+    counts = ev["Kecamatan"].value_counts(sort=False)
+    counts = counts[counts > 0]
+    counts.index = counts.index.astype(str)
+    counts = counts[counts.index.str.strip() != ""]
+    return list(counts.index), {k: int(v) for k, v in counts.items()}
+
+
 # ============================================================
 # MAIN SERVICE
 # ============================================================
@@ -32,18 +134,57 @@ def generate_infografis_rob(
     affected_areas=None,
     tanggal=None,
     rekap_bul=False,
+    output_profile="png",
+    instrument=False,
+    trace_path=None,
+    log_stages=False,
+    backend=None,
+    renditions=None,
+    affected_counts=None,
     **kwargs
 ):
     """
     Generate infografis rob (harian / bulanan).
 
+    output_profile: png | png_palette | webp | jpeg | svg | pdf
+                    (lihat encoding.py; svg/pdf = output vektor)
+    backend       : matplotlib | raster | None (default per engine;
+                    raster = Pillow langsung, tanpa cartopy)
+    renditions    : daftar rendisi tambahan (print | web | whatsapp |
+                    thumbnail, lihat renditions.py) — diturunkan dari
+                    gambar yang sama, tanpa render ulang
+    affected_areas: daftar nama kecamatan, ATAU rekaman kejadian
+                    (list[dict] / DataFrame) → diringkas lewat frame
+                    kejadian bertipe (areas_from_events)
+    affected_counts: {kecamatan: jumlah kejadian} → rekap bulanan mode
+                    choropleth (warna per kelas frekuensi);
+                    affected_areas boleh kosong (diambil dari kunci)
+
+    Instrumentasi (opt-in):
+    - instrument=True / StageRecorder → catat wall, CPU & delta memori
+      per tahap (load_spatial, plot, rasterize, compose, encode, save)
+    - trace_path  → tulis Chrome trace JSON (chrome://tracing / Perfetto)
+    - log_stages  → log JSON per tahap ke logger "infografis.profiling"
+
     Return:
     {
         success: bool,
         file_path: str | None,
         file_name: str,
         kategori: str,
-        image: PIL.Image
+        image: PIL.Image | None (None untuk output vektor),
+        data: bytes,            # hasil encode (dipakai ulang untuk download)
+        mime: str,
+        size_bytes: int,
+        encode_time: float,
+        legend_pages: [          # halaman legenda lanjutan (overflow)
+            {image, data, file_name, file_path}
+        ],
+        renditions: [            # hanya jika `renditions` diisi
+            {name, data, mime, file_name, file_path, width, height,
+             size_bytes, encode_time}
+        ],
+        timings: dict | None     # hanya jika instrumentasi aktif
     }
     """
 
@@ -53,6 +194,18 @@ def generate_infografis_rob(
     if affected_areas is None:
         affected_areas = kwargs.get("kecamatan_list")
 
+    if _is_event_records(affected_areas):
+        affected_areas, _ = areas_from_events(affected_areas)
+
+    if not affected_areas and affected_counts:
+        affected_areas = list(affected_counts)
+
+    if affected_counts and not rekap_bul:
+        return {
+            "success": False,
+            "error": "Mode choropleth hanya untuk rekap bulanan"
+        }
+
     if not affected_areas:
         return {
             "success": False,
@@ -73,45 +226,343 @@ def generate_infografis_rob(
         prefix = "rob_updateharian"
         kategori = "sebaran"
 
-    file_name = f"{prefix}_{now.strftime('%Y%m%d_%H%M%S')}.png"
+    try:
+        profile = get_profile(output_profile)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    renditions = list(renditions or [])
+    try:
+        for name in renditions:
+            get_rendition(name)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    if renditions and profile.get("vector"):
+        return {
+            "success": False,
+            "error": "Rendisi hanya untuk output raster (bukan svg / pdf)"
+        }
+
+    file_name = f"{prefix}_{now.strftime('%Y%m%d_%H%M%S')}.{profile['ext']}"
     save_path = output_dir / file_name
 
+    if isinstance(instrument, StageRecorder):
+        recorder = instrument
+    elif instrument or trace_path or log_stages:
+        recorder = StageRecorder(name=prefix)
+    else:
+        recorder = None
+
     # ========================================================
     # GENERATE IMAGE (ENGINE DIPISAH)
     # ========================================================
     try:
-        # ================= BULANAN =================
-        if rekap_bul:
-            final_img = plot_rob_bulanan(
-                affected_areas_list=affected_areas,
-                save_path=save_path,
-                tanggal_rekap=tanggal,
-                rekap_bul=True
-            )
+        # ================= VEKTOR (SVG / PDF) =================
+        if profile.get("vector"):
+            if rekap_bul:
+                doc, legend_docs = vector_rob_bulanan(
+                    affected_areas=affected_areas,
+                    tanggal_rekap=tanggal,
+                    recorder=recorder,
+                    counts=affected_counts
+                )
+            else:
+                doc, legend_docs = vector_rob_harian(
+                    affected_areas=affected_areas,
+                    tanggal_rekap=tanggal,
+                    recorder=recorder
+                )
 
-        # ================= HARIAN ==================
-        else:
-            final_img = plot_rob_harian(
-                affected_areas=affected_areas,
-                save_path=save_path,
-                tanggal_rekap=tanggal,
-                rekap_bul=False
-            )
+            with stage(recorder, "encode"):
+                encoded = encode_vector([doc] + legend_docs, output_profile)
 
-        if final_img is None:
-            raise RuntimeError(
-                "plot_rob_* tidak mengembalikan PIL.Image"
+            final_img = None
+            pages = [
+                {
+                    "image": None,
+                    "data": data,
+                    "file_name": f"{save_path.stem}_legenda{no}.{encoded['ext']}"
+                }
+                for no, data in enumerate(encoded["pages"], start=2)
+            ]
+
+        else:
+            final_img, encoded, pages = _render_raster(
+                affected_areas, tanggal, rekap_bul, output_profile,
+                save_path, recorder, backend, affected_counts
             )
 
         # ⚠️ Jangan paksa file ada (Streamlit Cloud bisa read-only)
-        file_path = str(save_path) if save_path.exists() else None
+        with stage(recorder, "save"):
+            saved = write_encoded(encoded, save_path)
+            _save_legend_pages(pages, save_path)
+        file_path = str(save_path) if saved else None
+
+        # ====================================================
+        # RENDISI TAMBAHAN (PIRAMIDA + ENCODE PARALEL)
+        # ====================================================
+        rendition_files = []
+        if renditions:
+            with stage(recorder, "renditions"):
+                for rend in render_renditions(
+                    final_img, renditions, primary=encoded
+                ):
+                    rend_path = output_dir / (
+                        f"{save_path.stem}_{rend['name']}.{rend['ext']}"
+                    )
+                    rend_saved = write_encoded(rend, rend_path)
+                    rend.update(
+                        file_name=rend_path.name,
+                        file_path=str(rend_path) if rend_saved else None,
+                    )
+                    rendition_files.append(rend)
+
+        # ====================================================
+        # INSTRUMENTASI (OPT-IN)
+        # ====================================================
+        timings = None
+        if recorder is not None:
+            timings = recorder.to_dict()
+
+            if log_stages:
+                recorder.log_json(
+                    kategori=kategori,
+                    areas=len(affected_areas)
+                )
+
+            if trace_path:
+                try:
+                    timings["trace_path"] = recorder.write_chrome_trace(
+                        trace_path
+                    )
+                except OSError:
+                    timings["trace_path"] = None
 
         return {
             "success": True,
             "file_path": file_path,
             "file_name": file_name,
             "kategori": kategori,
-            "image": final_img
+            "image": final_img,
+            "data": encoded["data"],
+            "mime": encoded["mime"],
+            "output_profile": encoded["profile"],
+            "size_bytes": encoded["size_bytes"],
+            "encode_time": encoded["encode_time"],
+            "legend_pages": pages,
+            "renditions": rendition_files,
+            "timings": timings
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+# ============================================================
+# TIME-LAPSE BULANAN
+# ============================================================
+
+def month_days(bulan):
+    """'YYYY-MM' → daftar date setiap hari dalam bulan tersebut"""
+    first = date(int(bulan[:4]), int(bulan[5:7]), 1)
+    nxt = (first + timedelta(days=32)).replace(day=1)
+    return [first + timedelta(days=i) for i in range((nxt - first).days)]
+
+
+def _row_day(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def generate_timelapse_rob(
+    daily_rows,
+    bulan,
+    output_format="webp",
+    width=FRAME_WIDTH,
+    fps=FPS
+):
+    """
+    Time-lapse rekap bulanan: satu frame per hari dalam `bulan`.
+
+    daily_rows   : baris agregat harian SEBULAN (crud.fetch_daily_summary,
+                   satu query) → dikelompokkan per Tanggal di sini
+    bulan        : 'YYYY-MM'
+    output_format: webp | gif | mp4 (mp4 butuh imageio[ffmpeg])
+
+    Return:
+    {
+        success, file_path, file_name, data, mime, size_bytes,
+        frames, render_time, encode_time
+    }
+    """
+    if output_format not in TIMELAPSE_FORMATS:
+        return {
+            "success": False,
+            "error": f"Format time-lapse tidak dikenal: {output_format}"
+        }
+
+    try:
+        days = month_days(bulan)
+    except (ValueError, TypeError):
+        return {"success": False, "error": f"Bulan tidak valid: {bulan}"}
+
+    per_day = {d: set() for d in days}
+    for row in daily_rows or []:
+        kec = row.get("Kecamatan")
+        if not kec:
+            continue
+        day = _row_day(row["Tanggal"])
+        if day in per_day:
+            per_day[day].add(kec)
+
+    if not any(per_day.values()):
+        return {
+            "success": False,
+            "error": "Tidak ada kejadian rob pada bulan tersebut"
+        }
+
+    try:
+        result = render_timelapse(
+            [(d.strftime("%d-%m-%Y"), per_day[d]) for d in days],
+            fmt=output_format,
+            width=width,
+            fps=fps
+        )
+
+        file_name = (
+            f"rob_timelapse_{bulan.replace('-', '')}_"
+            f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.{result['ext']}"
+        )
+        save_path = OUTPUT_REKAP / file_name
+
+        # ⚠️ Jangan paksa file ada (Streamlit Cloud bisa read-only)
+        saved = write_encoded(result, save_path)
+
+        result.update(
+            success=True,
+            file_name=file_name,
+            file_path=str(save_path) if saved else None
+        )
+        return result
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+# ============================================================
+# PERBANDINGAN PERIODE (BULAN INI vs BULAN LALU)
+# ============================================================
+
+def previous_month(bulan):
+    """'YYYY-MM' → 'YYYY-MM' bulan sebelumnya"""
+    first = month_days(bulan)[0]
+    return (first - timedelta(days=1)).strftime("%Y-%m")
+
+
+def generate_comparison_rob(
+    period_rows,
+    bulan,
+    tanggal=None,
+    output_profile="png",
+    instrument=False
+):
+    """
+    Infografis perbandingan bulan `bulan` vs bulan sebelumnya.
+
+    period_rows   : baris crud.fetch_period_comparison (satu query untuk
+                    kedua periode; kolom Kecamatan, Lalu, Kini)
+    output_profile: profil raster (png | png_palette | webp | jpeg)
+
+    Return:
+    {
+        success, file_path, file_name, image, data, mime, size_bytes,
+        encode_time, legend_pages, summary: {baru, berlanjut, berakhir},
+        timings
+    }
+    """
+    try:
+        profile = get_profile(output_profile)
+        prev = previous_month(bulan)
+    except (ValueError, TypeError) as e:
+        return {"success": False, "error": str(e)}
+
+    if profile.get("vector"):
+        return {
+            "success": False,
+            "error": "Perbandingan periode hanya untuk output raster"
+        }
+
+    current = {r["Kecamatan"] for r in period_rows or [] if r["Kini"]}
+    previous = {r["Kecamatan"] for r in period_rows or [] if r["Lalu"]}
+
+    if not current and not previous:
+        return {
+            "success": False,
+            "error": "Tidak ada kejadian rob pada kedua periode"
+        }
+
+    if isinstance(instrument, StageRecorder):
+        recorder = instrument
+    elif instrument:
+        recorder = StageRecorder(name="rob_perbandingan")
+    else:
+        recorder = None
+
+    file_name = (
+        f"rob_perbandingan_{bulan.replace('-', '')}_"
+        f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.{profile['ext']}"
+    )
+    save_path = OUTPUT_REKAP / file_name
+
+    try:
+        final_img, legend_pages = plot_rob_comparison(
+            current,
+            previous,
+            tanggal_rekap=tanggal or f"{bulan} vs {prev}",
+            recorder=recorder
+        )
+
+        with stage(recorder, "encode"):
+            encoded = encode_image(final_img, output_profile)
+            pages = []
+            for no, page_img in enumerate(legend_pages, start=2):
+                page_enc = encode_image(page_img, output_profile)
+                pages.append({
+                    "image": page_img,
+                    "data": page_enc["data"],
+                    "file_name": f"{save_path.stem}_legenda{no}.{page_enc['ext']}"
+                })
+
+        with stage(recorder, "save"):
+            saved = write_encoded(encoded, save_path)
+            _save_legend_pages(pages, save_path)
+
+        return {
+            "success": True,
+            "file_path": str(save_path) if saved else None,
+            "file_name": file_name,
+            "image": final_img,
+            "data": encoded["data"],
+            "mime": encoded["mime"],
+            "size_bytes": encoded["size_bytes"],
+            "encode_time": encoded["encode_time"],
+            "legend_pages": pages,
+            "summary": {
+                "baru": sorted(current - previous),
+                "berlanjut": sorted(current & previous),
+                "berakhir": sorted(previous - current),
+            },
+            "timings": recorder.to_dict() if recorder is not None else None
         }
 
     except Exception as e:
@@ -0,0 +1,152 @@
+from pathlib import Path
+import threading
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+# ============================================================
+# CACHE DATA SPASIAL (BATAS KECAMATAN)
+# ============================================================
+# GDB dibaca sekali per proses; kunci cache = (mtime_ns, size) semua
+# file di dalam folder .gdb → otomatis invalid bila data diganti.
+# Ring polygon juga diratakan sekali ke array NumPy untuk backend raster.
+# Titik label (representative point, selalu di dalam polygon) dihitung
+# sekali saat load → kolom label_x / label_y, tanpa centroid per baris.
+
+NAME_COLUMN = "NAMOBJ"
+
+_lock = threading.Lock()
+_layers = {}
+
+
+def _gdb_key(path):
+    path = Path(path)
+    if path.is_dir():
+        stats = [f.stat() for f in sorted(path.iterdir()) if f.is_file()]
+    else:
+        stats = [path.stat()]
+    return tuple((s.st_mtime_ns, s.st_size) for s in stats)
+
+
+def flatten_rings(geometries):
+    """
+    Ratakan polygon ke array koordinat.
+
+    Return dict:
+        coords   : float64 (N, 2) seluruh titik ring
+        offsets  : int64 (R + 1) batas ring → coords[offsets[i]:offsets[i+1]]
+        owner    : int64 (R) indeks geometri pemilik ring
+        exterior : bool (R) True = ring luar, False = lubang
+        holed    : bool (R) True jika part pemilik ring punya lubang
+    """
+    geoms = np.asarray(geometries, dtype=object)
+
+    parts, part_owner = shapely.get_parts(geoms, return_index=True)
+    rings, ring_part = shapely.get_rings(parts, return_index=True)
+    coords, ring_idx = shapely.get_coordinates(rings, return_index=True)
+
+    n_rings = len(rings)
+    exterior = np.ones(n_rings, dtype=bool)
+    exterior[1:] = ring_part[1:] != ring_part[:-1]
+
+    holed_part = shapely.get_num_interior_rings(parts) > 0
+
+    return {
+        "coords": coords,
+        "offsets": np.searchsorted(ring_idx, np.arange(n_rings + 1)),
+        "owner": part_owner[ring_part],
+        "exterior": exterior,
+        "holed": holed_part[ring_part],
+    }
+
+
+def load_kecamatan(path):
+    """
+    Layer batas kecamatan ter-cache:
+    {"gdf": GeoDataFrame (+ label_x, label_y), "bounds": (minx, miny, maxx, maxy),
+     "rings": flatten_rings(...)} (rings dibuat lazy)
+    ⚠️ Dipakai bersama → jangan modifikasi gdf, filter/copy dulu.
+    """
+    path = Path(path)
+    key = _gdb_key(path)
+
+    with _lock:
+        cached = _layers.get(path)
+        if cached and cached["key"] == key:
+            return cached
+
+    gdf = gpd.read_file(path)
+
+    points = shapely.point_on_surface(gdf.geometry.values)
+    gdf["label_x"] = shapely.get_x(points)
+    gdf["label_y"] = shapely.get_y(points)
+
+    layer = {
+        "key": key,
+        "gdf": gdf,
+        "bounds": tuple(float(v) for v in gdf.total_bounds),
+        "rings": None,
+    }
+
+    with _lock:
+        _layers[path] = layer
+
+    return layer
+
+
+def select_areas(gdf, names):
+    """
+    Mask bool wilayah terdampak + nama terurut sesuai urutan GDB
+    (vektor isin, tanpa iterrows).
+    """
+    mask = gdf[NAME_COLUMN].isin(list(names)).to_numpy()
+    return mask, gdf[NAME_COLUMN].to_numpy()[mask].tolist()
+
+
+def label_points(gdf):
+    """
+    Titik label (N, 2) + nama untuk geometri tidak kosong.
+    Memakai kolom label_x / label_y hasil load_kecamatan bila ada.
+    """
+    if "label_x" in gdf and "label_y" in gdf:
+        xy = gdf[["label_x", "label_y"]].to_numpy(dtype="float64")
+    else:
+        points = shapely.point_on_surface(gdf.geometry.values)
+        xy = np.column_stack((shapely.get_x(points), shapely.get_y(points)))
+
+    keep = ~np.isnan(xy).any(axis=1)
+    names = gdf[NAME_COLUMN].fillna("").astype(str).to_numpy()
+    return xy[keep], names[keep]
+
+
+def get_rings(layer, tolerance=None):
+    """
+    Ring rata untuk layer dari load_kecamatan (dihitung sekali).
+    tolerance: toleransi simplify (derajat) → versi sederhana, di-cache
+               per toleransi (dipakai output vektor)
+    """
+    if tolerance is None:
+        if layer["rings"] is None:
+            rings = flatten_rings(layer["gdf"].geometry.values)
+            with _lock:
+                layer["rings"] = rings
+        return layer["rings"]
+
+    key = round(float(tolerance), 7)
+    simplified = layer.setdefault("simplified", {})
+    if key not in simplified:
+        geoms = shapely.simplify(
+            np.asarray(layer["gdf"].geometry.values, dtype=object),
+            key,
+            preserve_topology=True,
+        )
+        rings = flatten_rings(geoms)
+        with _lock:
+            simplified[key] = rings
+    return simplified[key]
+
+
+def clear_cache():
+    with _lock:
+        _layers.clear()
@@ -0,0 +1,154 @@
+import io
+import time
+
+from PIL import Image, ImageDraw
+
+from .assets import get_font, get_font_path
+from .raster import draw_polygons, new_canvas
+from .spatial import get_rings, select_areas
+from .warningtoolsmonthly import get_basemap
+
+# ============================================================
+# TIME-LAPSE REKAP BULANAN
+# ============================================================
+# - Basemap (background + seluruh batas kecamatan) dirender SEKALI
+#   per proses di lebar frame → warningtoolsmonthly.get_basemap
+# - Kanvas "sudah terdampak" (merah muda) berjalan lintas frame; tiap
+#   frame hanya menggambar delta hari itu (merah + wilayah baru)
+# - Tanpa process pool: render inkremental sudah murah, dan fork dari
+#   proses server Streamlit (multi-thread) tidak aman
+# - Encode: WebP / GIF animasi (Pillow), MP4 opsional (imageio)
+
+TIMELAPSE_FORMATS = {
+    "webp": {"label": "WebP animasi", "ext": "webp", "mime": "image/webp"},
+    "gif": {"label": "GIF animasi", "ext": "gif", "mime": "image/gif"},
+    "mp4": {"label": "Video MP4", "ext": "mp4", "mime": "video/mp4"},
+}
+
+FRAME_WIDTH = 1280
+FPS = 2
+
+COLOR_TODAY = "red"
+COLOR_BEFORE = "#F4A3A3"
+
+
+def _label(frame, base, label):
+    scale = base["scale"]
+    draw = ImageDraw.Draw(frame)
+    draw.text(
+        (frame.width - 900 * scale, 300 * scale),
+        label,
+        fill="white",
+        font=get_font(max(12, round(72 * scale)), get_font_path())
+    )
+
+
+def render_frames(days, width=FRAME_WIDTH):
+    """
+    Frame berurutan dengan overlay berjalan.
+
+    days: [(label, [kecamatan terdampak hari itu])]
+    Kanvas "sebelumnya" disimpan lintas frame; tiap hari hanya
+    menggambar wilayah hari itu (merah) + menambah wilayah yang BARU
+    pertama kali terdampak ke kanvas tersebut → O(total delta),
+    bukan O(hari × wilayah).
+    Return: list PIL.Image RGB
+    """
+    base = get_basemap(width)
+    layer, vp = base["layer"], base["vp"]
+    gdf = layer["gdf"]
+    rings = get_rings(layer)
+
+    before = new_canvas(vp)
+    seen = set()
+    frames = []
+
+    for label, today in days:
+        today = set(today)
+
+        overlay = before.copy()
+        if today:
+            mask, _ = select_areas(gdf, today)
+            draw_polygons(overlay, rings, vp, select=mask, fill=COLOR_TODAY,
+                          outline="darkred", linewidth=0.8)
+
+        frame = base["image"].copy()
+        frame.alpha_composite(overlay, base["offset"])
+        _label(frame, base, label)
+        frames.append(frame.convert("RGB"))
+
+        new = today - seen
+        if new:
+            mask, _ = select_areas(gdf, new)
+            draw_polygons(before, rings, vp, select=mask, fill=COLOR_BEFORE)
+            seen |= new
+
+    return frames
+
+
+def _encode(frames, fmt, fps):
+    duration = int(1000 / fps)
+    buf = io.BytesIO()
+
+    if fmt == "webp":
+        frames[0].save(buf, format="WEBP", save_all=True,
+                       append_images=frames[1:], duration=duration, loop=0,
+                       quality=80, method=4)
+    elif fmt == "gif":
+        # Palet adaptif per frame; optimize → hanya region berubah disimpan
+        pal = [f.quantize(256, method=Image.Quantize.FASTOCTREE) for f in frames]
+        pal[0].save(buf, format="GIF", save_all=True, append_images=pal[1:],
+                    duration=duration, loop=0, optimize=True, disposal=1)
+    elif fmt == "mp4":
+        try:
+            import imageio.v3 as iio
+            import numpy as np
+        except ImportError:
+            raise RuntimeError("Export MP4 membutuhkan paket imageio[ffmpeg]")
+
+        # H.264 butuh dimensi genap
+        w, h = frames[0].size
+        w, h = w - w % 2, h - h % 2
+        stack = np.stack([np.asarray(f.crop((0, 0, w, h))) for f in frames])
+        iio.imwrite(buf, stack, extension=".mp4", fps=fps, codec="libx264")
+    else:
+        raise ValueError(
+            f"Format time-lapse tidak dikenal: {fmt} "
+            f"(pilihan: {', '.join(TIMELAPSE_FORMATS)})"
+        )
+
+    return buf.getvalue()
+
+
+def render_timelapse(days, fmt="webp", width=FRAME_WIDTH, fps=FPS):
+    """
+    Render animasi dari daftar hari.
+
+    days: [(label, [kecamatan terdampak hari itu])] berurutan
+    Return dict: data, ext, mime, frames, render_time, encode_time, size_bytes
+    """
+    if fmt not in TIMELAPSE_FORMATS:
+        raise ValueError(
+            f"Format time-lapse tidak dikenal: {fmt} "
+            f"(pilihan: {', '.join(TIMELAPSE_FORMATS)})"
+        )
+    if not days:
+        raise ValueError("Tidak ada hari untuk time-lapse")
+
+    t0 = time.perf_counter()
+    frames = render_frames(days, width)
+    render_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    data = _encode(frames, fmt, fps)
+    encode_time = time.perf_counter() - t0
+
+    return {
+        "data": data,
+        "ext": TIMELAPSE_FORMATS[fmt]["ext"],
+        "mime": TIMELAPSE_FORMATS[fmt]["mime"],
+        "frames": len(frames),
+        "render_time": render_time,
+        "encode_time": encode_time,
+        "size_bytes": len(data),
+    }
@@ -0,0 +1,461 @@
+import base64
+import io
+from functools import lru_cache
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+from PIL import ImageColor
+
+from .assets import get_font_path
+from .raster import _arc, pt_to_px, to_pixels
+
+# ============================================================
+# OUTPUT VEKTOR (SVG / PDF)
+# ============================================================
+# Dokumen = dict {width, height, ops, defs}; op = dict sederhana
+# (image, rect, text, polyline, circle, group, layer → path / use).
+# - Koordinat geometri dikuantisasi ke 1/QUANT piksel (integer),
+#   titik berurutan yang jatuh di sel sama dibuang
+# - Batas wilayah disederhanakan ± SIMPLIFY_PX piksel (spatial.get_rings)
+# - Geometri yang dipakai >1 layer didefinisikan SEKALI di <defs>
+#   lalu di-<use> (SVG); PDF menggambar ulang dari defs yang sama
+# - Background tetap raster (aset desain), di-embed apa adanya
+
+QUANT = 10
+SIMPLIFY_PX = 0.5
+FONT_FAMILY = "DejaVu Sans"
+
+
+def new_document(width, height):
+    return {"width": int(width), "height": int(height), "ops": [], "defs": {}}
+
+
+def simplify_tolerance(vp):
+    """Toleransi simplify (derajat) setara SIMPLIFY_PX piksel"""
+    return SIMPLIFY_PX / vp["sx"]
+
+
+# ============================================================
+# PRIMITIF
+# ============================================================
+
+def add_image(doc, path, x, y, w, h):
+    doc["ops"].append({"op": "image", "path": Path(path),
+                       "x": x, "y": y, "w": w, "h": h})
+
+
+def add_rect(doc, x, y, w, h, fill, radius=0):
+    doc["ops"].append({"op": "rect", "x": x, "y": y, "w": w, "h": h,
+                       "fill": fill, "radius": radius})
+
+
+def add_text(doc, x, y, text, size, fill="white", bold=False, anchor="start"):
+    """y = baseline teks"""
+    doc["ops"].append({"op": "text", "x": x, "y": y, "text": str(text),
+                       "size": size, "fill": fill, "bold": bold,
+                       "anchor": anchor})
+
+
+def add_polyline(doc, points, stroke, width, dash=None):
+    doc["ops"].append({"op": "polyline",
+                       "points": np.round(np.asarray(points, dtype=float), 1),
+                       "stroke": stroke, "width": width, "dash": dash})
+
+
+def add_circle(doc, cx, cy, r, fill, stroke=None, width=0):
+    doc["ops"].append({"op": "circle", "cx": cx, "cy": cy, "r": r,
+                       "fill": fill, "stroke": stroke, "width": width})
+
+
+def add_group(doc, child, dx=0, dy=0):
+    """Sisipkan dokumen lain (mis. panel legenda) di offset (dx, dy)"""
+    doc["defs"].update(child["defs"])
+    doc["ops"].append({"op": "group", "dx": dx, "dy": dy,
+                       "ops": child["ops"]})
+
+
+class VectorDraw:
+    """
+    Subset API ImageDraw (text, line) yang menulis ke dokumen vektor,
+    sehingga kode legenda yang sama bisa dipakai raster & vektor.
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+
+    def text(self, xy, text, fill="white", font=None, anchor=None):
+        x, y = xy
+        size = font.size
+        ascent, descent = font.getmetrics()
+        bold = "bold" in Path(getattr(font, "path", "")).stem.lower()
+
+        if anchor == "mm":
+            add_text(self.doc, x, y + (ascent - descent) / 2, text, size,
+                     fill, bold, anchor="middle")
+        else:
+            # Default Pillow "la": y = batas atas ascender
+            add_text(self.doc, x, y + ascent, text, size, fill, bold)
+
+    def line(self, xy, fill="white", width=1):
+        add_polyline(self.doc, xy, fill, width)
+
+
+# ============================================================
+# PETA (GEOMETRI TERKUANTISASI + REUSE)
+# ============================================================
+
+def _quantized_rings(rings, vp, offset):
+    """Semua ring → list array int (1/QUANT px), duplikat berurutan dibuang"""
+    pts = to_pixels(rings["coords"], vp)
+    pts += np.asarray(offset, dtype=float)
+    q = np.rint(pts * QUANT).astype(np.int64)
+
+    keep = np.ones(len(q), dtype=bool)
+    keep[1:] = (np.diff(q, axis=0) != 0).any(axis=1)
+    offsets = rings["offsets"]
+    keep[offsets[:-1][offsets[:-1] < len(q)]] = True  # awal ring selalu
+
+    out = []
+    for i in range(len(offsets) - 1):
+        a, b = offsets[i], offsets[i + 1]
+        r = q[a:b][keep[a:b]]
+        out.append(r if len(r) >= 3 else None)
+    return out
+
+
+def add_map(doc, rings, vp, layers, offset=(0, 0)):
+    """
+    Tambahkan peta ke dokumen.
+
+    layers: [{select, fill, outline, linewidth (pt), linestyle, alpha}]
+            select = mask bool per geometri (None = semua)
+    """
+    q_rings = _quantized_rings(rings, vp, offset)
+    n_geom = int(rings["owner"].max()) + 1 if len(rings["owner"]) else 0
+
+    masks = [
+        np.ones(n_geom, dtype=bool) if ly.get("select") is None
+        else np.asarray(ly["select"], dtype=bool)
+        for ly in layers
+    ]
+    shared = np.sum(masks, axis=0) > 1 if masks else np.zeros(0, bool)
+
+    by_geom = {}
+    for i, owner in enumerate(rings["owner"]):
+        if q_rings[i] is not None:
+            by_geom.setdefault(int(owner), []).append(q_rings[i])
+
+    for g in np.flatnonzero(shared):
+        if g in by_geom:
+            doc["defs"][f"g{g}"] = by_geom[g]
+
+    for ly, mask in zip(layers, masks):
+        own = [r for g in np.flatnonzero(mask & ~shared)
+               for r in by_geom.get(int(g), ())]
+        refs = [f"g{g}" for g in np.flatnonzero(mask & shared)
+                if int(g) in by_geom]
+
+        width_px = pt_to_px(ly.get("linewidth", 0.0), vp)
+        dash = None
+        if ly.get("linestyle") == "--":
+            dash = (3.7 * width_px, 1.6 * width_px)
+
+        doc["ops"].append({
+            "op": "layer",
+            "fill": ly.get("fill"),
+            "stroke": ly.get("outline"),
+            "width": width_px,
+            "dash": dash,
+            "alpha": ly.get("alpha", 1.0),
+            "rings": own,
+            "refs": refs,
+        })
+
+
+def add_annotations(doc, ann, vp, offset=(0, 0),
+                    color="#C62828", box_color="#B71C1C"):
+    """Anotasi dari raster.layout_annotations → op vektor"""
+    ox, oy = offset
+    line_w = pt_to_px(1.6, vp)
+    radius = pt_to_px(np.sqrt(70.0) / 2, vp)
+    edge_w = pt_to_px(1.2, vp)
+
+    for (x, y), (lx, ly) in zip(ann["anchors"], ann["positions"]):
+        curve = _arc((x + ox, y + oy), (lx + ox, ly + oy), n=8)
+        add_polyline(doc, curve, color, line_w)
+
+    for x, y in ann["anchors"]:
+        add_circle(doc, x + ox, y + oy, radius, color, "white", edge_w)
+
+    for (lx, ly), (w, h) in zip(ann["positions"], ann["sizes"]):
+        add_rect(doc, lx + ox - w / 2, ly + oy - h / 2, w, h,
+                 box_color, radius=ann["pad"])
+
+    draw = VectorDraw(doc)
+    for (lx, ly), name in zip(ann["positions"], ann["names"]):
+        draw.text((lx + ox, ly + oy), name, fill="white",
+                  font=ann["font"], anchor="mm")
+
+
+# ============================================================
+# SERIALISASI SVG
+# ============================================================
+
+def _num(v):
+    return f"{v:.1f}".rstrip("0").rstrip(".")
+
+
+def _svg_d(rings):
+    parts = []
+    for r in rings:
+        d = np.diff(r, axis=0).ravel().tolist()
+        parts.append(f"M{r[0, 0]} {r[0, 1]}l{' '.join(map(str, d))}z")
+    return "".join(parts)
+
+
+@lru_cache(maxsize=8)
+def _image_data_uri(path, mtime_ns):
+    mime = "image/png" if path.suffix.lower() == ".png" else "image/jpeg"
+    data = base64.b64encode(path.read_bytes()).decode("ascii")
+    return f"data:{mime};base64,{data}"
+
+
+def _svg_ops(ops, out):
+    for op in ops:
+        kind = op["op"]
+
+        if kind == "image":
+            uri = _image_data_uri(op["path"], op["path"].stat().st_mtime_ns)
+            out.append(
+                f'<image x="{_num(op["x"])}" y="{_num(op["y"])}" '
+                f'width="{_num(op["w"])}" height="{_num(op["h"])}" '
+                f'xlink:href="{uri}"/>'
+            )
+
+        elif kind == "rect":
+            rx = f' rx="{_num(op["radius"])}"' if op["radius"] else ""
+            out.append(
+                f'<rect x="{_num(op["x"])}" y="{_num(op["y"])}" '
+                f'width="{_num(op["w"])}" height="{_num(op["h"])}"{rx} '
+                f'fill="{op["fill"]}"/>'
+            )
+
+        elif kind == "text":
+            weight = ' font-weight="bold"' if op["bold"] else ""
+            anchor = (f' text-anchor="{op["anchor"]}"'
+                      if op["anchor"] != "start" else "")
+            out.append(
+                f'<text x="{_num(op["x"])}" y="{_num(op["y"])}" '
+                f'font-size="{op["size"]}"{weight}{anchor} '
+                f'fill="{op["fill"]}">{escape(op["text"])}</text>'
+            )
+
+        elif kind == "polyline":
+            pts = " ".join(f"{_num(x)},{_num(y)}" for x, y in op["points"])
+            dash = ""
+            if op["dash"]:
+                dash = f' stroke-dasharray="{",".join(map(_num, op["dash"]))}"'
+            out.append(
+                f'<polyline points="{pts}" fill="none" stroke="{op["stroke"]}" '
+                f'stroke-width="{_num(op["width"])}"{dash}/>'
+            )
+
+        elif kind == "circle":
+            stroke = ""
+            if op["stroke"]:
+                stroke = (f' stroke="{op["stroke"]}" '
+                          f'stroke-width="{_num(op["width"])}"')
+            out.append(
+                f'<circle cx="{_num(op["cx"])}" cy="{_num(op["cy"])}" '
+                f'r="{_num(op["r"])}" fill="{op["fill"]}"{stroke}/>'
+            )
+
+        elif kind == "group":
+            out.append(f'<g transform="translate({_num(op["dx"])},{_num(op["dy"])})">')
+            _svg_ops(op["ops"], out)
+            out.append("</g>")
+
+        elif kind == "layer":
+            # Koordinat integer 1/QUANT px → skala di group
+            attrs = [
+                f'transform="scale({1 / QUANT})"',
+                f'fill="{op["fill"] or "none"}"',
+                'fill-rule="evenodd"',
+            ]
+            if op["stroke"] and op["width"] > 0:
+                attrs += [
+                    f'stroke="{op["stroke"]}"',
+                    f'stroke-width="{_num(op["width"] * QUANT)}"',
+                    'stroke-linejoin="round"',
+                ]
+                if op["dash"]:
+                    attrs.append('stroke-dasharray="'
+                                 + ",".join(_num(v * QUANT) for v in op["dash"])
+                                 + '"')
+            if op["alpha"] < 1:
+                attrs += [f'fill-opacity="{op["alpha"]}"',
+                          f'stroke-opacity="{op["alpha"]}"']
+
+            out.append(f"<g {' '.join(attrs)}>")
+            if op["rings"]:
+                out.append(f'<path d="{_svg_d(op["rings"])}"/>')
+            out.extend(f'<use xlink:href="#{ref}"/>' for ref in op["refs"])
+            out.append("</g>")
+
+
+def to_svg(doc):
+    """Dokumen vektor → bytes SVG"""
+    out = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        'xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'width="{doc["width"]}" height="{doc["height"]}" '
+        f'viewBox="0 0 {doc["width"]} {doc["height"]}" '
+        f'font-family={quoteattr(FONT_FAMILY)}>',
+    ]
+
+    if doc["defs"]:
+        out.append("<defs>")
+        for ref, rings in doc["defs"].items():
+            out.append(f'<path id="{ref}" d="{_svg_d(rings)}"/>')
+        out.append("</defs>")
+
+    _svg_ops(doc["ops"], out)
+    out.append("</svg>")
+    return "\n".join(out).encode("utf-8")
+
+
+# ============================================================
+# SERIALISASI PDF (REPORTLAB)
+# ============================================================
+
+@lru_cache(maxsize=1)
+def _pdf_fonts():
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    pdfmetrics.registerFont(TTFont("InfoSans", get_font_path()))
+    pdfmetrics.registerFont(TTFont("InfoSans-Bold", get_font_path(weight="bold")))
+    return "InfoSans", "InfoSans-Bold"
+
+
+def _rgb01(color):
+    return tuple(v / 255.0 for v in ImageColor.getrgb(color)[:3])
+
+
+def _pdf_path(c, rings):
+    path = c.beginPath()
+    for r in rings:
+        pts = r / QUANT
+        path.moveTo(*pts[0])
+        for x, y in pts[1:]:
+            path.lineTo(x, y)
+        path.close()
+    return path
+
+
+def _pdf_ops(c, ops, defs):
+    from reportlab.pdfgen.canvas import FILL_EVEN_ODD
+
+    regular, bold = _pdf_fonts()
+
+    for op in ops:
+        kind = op["op"]
+        c.saveState()
+
+        if kind == "image":
+            # Gambar harus tegak → balik sumbu y lokal
+            c.translate(op["x"], op["y"] + op["h"])
+            c.scale(1, -1)
+            c.drawImage(str(op["path"]), 0, 0, op["w"], op["h"], mask="auto")
+
+        elif kind == "rect":
+            c.setFillColorRGB(*_rgb01(op["fill"]))
+            if op["radius"]:
+                c.roundRect(op["x"], op["y"], op["w"], op["h"], op["radius"],
+                            stroke=0, fill=1)
+            else:
+                c.rect(op["x"], op["y"], op["w"], op["h"], stroke=0, fill=1)
+
+        elif kind == "text":
+            c.translate(op["x"], op["y"])
+            c.scale(1, -1)
+            c.setFillColorRGB(*_rgb01(op["fill"]))
+            c.setFont(bold if op["bold"] else regular, op["size"])
+            if op["anchor"] == "middle":
+                c.drawCentredString(0, 0, op["text"])
+            else:
+                c.drawString(0, 0, op["text"])
+
+        elif kind == "polyline":
+            c.setStrokeColorRGB(*_rgb01(op["stroke"]))
+            c.setLineWidth(op["width"])
+            if op["dash"]:
+                c.setDash(list(op["dash"]))
+            pts = op["points"]
+            path = c.beginPath()
+            path.moveTo(*pts[0])
+            for x, y in pts[1:]:
+                path.lineTo(x, y)
+            c.drawPath(path, stroke=1, fill=0)
+
+        elif kind == "circle":
+            c.setFillColorRGB(*_rgb01(op["fill"]))
+            if op["stroke"]:
+                c.setStrokeColorRGB(*_rgb01(op["stroke"]))
+                c.setLineWidth(op["width"])
+            c.circle(op["cx"], op["cy"], op["r"],
+                     stroke=1 if op["stroke"] else 0, fill=1)
+
+        elif kind == "group":
+            c.translate(op["dx"], op["dy"])
+            _pdf_ops(c, op["ops"], defs)
+
+        elif kind == "layer":
+            fill = bool(op["fill"])
+            stroke = bool(op["stroke"]) and op["width"] > 0
+            if fill:
+                c.setFillColorRGB(*_rgb01(op["fill"]))
+                c.setFillAlpha(op["alpha"])
+            if stroke:
+                c.setStrokeColorRGB(*_rgb01(op["stroke"]))
+                c.setStrokeAlpha(op["alpha"])
+                c.setLineWidth(op["width"])
+                c.setLineJoin(1)
+                if op["dash"]:
+                    c.setDash(list(op["dash"]))
+
+            # Ring milik layer = SATU path gabungan; tiap geometri bersama
+            # (defs) path sendiri. Even-odd aman karena poligon kecamatan
+            # tidak saling tumpang tindih (hanya lubang yang berlubang)
+            for rings in [op["rings"]] + [defs[ref] for ref in op["refs"]]:
+                if rings:
+                    c.drawPath(_pdf_path(c, rings), stroke=int(stroke),
+                               fill=int(fill), fillMode=FILL_EVEN_ODD)
+
+        c.restoreState()
+
+
+def to_pdf(docs):
+    """Satu / beberapa dokumen vektor → bytes PDF (1 dokumen = 1 halaman)"""
+    from reportlab.pdfgen import canvas as rl_canvas
+
+    if isinstance(docs, dict):
+        docs = [docs]
+
+    buf = io.BytesIO()
+    c = rl_canvas.Canvas(buf, pagesize=(docs[0]["width"], docs[0]["height"]),
+                         pageCompression=1)
+
+    for doc in docs:
+        w, h = doc["width"], doc["height"]
+        c.setPageSize((w, h))
+        # Koordinat dokumen: y ke bawah seperti SVG / gambar
+        c.translate(0, h)
+        c.scale(1, -1)
+        _pdf_ops(c, doc["ops"], doc["defs"])
+        c.showPage()
+
+    c.save()
+    return buf.getvalue()
@@ -1,13 +1,40 @@
 from pathlib import Path
-import io
 import warnings
 
-import geopandas as gpd
 import matplotlib.pyplot as plt
+from matplotlib.font_manager import FontProperties
 from matplotlib.patches import FancyArrowPatch
-from matplotlib import font_manager
-
-from PIL import Image, ImageDraw, ImageFont
+from matplotlib.textpath import TextToPath
+
+from PIL import Image, ImageDraw
+
+from .assets import get_background, get_font, get_font_path
+from .encoding import encode_image, write_encoded
+from .labels import label_offset, place_labels
+from .legend import draw_legend_items, layout_legend
+from .profiling import stage
+from .raster import (
+    EXTENT_INDONESIA,
+    content_extent,
+    draw_annotations,
+    draw_polygons,
+    layout_annotations,
+    make_viewport,
+    new_canvas,
+)
+from .render import figure_to_image, new_figure
+from .spatial import get_rings, label_points, load_kecamatan, select_areas
+from .vector import (
+    VectorDraw,
+    add_annotations,
+    add_group,
+    add_image,
+    add_map,
+    add_polyline,
+    add_rect,
+    new_document,
+    simplify_tolerance,
+)
 
 # =========================
 # OPTIONAL CARTOPY (SAFE)
@@ -18,6 +45,9 @@ try:
 except Exception:
     CARTOPY_AVAILABLE = False
 
+# Backend peta: "matplotlib" (cartopy) atau "raster" (Pillow langsung)
+DEFAULT_BACKEND = "matplotlib" if CARTOPY_AVAILABLE else "raster"
+
 warnings.filterwarnings("ignore")
 
 # ============================================================
@@ -31,43 +61,72 @@ BG_BULANAN = BASE_DIR / "assets/background/bg_img_rekapbul.png"
 
 GDB_KECAMATAN = BASE_DIR / "data/spatial/batas_kecamatan.gdb"
 
+# Lebar peta efektif figure 18×12 lama (axes default 77.5% lebar);
+# menentukan skala point → piksel (font label, ketebalan garis)
+MAP_WIDTH_IN = 14.0
+
+LEGEND_WIDTH = 1050
+LEGEND_BG = "#002870"
+
+_TEXT_TO_PATH = TextToPath()
+
 # ============================================================
 # HELPER FUNCTIONS
 # ============================================================
 
+def _label_size_px(text, fontsize, pad, dpi):
+    """Ukuran kotak label (piksel) tanpa perlu renderer"""
+    w, h, _ = _TEXT_TO_PATH.get_text_width_height_descent(
+        text, FontProperties(size=fontsize, weight="bold"), ismath=False
+    )
+    pad_pt = pad * fontsize
+    scale = dpi / 72.0
+    return (w + 2 * pad_pt) * scale, (h + 2 * pad_pt) * scale
+
+
 def create_map_annotations(ax, gdf):
     """Titik lokasi + label merah + leader line (BMKG style)"""
 
-    offsets = [
-        (1.6, 0.9),
-        (-1.6, 0.9),
-        (1.6, -0.9),
-        (-1.6, -0.9),
-    ]
+    fontsize = 12
+    pad = 0.35
 
-    for i, (_, row) in enumerate(gdf.iterrows()):
-        geom = row.geometry
-        if geom is None or geom.is_empty:
-            continue
+    anchors, names = label_points(gdf)
 
-        centroid = geom.centroid
-        x, y = centroid.x, centroid.y
+    if not len(anchors):
+        return
 
-        dx, dy = offsets[i % len(offsets)]
-        lx, ly = x + dx, y + dy
+    # ================= PENEMPATAN LABEL (PIKSEL) =================
+    # Pastikan limit & aspect final sebelum transform data → piksel
+    ax.get_xlim()
+    ax.apply_aspect()
 
-        ax.scatter(
-            x, y,
-            s=70,
-            color="#C62828",
-            edgecolor="white",
-            linewidth=1.2,
-            zorder=6
-        )
+    fig = ax.figure
+    dpi = fig.dpi
+    anchors_px = [tuple(p) for p in ax.transData.transform(anchors)]
+    sizes_px = [_label_size_px(n, fontsize, pad, dpi) for n in names]
+
+    positions_px = place_labels(
+        anchors_px,
+        sizes_px,
+        base_offset=label_offset(dpi / 72, y_down=False),
+        anchor_size=14 * dpi / 72,
+        bounds=tuple(fig.bbox.extents),
+    )
+    positions = ax.transData.inverted().transform(positions_px)
 
+    ax.scatter(
+        anchors[:, 0], anchors[:, 1],
+        s=70,
+        color="#C62828",
+        edgecolor="white",
+        linewidth=1.2,
+        zorder=6
+    )
+
+    for (x, y), (lx, ly), name in zip(anchors, positions, names):
         arrow = FancyArrowPatch(
             (x, y),
-            (lx - 0.12, ly - 0.12),
+            (lx, ly),
             arrowstyle="-",
             connectionstyle="arc3,rad=0.15",
             linewidth=1.6,
@@ -79,8 +138,8 @@ def create_map_annotations(ax, gdf):
         ax.text(
             lx,
             ly,
-            str(row.get("NAMOBJ", "")),
-            fontsize=12,
+            name,
+            fontsize=fontsize,
             fontweight="bold",
             color="white",
             ha="center",
@@ -88,35 +147,141 @@ def create_map_annotations(ax, gdf):
             bbox=dict(
                 facecolor="#B71C1C",
                 edgecolor="none",
-                boxstyle="round,pad=0.35"
+                boxstyle=f"round,pad={pad}"
             ),
             zorder=7
         )
 
 
-def create_legend_panel(areas, width, height, font_path):
-    """Panel legenda samping"""
+def create_legend_pages(areas, width, height, font_path, vector=False):
+    """
+    Panel legenda samping (1 halaman utama + halaman lanjutan jika overflow).
+    vector=True → dokumen vektor (modules.infografis.vector), bukan PIL.Image
+    """
+
+    layout = layout_legend(
+        [f"Pesisir Kec. {area}" for area in areas],
+        width,
+        font_path,
+        height=height,
+        top=160,
+        sizes=(42, 38, 34, 30, 26, 22),
+        line_height=1.31,
+    )
+
+    title_font = get_font(50, font_path)
+    total = len(layout["pages"])
+    pages = []
+
+    for no, items in enumerate(layout["pages"], start=1):
+        if vector:
+            panel = new_document(width, height)
+            add_rect(panel, 0, 0, width, height, LEGEND_BG)
+            draw = VectorDraw(panel)
+        else:
+            panel = Image.new("RGBA", (width, height), LEGEND_BG)
+            draw = ImageDraw.Draw(panel)
+
+        title = "Wilayah Terdampak Rob:"
+        if total > 1:
+            title = f"Wilayah Terdampak Rob ({no}/{total}):"
+
+        draw.text((40, 60), title, fill="white", font=title_font)
+
+        draw.line(
+            [(40, 130), (width - 40, 130)],
+            fill="white",
+            width=4
+        )
 
-    panel = Image.new("RGBA", (width, height), (0, 40, 112, 255))
-    draw = ImageDraw.Draw(panel)
+        draw_legend_items(draw, items, layout, font_path, x0=60, y0=160)
+        pages.append(panel)
 
-    title_font = ImageFont.truetype(font_path, 50)
-    item_font = ImageFont.truetype(font_path, 42)
+    return pages
 
-    draw.text((40, 60), "Wilayah Terdampak Rob:", fill="white", font=title_font)
 
-    draw.line(
-        [(40, 130), (width - 40, 130)],
-        fill="white",
-        width=4
+def map_viewport(layer, width):
+    """Viewport peta selebar `width` piksel, extent = isi data"""
+    return make_viewport(
+        content_extent(layer["bounds"], EXTENT_INDONESIA), width, MAP_WIDTH_IN
     )
 
-    y = 160
-    for area in areas:
-        draw.text((60, y), f"Pesisir Kec. {area}", fill="white", font=item_font)
-        y += 55
 
-    return panel
+def render_map_matplotlib(gdf, wilayah, vp, recorder=None):
+    """
+    Peta backend matplotlib (+ cartopy jika ada), dirender langsung
+    di ukuran viewport → tanpa resize LANCZOS.
+    """
+
+    # ========================================================
+    # CREATE MAP FIGURE (UKURAN PIKSEL FINAL)
+    # ========================================================
+    with stage(recorder, "plot"):
+        fig = new_figure(vp["width"], vp["height"], MAP_WIDTH_IN)
+        x0, x1, y0, y1 = vp["extent"]
+
+        # Axes memenuhi figure; rasio figure = rasio extent
+        if CARTOPY_AVAILABLE:
+            ax = fig.add_axes([0, 0, 1, 1], projection=ccrs.PlateCarree())
+        else:
+            ax = fig.add_axes([0, 0, 1, 1])
+
+        ax.set_facecolor("none")
+
+        gdf.plot(
+            ax=ax,
+            facecolor="#E5E5E5",
+            edgecolor="white",
+            linewidth=0.5,
+            zorder=1
+        )
+
+        wilayah.plot(
+            ax=ax,
+            facecolor="#FFB703",
+            edgecolor="red",
+            linewidth=2,
+            linestyle="--",
+            alpha=0.85,
+            zorder=3
+        )
+
+        if CARTOPY_AVAILABLE:
+            ax.set_extent([x0, x1, y0, y1], crs=ccrs.PlateCarree())
+        else:
+            ax.set_xlim(x0, x1)
+            ax.set_ylim(y0, y1)
+            ax.set_aspect("auto")
+
+        create_map_annotations(ax, wilayah)
+        ax.axis("off")
+
+    # ========================================================
+    # RASTERIZE MAP (AGG BUFFER → PIL, TANPA PNG ROUND-TRIP)
+    # ========================================================
+    with stage(recorder, "rasterize"):
+        try:
+            map_img = figure_to_image(fig, dpi=None, transparent=True,
+                                      tight=False)
+        finally:
+            plt.close(fig)  # ⛔ WAJIB
+
+    return map_img
+
+
+def render_map_raster(layer, selected, vp):
+    """Peta backend raster di ukuran viewport (tanpa matplotlib/cartopy)"""
+    rings = get_rings(layer)
+    canvas = new_canvas(vp)
+
+    draw_polygons(canvas, rings, vp, fill="#E5E5E5", outline="white",
+                  linewidth=0.5)
+    draw_polygons(canvas, rings, vp, select=selected, fill="#FFB703",
+                  outline="red", linewidth=2, linestyle="--", alpha=0.85)
+
+    anchors, names = label_points(layer["gdf"][selected])
+    draw_annotations(canvas, anchors, names, vp)
+    return canvas
 
 # ============================================================
 # MAIN FUNCTION
@@ -127,24 +292,37 @@ def plot_rob_affected_areas(
     save_path=None,
     tanggal_rekap=None,
     rekap_bul=False,
+    return_legend_pages=False,
+    recorder=None,
+    backend=None,
 ):
     """
     Generate infografis rob.
+    recorder: StageRecorder opsional (durasi per tahap)
+    backend : "matplotlib" | "raster" (None = DEFAULT_BACKEND)
     Return: PIL.Image
+            (PIL.Image, [halaman legenda lanjutan]) jika return_legend_pages
     """
 
     if not affected_areas:
         raise ValueError("affected_areas kosong")
 
+    backend = backend or DEFAULT_BACKEND
+    if backend not in ("matplotlib", "raster"):
+        raise ValueError(f"Backend tidak dikenal: {backend}")
+
     # ========================================================
     # LOAD SPATIAL DATA
     # ========================================================
-    try:
-        gdf = gpd.read_file(GDB_KECAMATAN)
-    except Exception as e:
-        raise RuntimeError(f"Gagal membaca data spasial: {e}")
+    with stage(recorder, "load_spatial"):
+        try:
+            layer = load_kecamatan(GDB_KECAMATAN)  # cache bersama
+        except Exception as e:
+            raise RuntimeError(f"Gagal membaca data spasial: {e}")
 
-    wilayah = gdf[gdf["NAMOBJ"].isin(affected_areas)]
+        gdf = layer["gdf"]
+        selected, _ = select_areas(gdf, affected_areas)
+        wilayah = gdf[selected]
 
     if wilayah.empty:
         raise ValueError("Tidak ada wilayah yang cocok dengan affected_areas")
@@ -157,122 +335,145 @@ def plot_rob_affected_areas(
     if not bg_path.exists():
         raise RuntimeError(f"Background tidak ditemukan: {bg_path}")
 
-    bg_img = Image.open(bg_path).convert("RGBA")
+    with stage(recorder, "load_assets"):
+        bg_img = get_background(bg_path)  # cache bersama → jangan dimodifikasi
+        font_path = get_font_path()
     bg_w, bg_h = bg_img.size
 
     # ========================================================
-    # CREATE MAP FIGURE
+    # MAP (BACKEND MATPLOTLIB / RASTER)
     # ========================================================
-    fig = plt.figure(figsize=(18, 12), facecolor="none")
+    # Kedua backend merender tepat selebar background (tanpa resize)
+    vp = map_viewport(layer, bg_w)
 
-    if CARTOPY_AVAILABLE:
-        ax = plt.axes(projection=ccrs.PlateCarree())
-        ax.set_extent([94, 142, -12, 8], crs=ccrs.PlateCarree())
+    if backend == "raster":
+        with stage(recorder, "rasterize"):
+            map_img = render_map_raster(layer, selected, vp)
     else:
-        ax = plt.axes()
+        map_img = render_map_matplotlib(gdf, wilayah, vp, recorder)
+    new_size = map_img.size
 
-    ax.set_facecolor("none")
-
-    gdf.plot(
-        ax=ax,
-        facecolor="#E5E5E5",
-        edgecolor="white",
-        linewidth=0.5,
-        zorder=1
-    )
+    # ========================================================
+    # COMPOSE FINAL IMAGE
+    # ========================================================
+    with stage(recorder, "compose"):
+        canvas = bg_img.copy()
+        canvas.paste(
+            map_img,
+            ((bg_w - new_size[0]) // 2, 360),
+            map_img
+        )
 
-    wilayah.plot(
-        ax=ax,
-        facecolor="#FFB703",
-        edgecolor="red",
-        linewidth=2,
-        linestyle="--",
-        alpha=0.85,
-        zorder=3
-    )
+        legend, *legend_pages = create_legend_pages(
+            affected_areas,
+            width=LEGEND_WIDTH,
+            height=bg_h,
+            font_path=font_path
+        )
 
-    create_map_annotations(ax, wilayah)
-    ax.axis("off")
+        final_img = Image.new("RGBA", (bg_w + LEGEND_WIDTH, bg_h))
+        final_img.paste(canvas, (0, 0))
+        final_img.paste(legend, (bg_w, 0))
+
+        draw = ImageDraw.Draw(final_img)
+        for y in range(0, bg_h, 28):
+            draw.line(
+                [(bg_w, y), (bg_w, y + 14)],
+                fill="white",
+                width=4
+            )
+
+        if tanggal_rekap:
+            font = get_font(72, font_path)
+            draw.text(
+                (bg_w - 720, 350),
+                tanggal_rekap,
+                fill="white",
+                font=font
+            )
 
     # ========================================================
-    # EXPORT MAP TO BUFFER (ANTI MEMORY LEAK)
+    # SAVE FILE (OPTIONAL)
     # ========================================================
-    buf = io.BytesIO()
-
-    plt.savefig(
-        buf,
-        format="png",
-        dpi=150,
-        bbox_inches="tight",
-        transparent=True
-    )
+    if save_path:
+        with stage(recorder, "save"):
+            # ⚠️ write_encoded tidak crash jika disk read-only
+            write_encoded(encode_image(final_img), save_path)
 
-    plt.close(fig)  # ⛔ WAJIB
-    buf.seek(0)
+    if return_legend_pages:
+        return final_img, legend_pages
 
-    map_img = Image.open(buf).convert("RGBA")
+    return final_img
 
-    # ========================================================
-    # RESIZE MAP
-    # ========================================================
-    scale = bg_w / map_img.size[0]
-    new_size = (
-        int(map_img.size[0] * scale),
-        int(map_img.size[1] * scale)
-    )
 
-    map_img = map_img.resize(new_size, Image.Resampling.LANCZOS)
+# ============================================================
+# OUTPUT VEKTOR (SVG / PDF)
+# ============================================================
 
-    # ========================================================
-    # COMPOSE FINAL IMAGE
-    # ========================================================
-    canvas = bg_img.copy()
-    canvas.paste(
-        map_img,
-        ((bg_w - new_size[0]) // 2, 360),
-        map_img
-    )
+def build_vector_document(
+    affected_areas,
+    tanggal_rekap=None,
+    rekap_bul=False,
+    recorder=None,
+):
+    """
+    Tata letak yang sama dengan plot_rob_affected_areas sebagai dokumen
+    vektor (lihat vector.py).
+    Return: (dokumen, [dokumen halaman legenda lanjutan])
+    """
+    if not affected_areas:
+        raise ValueError("affected_areas kosong")
 
-    font_path = font_manager.findfont(
-        font_manager.FontProperties(family="DejaVu Sans")
-    )
+    with stage(recorder, "load_spatial"):
+        layer = load_kecamatan(GDB_KECAMATAN)
+        selected, _ = select_areas(layer["gdf"], affected_areas)
 
-    legend = create_legend_panel(
-        affected_areas,
-        width=1050,
-        height=bg_h,
-        font_path=font_path
-    )
+    if not selected.any():
+        raise ValueError("Tidak ada wilayah yang cocok dengan affected_areas")
 
-    final_img = Image.new("RGBA", (bg_w + 1050, bg_h))
-    final_img.paste(canvas, (0, 0))
-    final_img.paste(legend, (bg_w, 0))
+    bg_path = BG_BULANAN if rekap_bul else BG_HARIAN
 
-    draw = ImageDraw.Draw(final_img)
-    for y in range(0, bg_h, 28):
-        draw.line(
-            [(bg_w, y), (bg_w, y + 14)],
-            fill="white",
-            width=4
+    with stage(recorder, "load_assets"):
+        bg_w, bg_h = get_background(bg_path).size
+        font_path = get_font_path()
+
+    with stage(recorder, "plot"):
+        vp = map_viewport(layer, bg_w)
+        rings = get_rings(layer, tolerance=simplify_tolerance(vp))
+        offset = ((bg_w - vp["width"]) // 2, 360)
+
+        doc = new_document(bg_w + LEGEND_WIDTH, bg_h)
+        add_image(doc, bg_path, 0, 0, bg_w, bg_h)
+
+        add_map(doc, rings, vp, [
+            {"fill": "#E5E5E5", "outline": "white", "linewidth": 0.5},
+            {"select": selected, "fill": "#FFB703", "outline": "red",
+             "linewidth": 2, "linestyle": "--", "alpha": 0.85},
+        ], offset=offset)
+
+        anchors, names = label_points(layer["gdf"][selected])
+        if len(anchors):
+            add_annotations(doc, layout_annotations(anchors, names, vp), vp,
+                            offset=offset)
+
+        legend, *legend_pages = create_legend_pages(
+            affected_areas,
+            width=LEGEND_WIDTH,
+            height=bg_h,
+            font_path=font_path,
+            vector=True
         )
+        add_group(doc, legend, dx=bg_w)
 
-    if tanggal_rekap:
-        font = ImageFont.truetype(font_path, 72)
-        draw.text(
-            (bg_w - 720, 350),
-            tanggal_rekap,
-            fill="white",
-            font=font
-        )
+        add_polyline(doc, [(bg_w, 0), (bg_w, bg_h)], "white", 4,
+                     dash=(14, 14))
 
-    # ========================================================
-    # SAVE FILE (OPTIONAL)
-    # ========================================================
-    if save_path:
-        try:
-            final_img.save(save_path, dpi=(300, 300))
-        except Exception:
-            # ⚠️ jangan crash jika disk read-only
-            pass
+        if tanggal_rekap:
+            VectorDraw(doc).text(
+                (bg_w - 720, 350),
+                tanggal_rekap,
+                fill="white",
+                font=get_font(72, font_path)
+            )
 
-    return final_img
+    return doc, legend_pages
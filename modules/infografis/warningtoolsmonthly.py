@@ -2,15 +2,38 @@
 # WARNING TOOLS – REKAP BULANAN (FINAL FIX)
 # ============================================================
 
+from collections import OrderedDict
 from pathlib import Path
 import os
-import io
+import threading
 import warnings
 
-import geopandas as gpd
 import matplotlib.pyplot as plt
-from PIL import Image, ImageDraw, ImageFont
-from matplotlib import font_manager
+import numpy as np
+from PIL import Image, ImageDraw
+
+from .assets import _file_key, get_background, get_font, get_font_path
+from .encoding import encode_image, write_encoded
+from .legend import draw_legend_items, layout_legend
+from .profiling import stage
+from .raster import (
+    EXTENT_INDONESIA,
+    content_extent,
+    draw_polygons,
+    make_viewport,
+    new_canvas,
+)
+from .render import figure_to_image, new_figure
+from .spatial import NAME_COLUMN, get_rings, load_kecamatan, select_areas
+from .vector import (
+    VectorDraw,
+    add_group,
+    add_image,
+    add_map,
+    add_rect,
+    new_document,
+    simplify_tolerance,
+)
 
 warnings.filterwarnings("ignore")
 
@@ -20,10 +43,18 @@ warnings.filterwarnings("ignore")
 
 IS_STREAMLIT_CLOUD = os.getenv("STREAMLIT_CLOUD") == "1"
 
-if not IS_STREAMLIT_CLOUD:
+try:
     import cartopy.crs as ccrs
-else:
+    CARTOPY_AVAILABLE = True
+except Exception:
     ccrs = None
+    CARTOPY_AVAILABLE = False
+
+# Streamlit Cloud / tanpa cartopy → backend raster (Pillow langsung)
+if IS_STREAMLIT_CLOUD or not CARTOPY_AVAILABLE:
+    DEFAULT_BACKEND = "raster"
+else:
+    DEFAULT_BACKEND = "matplotlib"
 
 # ============================================================
 # PATH CONFIG
@@ -34,47 +65,247 @@ BASE_DIR = Path(__file__).resolve().parents[2]
 GDB_KECAMATAN = BASE_DIR / "data" / "spatial" / "batas_kecamatan.gdb"
 BG_BULANAN = BASE_DIR / "assets" / "background" / "bg_img_rekapbul.png"
 
+# Lebar peta efektif figure 24×12 lama (axes default 77.5% lebar);
+# menentukan skala point → piksel (ketebalan garis)
+MAP_WIDTH_IN = 18.6
+
+LEGEND_BG = "#002870"
+
+# Mode choropleth: kelas frekuensi kejadian (batas bawah, warna, label)
+CHOROPLETH_CLASSES = (
+    (1, "#FDAE6B", "1×"),
+    (2, "#FD8D3C", "2–3×"),
+    (4, "#E6550D", "4–6×"),
+    (7, "#A63603", "≥ 7×"),
+)
+
+# Mode perbandingan periode: (status, warna, label)
+COMPARISON_CLASSES = (
+    ("baru", "red", "Baru"),
+    ("berlanjut", "#FD8D3C", "Berlanjut"),
+    ("berakhir", "#4A90D9", "Berakhir"),
+)
+
 # ============================================================
 # LEGEND PANEL
 # ============================================================
 
-def create_legend_panel(wilayah_list, width, height, font_path):
-    panel = Image.new("RGBA", (width, height), (0, 40, 112, 255))
-    draw = ImageDraw.Draw(panel)
+def create_legend_pages(wilayah_list, width, font_path, max_height=1400,
+                        vector=False, counts=None, title=None, key=None):
+    """
+    Panel legenda bawah; tinggi mengikuti isi, overflow → halaman lanjutan.
+    vector=True → dokumen vektor (modules.infografis.vector), bukan PIL.Image
+    counts      → mode choropleth: jumlah kejadian per entri + kunci warna
+    title / key → judul & kunci warna [(warna, label)] kustom
+    """
+    labels = [f"Kec. {wilayah}" for wilayah in wilayah_list]
+    if counts is not None:
+        labels = [f"{label} ({counts[w]}×)"
+                  for label, w in zip(labels, wilayah_list)]
+
+    layout = layout_legend(
+        labels,
+        width,
+        font_path,
+        max_height=max_height,
+        top=150,
+        sizes=(38, 34, 30, 26, 22),
+        line_height=1.16,
+    )
+
+    if counts is not None:
+        title = title or "Wilayah Terdampak Rob (Frekuensi Kejadian):"
+        key = key or [(color, label) for _, color, label in CHOROPLETH_CLASSES]
+    title = title or "Wilayah Terdampak Rob (Warna Merah):"
+
+    title_font = get_font(48, font_path)
+    height = layout["height"]
+    total = len(layout["pages"])
+    pages = []
+
+    for no, items in enumerate(layout["pages"], start=1):
+        if vector:
+            panel = new_document(width, height)
+            add_rect(panel, 0, 0, width, height, LEGEND_BG)
+            draw = VectorDraw(panel)
+        else:
+            panel = Image.new("RGBA", (width, height), LEGEND_BG)
+            draw = ImageDraw.Draw(panel)
+
+        x = 0
+        while x < width:
+            draw.line([(x, 6), (x + 22, 6)], fill="white", width=3)
+            x += 36
+
+        page_title = title
+        if total > 1:
+            page_title = f"{title.rstrip(':')} {no}/{total}:"
+
+        draw.text((40, 50), page_title, fill="white", font=title_font)
 
-    title_font = ImageFont.truetype(font_path, 48)
-    item_font = ImageFont.truetype(font_path, 38)
+        if key:
+            _draw_class_key(draw, width, font_path, key)
 
-    x = 0
-    while x < width:
-        draw.line([(x, 6), (x + 22, 6)], fill="white", width=3)
-        x += 36
+        draw.line([(40, 115), (width - 40, 115)], fill="white", width=2)
 
-    draw.text(
-        (40, 50),
-        "Wilayah Terdampak Rob (Warna Merah):",
-        fill="white",
-        font=title_font
+        draw_legend_items(draw, items, layout, font_path, x0=40, y0=150)
+        pages.append(panel)
+
+    return pages
+
+
+def _draw_class_key(draw, width, font_path, key):
+    """Kunci warna [(warna, label)], rata kanan di baris judul"""
+    font = get_font(34, font_path)
+    x = width - 40
+    for color, label in reversed(key):
+        x -= font.getbbox(label)[2]
+        draw.text((x, 56), label, fill="white", font=font)
+        x -= 62
+        # Kotak warna = garis tebal (ImageDraw & VectorDraw sama-sama punya)
+        draw.line([(x, 76), (x + 50, 76)], fill=color, width=36)
+        x -= 40
+
+# ============================================================
+# CHOROPLETH
+# ============================================================
+
+def classify_counts(gdf, counts):
+    """
+    Kelas frekuensi per baris GDB (vektor, tanpa loop per wilayah).
+    counts: {nama kecamatan: jumlah kejadian}
+    Return: int array (N,), -1 = tidak terdampak
+    """
+    values = gdf[NAME_COLUMN].map(counts).fillna(0).to_numpy(dtype="int64")
+    bounds = np.array([c[0] for c in CHOROPLETH_CLASSES])
+    classes = np.searchsorted(bounds, values, side="right") - 1
+    classes[values < bounds[0]] = -1
+    return classes
+
+
+def class_layers(classes):
+    """(mask, warna) per kelas yang terisi → satu gambar batch per kelas"""
+    return [
+        (classes == k, color)
+        for k, (_, color, _) in enumerate(CHOROPLETH_CLASSES)
+        if (classes == k).any()
+    ]
+
+# ============================================================
+# MAP BACKEND
+# ============================================================
+
+def map_viewport(layer, width):
+    """Viewport peta selebar `width` piksel, extent = isi data"""
+    return make_viewport(
+        content_extent(layer["bounds"], EXTENT_INDONESIA), width, MAP_WIDTH_IN
     )
 
-    draw.line([(40, 115), (width - 40, 115)], fill="white", width=2)
-
-    n = len(wilayah_list)
-    num_cols = 4 if n > 60 else 3 if n > 30 else 2
-    col_width = (width - 80) // num_cols
-    row_height = 44
-
-    for i, wilayah in enumerate(wilayah_list):
-        col = i % num_cols
-        row = i // num_cols
-        draw.text(
-            (40 + col * col_width, 150 + row * row_height),
-            f"Kec. {wilayah}",
-            fill="white",
-            font=item_font
-        )
 
-    return panel
+def render_map_matplotlib(batas, wilayah, vp, recorder=None, colors=None):
+    """
+    Peta cartopy PlateCarree, dirender langsung di ukuran viewport.
+    colors: warna per baris `wilayah` (choropleth) → tetap SATU koleksi
+    """
+    with stage(recorder, "plot"):
+        fig = new_figure(vp["width"], vp["height"], MAP_WIDTH_IN)
+        ax = fig.add_axes([0, 0, 1, 1], projection=ccrs.PlateCarree())
+
+        batas.plot(ax=ax, facecolor="#E6E6E6", edgecolor="white", linewidth=0.4)
+        if colors is None:
+            wilayah.plot(ax=ax, facecolor="red", edgecolor="darkred",
+                         linewidth=0.8)
+        else:
+            wilayah.plot(ax=ax, color=list(colors), edgecolor="darkred",
+                         linewidth=0.8)
+
+        ax.set_extent(list(vp["extent"]), crs=ccrs.PlateCarree())
+        ax.axis("off")
+
+    with stage(recorder, "rasterize"):
+        try:
+            map_img = figure_to_image(fig, dpi=None, transparent=True,
+                                      tight=False)
+        finally:
+            plt.close(fig)
+
+    return map_img
+
+
+def render_map_raster(layer, selected, vp, classes=None):
+    """
+    Peta backend raster di ukuran viewport (tanpa matplotlib/cartopy).
+    classes: hasil classify_counts → satu draw_polygons per kelas
+    """
+    rings = get_rings(layer)
+    canvas = new_canvas(vp)
+
+    draw_polygons(canvas, rings, vp, fill="#E6E6E6", outline="white",
+                  linewidth=0.4)
+
+    if classes is None:
+        draw_polygons(canvas, rings, vp, select=selected, fill="red",
+                      outline="darkred", linewidth=0.8)
+        return canvas
+
+    for mask, color in class_layers(classes):
+        draw_polygons(canvas, rings, vp, select=mask, fill=color)
+    draw_polygons(canvas, rings, vp, select=selected, outline="darkred",
+                  linewidth=0.8)
+    return canvas
+
+# ============================================================
+# BASEMAP TER-CACHE (TIME-LAPSE / PERBANDINGAN)
+# ============================================================
+
+# Kunci: (file background, layer, lebar) → ganti background / GDB
+# otomatis invalid; dibatasi agar variasi lebar tidak menumpuk di memori
+BASEMAP_CACHE_SIZE = 4
+
+_basemap_lock = threading.Lock()
+_basemaps = OrderedDict()
+
+
+def get_basemap(width=None):
+    """
+    Background + seluruh batas kecamatan (abu-abu) di lebar `width`
+    (None = lebar asli background), dirender sekali per kunci.
+    Return dict: layer, image (RGBA, dipakai bersama → .copy() dulu),
+                 vp, offset (posisi peta), scale (terhadap background asli)
+    """
+    layer = load_kecamatan(GDB_KECAMATAN)
+    bg = get_background(BG_BULANAN)
+    width = width or bg.width
+
+    key = (_file_key(BG_BULANAN), layer["key"], width)
+    with _basemap_lock:
+        if key in _basemaps:
+            _basemaps.move_to_end(key)
+            return _basemaps[key]
+
+    scale = width / bg.width
+    base = bg.copy() if scale == 1 else bg.resize(
+        (width, round(bg.height * scale)), Image.Resampling.LANCZOS
+    )
+
+    vp = map_viewport(layer, int(width * 0.92))
+    offset = ((width - vp["width"]) // 2, round(280 * scale))
+
+    map_img = new_canvas(vp)
+    draw_polygons(map_img, get_rings(layer), vp, fill="#E6E6E6",
+                  outline="white", linewidth=0.4)
+    base.alpha_composite(map_img, offset)
+
+    entry = {"layer": layer, "image": base, "vp": vp,
+             "offset": offset, "scale": scale}
+
+    with _basemap_lock:
+        # Thread lain mungkin selesai duluan → pakai milik mereka
+        entry = _basemaps.setdefault(key, entry)
+        _basemaps.move_to_end(key)
+        while len(_basemaps) > BASEMAP_CACHE_SIZE:
+            _basemaps.popitem(last=False)
+    return entry
 
 # ============================================================
 # MAIN FUNCTION (KOMPATIBEL DENGAN service.py)
@@ -89,8 +320,13 @@ def plot_rob_affected_areas(
     """
     WAJIB:
     - Cocok dengan service.py
-    - Tidak crash Streamlit Cloud
+    - Tidak crash Streamlit Cloud (tanpa cartopy → backend raster)
     - Return PIL.Image
+      (PIL.Image, [halaman legenda lanjutan]) jika return_legend_pages=True
+    - recorder=StageRecorder opsional (durasi per tahap)
+    - backend="matplotlib" | "raster" opsional (default DEFAULT_BACKEND)
+    - counts={kecamatan: jumlah kejadian} opsional → mode choropleth
+      (warna per kelas frekuensi, lihat CHOROPLETH_CLASSES)
     """
 
     # ========================================================
@@ -102,30 +338,12 @@ def plot_rob_affected_areas(
             or kwargs.get("affected_areas_list")
         )
 
-    # ========================================================
-    # STREAMLIT CLOUD MODE (AMAN)
-    # ========================================================
-    if IS_STREAMLIT_CLOUD:
-        img = Image.new("RGBA", (900, 420), (240, 240, 240, 255))
-        draw = ImageDraw.Draw(img)
-
-        font_path = font_manager.findfont(
-            font_manager.FontProperties(family="DejaVu Sans")
-        )
-        font = ImageFont.truetype(font_path, 26)
-
-        draw.text(
-            (40, 160),
-            "Infografis rekap bulanan\n"
-            "tersedia di server internal\n"
-            "(Cartopy tidak tersedia di Streamlit Cloud).",
-            fill="black",
-            font=font
-        )
-        return img
+    counts = kwargs.get("counts")
+    if not affected_areas and counts:
+        affected_areas = list(counts)
 
     # ========================================================
-    # VALIDASI (SERVER INTERNAL)
+    # VALIDASI
     # ========================================================
     if not affected_areas:
         raise ValueError("affected_areas kosong")
@@ -136,95 +354,258 @@ def plot_rob_affected_areas(
     if not BG_BULANAN.exists():
         raise FileNotFoundError(f"Background tidak ditemukan: {BG_BULANAN}")
 
+    recorder = kwargs.get("recorder")
+
+    backend = kwargs.get("backend") or DEFAULT_BACKEND
+    if backend == "matplotlib" and not CARTOPY_AVAILABLE:
+        raise RuntimeError("Backend matplotlib membutuhkan cartopy")
+    if backend not in ("matplotlib", "raster"):
+        raise ValueError(f"Backend tidak dikenal: {backend}")
+
     # ========================================================
     # LOAD DATA
     # ========================================================
-    batas = gpd.read_file(GDB_KECAMATAN)
-    wilayah = batas[batas["NAMOBJ"].isin(affected_areas)]
+    with stage(recorder, "load_spatial"):
+        layer = load_kecamatan(GDB_KECAMATAN)  # cache bersama
+        batas = layer["gdf"]
 
-    if wilayah.empty:
-        raise ValueError("Nama kecamatan tidak ditemukan di geodatabase")
+        # Urutan legenda = urutan GDB (vektor, tanpa iterrows)
+        selected, ordered_names = select_areas(batas, affected_areas)
+        wilayah = batas[selected]
 
-    ordered_names = [
-        row["NAMOBJ"]
-        for _, row in batas.iterrows()
-        if row["NAMOBJ"] in affected_areas
-    ]
+        if wilayah.empty:
+            raise ValueError("Nama kecamatan tidak ditemukan di geodatabase")
+
+        classes = None
+        if counts:
+            classes = classify_counts(batas, counts)
+            counts = {name: counts.get(name, 0) for name in ordered_names}
 
     # ========================================================
     # BACKGROUND
     # ========================================================
-    bg_img = Image.open(BG_BULANAN).convert("RGBA")
+    with stage(recorder, "load_assets"):
+        bg_img = get_background(BG_BULANAN)  # cache bersama → jangan dimodifikasi
+        font_path = get_font_path()
     bg_w, bg_h = bg_img.size
 
     # ========================================================
     # DRAW MAP (BESAR & FIX)
     # ========================================================
-    fig = plt.figure(figsize=(24, 12), facecolor="none")
-    ax = plt.axes(projection=ccrs.PlateCarree())
+    # Lebar final langsung 92% background (MIRIP SENIOR), tanpa resize
+    vp = map_viewport(layer, int(bg_w * 0.92))
+
+    if backend == "raster":
+        with stage(recorder, "rasterize"):
+            map_img = render_map_raster(layer, selected, vp, classes)
+    else:
+        colors = None
+        if classes is not None:
+            palette = np.array([c[1] for c in CHOROPLETH_CLASSES] + ["red"])
+            colors = palette[classes[selected]]
+        map_img = render_map_matplotlib(batas, wilayah, vp, recorder, colors)
+
+    with stage(recorder, "compose"):
+        overlay = Image.new("RGBA", (bg_w, bg_h), (0, 0, 0, 0))
+        overlay.paste(
+            map_img,
+            ((bg_w - map_img.width) // 2, 280),
+            map_img
+        )
 
-    batas.plot(ax=ax, facecolor="#E6E6E6", edgecolor="white", linewidth=0.4)
-    wilayah.plot(ax=ax, facecolor="red", edgecolor="darkred", linewidth=0.8)
+        map_with_bg = Image.alpha_composite(bg_img, overlay)
+
+        # ====================================================
+        # TANGGAL
+        # ====================================================
+        if tanggal_rekap:
+            draw = ImageDraw.Draw(map_with_bg)
+            font = get_font(72, font_path)
+            draw.text((bg_w - 900, 300), tanggal_rekap, fill="white", font=font)
+
+        # ====================================================
+        # LEGEND
+        # ====================================================
+        legend_panel, *legend_pages = create_legend_pages(
+            ordered_names,
+            bg_w,
+            font_path,
+            max_height=1400,
+            counts=counts or None
+        )
+        legend_height = legend_panel.height
 
-    ax.set_extent([94, 142, -12, 8], crs=ccrs.PlateCarree())
-    ax.axis("off")
+        final_img = Image.new(
+            "RGBA", (bg_w, bg_h + legend_height), (0, 0, 0, 0)
+        )
+        final_img.paste(map_with_bg, (0, 0))
+        final_img.paste(legend_panel, (0, bg_h))
 
-    buf = io.BytesIO()
-    plt.savefig(buf, dpi=150, bbox_inches="tight", transparent=True)
-    plt.close(fig)
-    buf.seek(0)
+    if save_path:
+        with stage(recorder, "save"):
+            write_encoded(encode_image(final_img), save_path)
 
-    map_img = Image.open(buf).convert("RGBA")
+    if kwargs.get("return_legend_pages"):
+        return final_img, legend_pages
 
-    # ========================================================
-    # SCALE MAP (MIRIP SENIOR)
-    # ========================================================
-    target_width = int(bg_w * 0.92)
-    scale = target_width / map_img.width
-    map_img = map_img.resize(
-        (int(map_img.width * scale), int(map_img.height * scale)),
-        Image.Resampling.LANCZOS
-    )
+    return final_img
 
-    overlay = Image.new("RGBA", (bg_w, bg_h), (0, 0, 0, 0))
-    overlay.paste(
-        map_img,
-        ((bg_w - map_img.width) // 2, 280),
-        map_img
-    )
 
-    map_with_bg = Image.alpha_composite(bg_img, overlay)
+# ============================================================
+# OUTPUT VEKTOR (SVG / PDF)
+# ============================================================
 
-    # ========================================================
-    # TANGGAL
-    # ========================================================
-    font_path = font_manager.findfont(
-        font_manager.FontProperties(family="DejaVu Sans")
-    )
+def build_vector_document(affected_areas=None, tanggal_rekap=None, **kwargs):
+    """
+    Tata letak rekap bulanan sebagai dokumen vektor (lihat vector.py).
+    Return: (dokumen, [dokumen halaman legenda lanjutan])
+    """
+    if not affected_areas:
+        affected_areas = (
+            kwargs.get("kecamatan_list")
+            or kwargs.get("affected_areas_list")
+        )
 
-    if tanggal_rekap:
-        draw = ImageDraw.Draw(map_with_bg)
-        font = ImageFont.truetype(font_path, 72)
-        draw.text((bg_w - 900, 300), tanggal_rekap, fill="white", font=font)
+    counts = kwargs.get("counts")
+    if not affected_areas and counts:
+        affected_areas = list(counts)
 
-    # ========================================================
-    # LEGEND
-    # ========================================================
-    legend_height = 1400
-    legend_panel = create_legend_panel(
-        ordered_names,
-        bg_w,
-        legend_height,
-        font_path
-    )
+    if not affected_areas:
+        raise ValueError("affected_areas kosong")
 
-    final_img = Image.new(
-        "RGBA", (bg_w, bg_h + legend_height), (0, 0, 0, 0)
-    )
-    final_img.paste(map_with_bg, (0, 0))
-    final_img.paste(legend_panel, (0, bg_h))
+    recorder = kwargs.get("recorder")
 
-    if save_path:
-        final_img.save(save_path, dpi=(300, 300))
+    with stage(recorder, "load_spatial"):
+        layer = load_kecamatan(GDB_KECAMATAN)
+        selected, ordered_names = select_areas(layer["gdf"], affected_areas)
 
-    return final_img
+    if not selected.any():
+        raise ValueError("Nama kecamatan tidak ditemukan di geodatabase")
+
+    if counts:
+        highlight = [
+            {"select": mask, "fill": color}
+            for mask, color in class_layers(
+                classify_counts(layer["gdf"], counts)
+            )
+        ] + [{"select": selected, "outline": "darkred", "linewidth": 0.8}]
+        counts = {name: counts.get(name, 0) for name in ordered_names}
+    else:
+        highlight = [{"select": selected, "fill": "red", "outline": "darkred",
+                      "linewidth": 0.8}]
+
+    with stage(recorder, "load_assets"):
+        bg_w, bg_h = get_background(BG_BULANAN).size
+        font_path = get_font_path()
+
+    with stage(recorder, "plot"):
+        vp = map_viewport(layer, int(bg_w * 0.92))
+        rings = get_rings(layer, tolerance=simplify_tolerance(vp))
+
+        legend_panel, *legend_pages = create_legend_pages(
+            ordered_names,
+            bg_w,
+            font_path,
+            max_height=1400,
+            vector=True,
+            counts=counts or None
+        )
+
+        doc = new_document(bg_w, bg_h + legend_panel["height"])
+        add_image(doc, BG_BULANAN, 0, 0, bg_w, bg_h)
+
+        add_map(doc, rings, vp, [
+            {"fill": "#E6E6E6", "outline": "white", "linewidth": 0.4},
+        ] + highlight, offset=((bg_w - vp["width"]) // 2, 280))
+
+        if tanggal_rekap:
+            VectorDraw(doc).text(
+                (bg_w - 900, 300),
+                tanggal_rekap,
+                fill="white",
+                font=get_font(72, font_path)
+            )
+
+        add_group(doc, legend_panel, dy=bg_h)
+
+    return doc, legend_pages
+
+
+# ============================================================
+# PERBANDINGAN PERIODE (BULAN INI vs BULAN LALU)
+# ============================================================
+
+def compare_areas(gdf, current, previous):
+    """
+    Status per baris GDB dari dua daftar kecamatan: operasi himpunan
+    pada mask indeks GDB (bukan perbandingan string per pasangan).
+    Return: {status: mask bool} sesuai COMPARISON_CLASSES
+    """
+    cur, _ = select_areas(gdf, current)
+    prev, _ = select_areas(gdf, previous)
+    return {
+        "baru": cur & ~prev,
+        "berlanjut": cur & prev,
+        "berakhir": prev & ~cur,
+    }
+
+
+def plot_rob_comparison(current, previous, tanggal_rekap=None, recorder=None):
+    """
+    Peta beda-warna dua periode di atas basemap ter-cache
+    (baru / berlanjut / berakhir, lihat COMPARISON_CLASSES).
+    Return: (PIL.Image, [halaman legenda lanjutan])
+    """
+    with stage(recorder, "load_spatial"):
+        base = get_basemap()
+        layer, vp = base["layer"], base["vp"]
+        gdf = layer["gdf"]
+        status = compare_areas(gdf, current, previous)
+
+    changed = np.logical_or.reduce(list(status.values()))
+    if not changed.any():
+        raise ValueError("Nama kecamatan tidak ditemukan di geodatabase")
+
+    with stage(recorder, "rasterize"):
+        rings = get_rings(layer)
+        overlay = new_canvas(vp)
+        for name, color, _ in COMPARISON_CLASSES:
+            if status[name].any():
+                draw_polygons(overlay, rings, vp, select=status[name],
+                              fill=color)
+        draw_polygons(overlay, rings, vp, select=changed, outline="#333333",
+                      linewidth=0.8)
+
+    with stage(recorder, "compose"):
+        font_path = get_font_path()
+        map_with_bg = base["image"].copy()
+        map_with_bg.alpha_composite(overlay, base["offset"])
+        bg_w, bg_h = map_with_bg.size
+
+        if tanggal_rekap:
+            draw = ImageDraw.Draw(map_with_bg)
+            draw.text((bg_w - 900, 300), tanggal_rekap, fill="white",
+                      font=get_font(72, font_path))
+
+        names = gdf[NAME_COLUMN].to_numpy()
+        entries = [
+            f"{n} ({label.lower()})"
+            for name, _, label in COMPARISON_CLASSES
+            for n in names[status[name]]
+        ]
+        legend_panel, *legend_pages = create_legend_pages(
+            entries,
+            bg_w,
+            font_path,
+            max_height=1400,
+            title="Perubahan Wilayah Terdampak Rob:",
+            key=[(color, label) for _, color, label in COMPARISON_CLASSES]
+        )
+
+        final_img = Image.new(
+            "RGBA", (bg_w, bg_h + legend_panel.height), (0, 0, 0, 0)
+        )
+        final_img.paste(map_with_bg, (0, 0))
+        final_img.paste(legend_panel, (0, bg_h))
+
+    return final_img, legend_pages
@@ -0,0 +1,84 @@
+import math
+
+import numpy as np
+
+# ======================== GRID CLUSTERING (SERVER-SIDE) ========================
+# Titik dikelompokkan ke sel grid yang ukurannya mengikuti level zoom
+# (± CELL_PX piksel layar per sel), hanya untuk titik di dalam viewport.
+# Jumlah cluster ≈ (lebar_px / CELL_PX) × (tinggi_px / CELL_PX) → ukuran
+# payload HTML konstan berapa pun jumlah kejadian di database.
+
+CELL_PX = 64
+TILE_PX = 256
+VIEWPORT_PAD = 0.2  # tambahan 20% di sekeliling viewport (geser ringan)
+
+
+def cell_size_deg(zoom, cell_px=CELL_PX):
+    """Ukuran sel grid (derajat bujur) pada level zoom Leaflet"""
+    return 360.0 / (TILE_PX * 2 ** zoom) * cell_px
+
+
+def pad_bounds(bounds, pad=VIEWPORT_PAD):
+    """(south, west, north, east) diperlebar `pad` di tiap sisi"""
+    s, w, n, e = bounds
+    dlat, dlon = (n - s) * pad, (e - w) * pad
+    return s - dlat, w - dlon, n + dlat, e + dlon
+
+
+def parse_folium_bounds(raw):
+    """Bounds dari st_folium ({_southWest, _northEast}) → (s, w, n, e)"""
+    try:
+        sw, ne = raw["_southWest"], raw["_northEast"]
+        return float(sw["lat"]), float(sw["lng"]), float(ne["lat"]), float(ne["lng"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def zoom_for_bounds(bounds, width_px=1200, height_px=900):
+    """Perkiraan zoom Leaflet agar bounds muat di peta"""
+    s, w, n, e = bounds
+    span_lon = max(e - w, 1e-6)
+    span_lat = max(n - s, 1e-6)
+    z_lon = math.log2(width_px * 360.0 / (TILE_PX * span_lon))
+    z_lat = math.log2(height_px * 180.0 / (TILE_PX * span_lat))
+    return int(max(0, min(18, math.floor(min(z_lon, z_lat)))))
+
+
+def grid_cluster(lat, lon, zoom, bounds=None, cell_px=CELL_PX):
+    """
+    Cluster titik per sel grid (vektor NumPy).
+
+    lat, lon : array float
+    bounds   : (s, w, n, e) viewport; titik di luar diabaikan
+    Return dict array sejajar per cluster:
+        lat, lon (rata-rata anggota), count, index (baris pertama anggota)
+    """
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    idx = np.arange(lat.size)
+
+    if bounds is not None:
+        s, w, n, e = bounds
+        inside = (lat >= s) & (lat <= n) & (lon >= w) & (lon <= e)
+        lat, lon, idx = lat[inside], lon[inside], idx[inside]
+
+    if lat.size == 0:
+        empty = np.empty(0)
+        return {"lat": empty, "lon": empty,
+                "count": np.empty(0, dtype=int), "index": np.empty(0, dtype=int)}
+
+    cell = cell_size_deg(zoom, cell_px)
+    ix = np.floor((lon + 180.0) / cell).astype(np.int64)
+    iy = np.floor((lat + 90.0) / cell).astype(np.int64)
+    keys = ix * 1_000_003 + iy
+
+    uniq, first, inverse, counts = np.unique(
+        keys, return_index=True, return_inverse=True, return_counts=True
+    )
+
+    return {
+        "lat": np.bincount(inverse, weights=lat) / counts,
+        "lon": np.bincount(inverse, weights=lon) / counts,
+        "count": counts,
+        "index": idx[first],
+    }
@@ -1,104 +1,170 @@
 import folium
+import numpy as np
+import pandas as pd
 from streamlit_folium import st_folium
-from modules.utils import safe_float
+from modules.events import to_event_frame, valid_coords_mask
+from modules.map_clustering import (
+    grid_cluster,
+    pad_bounds,
+    parse_folium_bounds,
+    zoom_for_bounds,
+)
 import streamlit as st
 
+# Di atas jumlah titik ini peta otomatis memakai mode cluster + viewport
+CLUSTER_THRESHOLD = 500
 
-def create_map(records, provinsi_filter=None, kabupaten_filter=None):
+
+def drive_image_url(img):
+    """Perbaikan agar link Google Drive bisa tampil langsung"""
+    if img and "drive.google.com" in img:
+        if "uc?id=" not in img:
+            # Ambil file_id dari berbagai format URL
+            if "/d/" in img:
+                file_id = img.split("/d/")[1].split("/")[0]
+                img = f"https://drive.google.com/uc?export=view&id={file_id}"
+            elif "id=" in img:
+                file_id = img.split("id=")[-1]
+                img = f"https://drive.google.com/uc?export=view&id={file_id}"
+    return img
+
+
+def _text(df, col):
+    """Kolom teks (kategori / object) → Series string tanpa NA"""
+    if col not in df:
+        return pd.Series("", index=df.index, dtype="string")
+    return df[col].astype("string").fillna("")
+
+
+def _coords(df):
+    """Koordinat float32 → float64 dibulatkan 6 desimal (untuk Leaflet)"""
+    lat = np.round(df["Latitude"].to_numpy(dtype="float64"), 6)
+    lon = np.round(df["Longitude"].to_numpy(dtype="float64"), 6)
+    return lat, lon
+
+
+def _popup_html(lokasi, kab, prov, tgl, img):
+    img = drive_image_url(img)
+
+    # Buat konten popup
+    popup_html = f"""
+        <b>{lokasi}</b><br>
+        {kab}, {prov}<br>
+        📅 {tgl}<br>
+        """
+    if img:
+        popup_html += f'<img src="{img}" width="220"><br>'
+    else:
+        popup_html += "<i>📷 Gambar tidak tersedia</i><br>"
+    return popup_html
+
+
+def _cluster_icon(count):
+    """DivIcon lingkaran berisi jumlah kejadian dalam satu cluster"""
+    size = 30 if count < 10 else 38 if count < 100 else 46
+    return folium.DivIcon(
+        icon_size=(size, size),
+        icon_anchor=(size // 2, size // 2),
+        html=(
+            f'<div style="width:{size}px;height:{size}px;line-height:{size}px;'
+            'border-radius:50%;background:rgba(0,102,204,0.75);color:white;'
+            'font-weight:bold;text-align:center;border:2px solid white;">'
+            f"{count}</div>"
+        ),
+    )
+
+
+def build_map(records, provinsi_filter=None, kabupaten_filter=None,
+              view=None, cluster_threshold=CLUSTER_THRESHOLD,
+              cluster_layer=None):
     """
-    Membuat peta interaktif banjir rob menggunakan Folium.
-    - Otomatis zoom ke provinsi / kabupaten jika filter diisi.
-    - Menampilkan popup dengan gambar (jika ada).
-    - Menangani error agar tidak crash saat data kosong atau invalid.
+    Bangun objek folium.Map tanpa merender ke Streamlit.
+    records: list[dict] / DataFrame / frame kejadian bertipe (modules.events)
+    view   : {"bounds": (s, w, n, e), "zoom": int} viewport terakhir dari
+             st_folium; hanya dipakai pada mode cluster
+    cluster_threshold: jumlah titik minimal untuk mode cluster (None = mati)
+    cluster_layer: folium.FeatureGroup tujuan marker mode cluster
+             (None = langsung ke peta). Peta dasar selalu memakai tampilan
+             awal yang sama → bisa tetap ter-mount di st_folium.
+    Return: (folium.Map, [(level, pesan)]) — level: "warning" / "info"
     """
+    notices = []
     default_center = [-2.5489, 118.0149]  # Titik tengah Indonesia
     m = folium.Map(location=default_center, zoom_start=5)
-    bounds = []
 
-    # Filter hanya record dengan koordinat valid
-    valid_records = []
-    for r in records:
-        lat = safe_float(r.get("Latitude"), None)
-        lon = safe_float(r.get("Longitude"), None)
-        if lat is not None and lon is not None:
-            valid_records.append(r)
+    df = to_event_frame(records)
 
-    if not valid_records:
-        st.warning("⚠️ Tidak ada titik dengan koordinat valid untuk ditampilkan di peta.")
-        return st_folium(m, height=900, use_container_width=True)
+    # Filter hanya record dengan koordinat valid (vektor, tanpa parse ulang)
+    valid = df[valid_coords_mask(df)] if not df.empty else df
 
-    lat_center, lon_center = None, None
+    if valid.empty:
+        notices.append((
+            "warning",
+            "⚠️ Tidak ada titik dengan koordinat valid untuk ditampilkan di peta."
+        ))
+        return m, notices
+
+    lat, lon = _coords(valid)
+    kab = _text(valid, "Kabupaten")
+    prov = _text(valid, "Provinsi")
+    focus = None  # mask titik fokus filter wilayah
 
     # ==== Filter Kabupaten ====
     if kabupaten_filter and kabupaten_filter.strip():
         kab_filter = kabupaten_filter.lower().strip()
-        kab_records = [
-            r for r in valid_records
-            if kab_filter in r.get("Kabupaten", "").lower().strip()
-        ]
-        if kab_records:
-            lat_center = sum(safe_float(r["Latitude"]) for r in kab_records) / len(kab_records)
-            lon_center = sum(safe_float(r["Longitude"]) for r in kab_records) / len(kab_records)
-            m.location = [lat_center, lon_center]
+        mask = kab.str.lower().str.strip().str.contains(
+            kab_filter, regex=False
+        ).to_numpy(dtype=bool)
+        if mask.any():
+            m.location = [float(lat[mask].mean()), float(lon[mask].mean())]
             m.zoom_start = 10
+            focus = mask
         else:
-            st.info(f"📍 Tidak ditemukan koordinat valid untuk kabupaten: {kabupaten_filter}")
+            notices.append((
+                "info",
+                f"📍 Tidak ditemukan koordinat valid untuk kabupaten: {kabupaten_filter}"
+            ))
 
     # ==== Filter Provinsi ====
     elif provinsi_filter and provinsi_filter.strip():
         prov_filter = provinsi_filter.lower().strip()
-        prov_records = [
-            r for r in valid_records
-            if prov_filter in r.get("Provinsi", "").lower().strip()
-        ]
-        if prov_records:
-            lat_center = sum(safe_float(r["Latitude"]) for r in prov_records) / len(prov_records)
-            lon_center = sum(safe_float(r["Longitude"]) for r in prov_records) / len(prov_records)
-            m.location = [lat_center, lon_center]
+        mask = prov.str.lower().str.strip().str.contains(
+            prov_filter, regex=False
+        ).to_numpy(dtype=bool)
+        if mask.any():
+            m.location = [float(lat[mask].mean()), float(lon[mask].mean())]
             m.zoom_start = 7
+            focus = mask
         else:
-            st.info(f"📍 Tidak ditemukan koordinat valid untuk provinsi: {provinsi_filter}")
+            notices.append((
+                "info",
+                f"📍 Tidak ditemukan koordinat valid untuk provinsi: {provinsi_filter}"
+            ))
+
+    tanggal = valid["Tanggal"].dt.strftime("%Y-%m-%d").fillna("")
+    lokasi = _text(valid, "Lokasi")
+    gambar = _text(valid, "Gambar")
+
+    # ==== Mode cluster + viewport (data besar) ====
+    if cluster_threshold is not None and len(valid) > cluster_threshold:
+        _add_clusters(m, lat, lon, lokasi, kab, prov, tanggal, gambar,
+                      view, focus, cluster_layer)
+        return m, notices
 
     # ==== Tambahkan marker ====
-    for r in valid_records:
-        lat = safe_float(r["Latitude"])
-        lon = safe_float(r["Longitude"])
-        lokasi = r.get("Lokasi", "")
-        kab = r.get("Kabupaten", "")
-        prov = r.get("Provinsi", "")
-        tgl = r.get("Tanggal", "")
-        img = r.get("Gambar", "")
-
-        # --- Perbaikan agar link Google Drive bisa tampil langsung ---
-        if img and "drive.google.com" in img:
-            if "uc?id=" not in img:
-                # Ambil file_id dari berbagai format URL
-                if "/d/" in img:
-                    file_id = img.split("/d/")[1].split("/")[0]
-                    img = f"https://drive.google.com/uc?export=view&id={file_id}"
-                elif "id=" in img:
-                    file_id = img.split("id=")[-1]
-                    img = f"https://drive.google.com/uc?export=view&id={file_id}"
-
-        # Buat konten popup
-        popup_html = f"""
-        <b>{lokasi}</b><br>
-        {kab}, {prov}<br>
-        📅 {tgl}<br>
-        """
-        if img:
-            popup_html += f'<img src="{img}" width="220"><br>'
-        else:
-            popup_html += "<i>📷 Gambar tidak tersedia</i><br>"
+    bounds = []
 
+    for la, lo, lok, k, p, tgl, img in zip(
+        lat, lon, lokasi, kab, prov, tanggal, gambar
+    ):
         # Tambahkan marker ke peta
         try:
             folium.Marker(
-                [lat, lon],
-                popup=folium.Popup(popup_html, max_width=300),
-                tooltip=f"{lokasi} ({kab})"
+                [float(la), float(lo)],
+                popup=folium.Popup(_popup_html(lok, k, p, tgl, img), max_width=300),
+                tooltip=f"{lok} ({k})"
             ).add_to(m)
-            bounds.append([lat, lon])
+            bounds.append([float(la), float(lo)])
         except Exception:
             continue  # jika ada data yang tidak valid, skip
 
@@ -110,4 +176,107 @@ def create_map(records, provinsi_filter=None, kabupaten_filter=None):
         elif len(bounds) > 1:
             m.fit_bounds(bounds)
 
-    return st_folium(m, height=900, use_container_width=True)
\ No newline at end of file
+    return m, notices
+
+
+def _add_clusters(m, lat, lon, lokasi, kab, prov, tanggal, gambar,
+                  view, focus, layer=None):
+    """
+    Cluster grid server-side untuk viewport aktif:
+    - cluster > 1 titik → DivIcon berisi jumlah (tanpa popup)
+    - titik tunggal     → Marker biasa dengan popup
+    Hanya titik di dalam viewport (+ padding) yang dikirim ke browser.
+    Peta dasar tetap di tampilan awal; viewport hanya menentukan cluster.
+    """
+    # Tampilan awal: cakup titik fokus filter (atau semua titik)
+    sel = focus if focus is not None else slice(None)
+    initial = (float(lat[sel].min()), float(lon[sel].min()),
+               float(lat[sel].max()), float(lon[sel].max()))
+    initial_zoom = zoom_for_bounds(initial)
+
+    s, w, n, e = initial
+    m.location = [(s + n) / 2, (w + e) / 2]
+    m.zoom_start = initial_zoom
+    m.options["zoom"] = initial_zoom
+
+    if view:
+        bounds, zoom = view["bounds"], int(view["zoom"])
+    else:
+        bounds, zoom = initial, initial_zoom
+
+    target = layer if layer is not None else m
+    clusters = grid_cluster(lat, lon, zoom, bounds=pad_bounds(bounds))
+
+    for c_lat, c_lon, count, i in zip(
+        clusters["lat"], clusters["lon"], clusters["count"], clusters["index"]
+    ):
+        if count == 1:
+            folium.Marker(
+                [float(lat[i]), float(lon[i])],
+                popup=folium.Popup(
+                    _popup_html(lokasi.iat[i], kab.iat[i], prov.iat[i],
+                                tanggal.iat[i], gambar.iat[i]),
+                    max_width=300,
+                ),
+                tooltip=f"{lokasi.iat[i]} ({kab.iat[i]})",
+            ).add_to(target)
+        else:
+            folium.Marker(
+                [round(float(c_lat), 6), round(float(c_lon), 6)],
+                icon=_cluster_icon(int(count)),
+                tooltip=f"{int(count)} kejadian — perbesar peta untuk detail",
+            ).add_to(target)
+
+
+def _last_view(key):
+    """Viewport terakhir yang dikirim st_folium (disimpan di session_state)"""
+    state = st.session_state.get(key) or {}
+    bounds = parse_folium_bounds(state.get("bounds"))
+    zoom = state.get("zoom")
+    if bounds is None or zoom is None:
+        return None
+    return {"bounds": bounds, "zoom": int(zoom)}
+
+
+def create_map(records, provinsi_filter=None, kabupaten_filter=None,
+               key="peta_rob"):
+    """
+    Membuat peta interaktif banjir rob menggunakan Folium.
+    - Otomatis zoom ke provinsi / kabupaten jika filter diisi.
+    - Menampilkan popup dengan gambar (jika ada).
+    - Data besar → cluster per zoom, hanya titik di viewport yang dikirim;
+      geser / zoom peta memicu rerun dengan bounds baru dari st_folium.
+      Peta dasar tetap ter-mount: cluster dikirim lewat
+      feature_group_to_add, viewport lewat center / zoom (tanpa
+      membuat ulang peta Leaflet → tidak ada loop geser → rerun).
+    - Menangani error agar tidak crash saat data kosong atau invalid.
+    """
+    # Key per filter: ganti filter → tampilan awal dihitung ulang
+    key = f"{key}_{provinsi_filter or ''}_{kabupaten_filter or ''}"
+    view = _last_view(key)
+
+    layer = folium.FeatureGroup(name="Kejadian")
+    m, notices = build_map(
+        records, provinsi_filter, kabupaten_filter, view=view,
+        cluster_layer=layer
+    )
+
+    for level, msg in notices:
+        getattr(st, level)(msg)
+
+    center = zoom = None
+    if view:
+        s, w, n, e = view["bounds"]
+        center = [(s + n) / 2, (w + e) / 2]
+        zoom = view["zoom"]
+
+    return st_folium(
+        m,
+        height=900,
+        use_container_width=True,
+        key=key,
+        center=center,
+        zoom=zoom,
+        feature_group_to_add=layer,  # kosong di mode marker biasa
+        returned_objects=["bounds", "zoom"],
+    )
@@ -0,0 +1,201 @@
+# modules/pdf_template.py
+import io
+from functools import lru_cache
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import (
+    BaseDocTemplate,
+    Frame,
+    HRFlowable,
+    Image,
+    PageTemplate,
+    Paragraph,
+    Spacer
+)
+
+# =====================================================
+# TEMPLATE PDF LAPORAN
+# =====================================================
+# Yang di-cache per proses HANYA data immutable:
+# - stylesheet (getSampleStyleSheet + "Justify")
+# - geometri frame per jenis laporan
+# Hasil bench_pdf: selisih dingin vs ter-cache dalam batas noise
+# (±2% pada PDF satu kejadian ~6,7 ms & rekap 500 kejadian ~1,5 s) —
+# cache dipertahankan karena data immutable aman dibagi, bukan karena
+# mempercepat.
+# Flowable (heading, HR, spacer), Frame & PageTemplate menyimpan state
+# layout saat build (wrap/split, posisi kursor frame) → tidak aman
+# dipakai ulang antar dokumen / thread, jadi dibuat baru per dokumen
+# lewat factory di bawah. Objek-objek ini murah (tanpa parsing ulang
+# style); waktu per PDF didominasi wrap isi & serialisasi yang memang
+# per dokumen. Tidak ada header/footer halaman (laporan lama juga
+# tidak punya). Ukur dengan benchmarks/bench_pdf.py.
+
+FOOTER_TEXT = (
+    "Dokumen ini dihasilkan secara otomatis oleh "
+    "Sistem Peta Interaktif Banjir Rob BMKG."
+)
+
+# (margin kiri, kanan, atas, bawah) per jenis laporan
+MARGINS = {
+    "event": (40, 40, 40, 40),
+    "rekap": (inch, inch, inch, inch),
+}
+
+
+def safe(val, default="-"):
+    return val if val not in [None, ""] else default
+
+
+@lru_cache(maxsize=1)
+def get_styles():
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        name="Justify",
+        alignment=4,
+        leading=14
+    ))
+    return styles
+
+
+@lru_cache(maxsize=None)
+def page_geometry(kind):
+    """(x, y, lebar, tinggi) frame isi untuk jenis laporan `kind`"""
+    left, right, top, bottom = MARGINS[kind]
+    page_w, page_h = A4
+    return left, bottom, page_w - left - right, page_h - top - bottom
+
+
+def page_template(kind):
+    """PageTemplate + Frame baru dari geometri ter-cache"""
+    frame = Frame(*page_geometry(kind), id="normal")
+    return PageTemplate(id=kind, frames=[frame], pagesize=A4)
+
+
+def clear_cache():
+    get_styles.cache_clear()
+    page_geometry.cache_clear()
+
+
+def _heading(text, style="Heading2"):
+    return Paragraph(f"<b>{text}</b>", get_styles()[style])
+
+
+def _spacer(h):
+    return Spacer(1, h)
+
+
+# =====================================================
+# ISI PER KEJADIAN
+# =====================================================
+def event_story(record, img_data, tanggal_cetak):
+    """Story laporan satu kejadian; record sudah to_display_record"""
+    styles = get_styles()
+
+    identitas = f"""
+    <b>Lokasi</b>      : {safe(record.get('Lokasi'))}<br/>
+    <b>Kecamatan</b>   : {safe(record.get('Kecamatan'))}<br/>
+    <b>Kabupaten</b>   : {safe(record.get('Kabupaten'))}<br/>
+    <b>Provinsi</b>    : {safe(record.get('Provinsi'))}<br/><br/>
+
+    <b>Tanggal</b>     : {safe(record.get('Tanggal'))}<br/>
+    <b>Waktu</b>       : {safe(record.get('Waktu'))} WIB<br/>
+    <b>Koordinat</b>   : {safe(record.get('Latitude'))}, {safe(record.get('Longitude'))}
+    """
+
+    info = f"""
+    <b>Ketinggian Genangan</b> : {safe(record.get('Ketinggian'))} cm<br/><br/>
+    <b>Dampak Kejadian</b> :<br/>
+    {safe(record.get('Dampak'))}
+    """
+
+    if img_data:
+        foto = Image(img_data, width=4.5 * inch, height=3 * inch)
+    else:
+        foto = Paragraph("Tidak tersedia dokumentasi foto.", styles["Normal"])
+
+    return [
+        _heading("LAPORAN KEJADIAN BANJIR ROB", "Title"), _spacer(12),
+        Paragraph(f"Tanggal Cetak: {tanggal_cetak}", styles["Normal"]),
+        _spacer(16),
+
+        _heading("IDENTITAS KEJADIAN"), _spacer(6),
+        Paragraph(identitas, styles["Justify"]), _spacer(14),
+
+        _heading("INFORMASI KEJADIAN"), _spacer(6),
+        Paragraph(info, styles["Justify"]), _spacer(14),
+
+        _heading("DOKUMENTASI"), _spacer(8),
+        foto, _spacer(14),
+
+        _heading("SUMBER INFORMASI"), _spacer(6),
+        Paragraph(safe(record.get("Sumber")), styles["Justify"]),
+
+        _spacer(20), HRFlowable(width="100%"),
+        _spacer(6), Paragraph(FOOTER_TEXT, styles["Normal"]),
+    ]
+
+
+def rekap_story(records, tanggal):
+    """Story rekap multi kejadian; records sudah to_display_record"""
+    styles = get_styles()
+
+    story = [
+        Paragraph(
+            f"<b>LAPORAN KEJADIAN BANJIR ROB</b><br/>Tanggal: {tanggal}",
+            styles["Title"]
+        ),
+        _spacer(20),
+    ]
+
+    if not records:
+        story.append(Paragraph(
+            "Tidak terdapat kejadian banjir rob pada tanggal tersebut.",
+            styles["Normal"]
+        ))
+        return story
+
+    for i, rec in enumerate(records, start=1):
+        isi = f"""
+        Lokasi      : {safe(rec.get('Lokasi'))}<br/>
+        Kecamatan   : {safe(rec.get('Kecamatan'))}<br/>
+        Kabupaten   : {safe(rec.get('Kabupaten'))}<br/>
+        Provinsi    : {safe(rec.get('Provinsi'))}<br/>
+        Tanggal     : {safe(rec.get('Tanggal'))}<br/>
+        Waktu       : {safe(rec.get('Waktu'))} WIB<br/>
+        Koordinat   : {safe(rec.get('Latitude'))}, {safe(rec.get('Longitude'))}<br/>
+        Ketinggian  : {safe(rec.get('Ketinggian'))} cm<br/><br/>
+        Dampak      : {safe(rec.get('Dampak'))}<br/><br/>
+        Sumber      : {safe(rec.get('Sumber'))}
+        """
+        story += [
+            Paragraph(f"<b>Kejadian {i}</b>", styles["Heading3"]),
+            _spacer(6),
+            Paragraph(isi, styles["Normal"]),
+            _spacer(12), HRFlowable(width="100%"), _spacer(12),
+        ]
+
+    return story
+
+
+# =====================================================
+# BUILD
+# =====================================================
+def build_pdf(story, kind="event"):
+    """Build story dengan page template `kind` → BytesIO (seek 0)"""
+    left, right, top, bottom = MARGINS[kind]
+    buffer = io.BytesIO()
+    doc = BaseDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=left,
+        rightMargin=right,
+        topMargin=top,
+        bottomMargin=bottom
+    )
+    doc.addPageTemplates([page_template(kind)])
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,112 @@
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from modules.events import HEIGHT_COLUMN, to_event_frame
+
+# ======================== STATISTIK KEJADIAN ROB ========================
+# Semua agregasi vektor (groupby / value_counts / cut) di atas kolom
+# bertipe: tanggal datetime64 & ketinggian float (diekstrak dari teks).
+
+HEIGHT_BINS = [0, 10, 20, 30, 50, 75, 100, 150, np.inf]
+HEIGHT_LABELS = [
+    "0-10", "10-20", "20-30", "30-50", "50-75", "75-100", "100-150", ">150"
+]
+
+
+def prepare_events(df):
+    """Kolom bertipe untuk statistik (frame bertipe dari modules.events)"""
+    ev = to_event_frame(df)
+    return pd.DataFrame({
+        "tanggal": ev["Tanggal"].dt.normalize(),
+        "tinggi": ev[HEIGHT_COLUMN].astype("float64"),
+        "kabupaten": ev["Kabupaten"],
+        "kecamatan": ev["Kecamatan"],
+    })
+
+
+def compute_statistics(df):
+    """
+    Hitung ringkasan statistik dari DataFrame kejadian.
+    Return dict berisi Series/DataFrame siap dipakai st.*_chart.
+    """
+    ev = prepare_events(df)
+    tgl = ev["tanggal"].dropna()
+
+    per_hari = tgl.value_counts().sort_index()
+    per_hari.index.name = "Tanggal"
+    per_hari.name = "Kejadian"
+
+    if per_hari.empty:
+        tren = pd.DataFrame(columns=["Kejadian", "Rata-rata 7 hari"])
+    else:
+        full = per_hari.reindex(
+            pd.date_range(per_hari.index.min(), per_hari.index.max(), freq="D"),
+            fill_value=0
+        )
+        tren = pd.DataFrame({
+            "Kejadian": full,
+            "Rata-rata 7 hari": full.rolling(7, min_periods=1).mean(),
+        })
+
+    per_bulan = tgl.dt.to_period("M").value_counts().sort_index()
+    per_bulan.index = per_bulan.index.astype(str)
+    per_bulan.index.name = "Bulan"
+    per_bulan.name = "Kejadian"
+
+    top_kab = (
+        ev["kabupaten"].value_counts(sort=True)
+        .loc[lambda s: s > 0]
+        .head(10)
+    )
+    top_kab.index = top_kab.index.astype(str)
+    top_kab.name = "Kejadian"
+
+    tinggi = ev["tinggi"].dropna()
+    distribusi = (
+        pd.cut(tinggi, HEIGHT_BINS, labels=HEIGHT_LABELS, right=False)
+        .value_counts(sort=False)
+    )
+    distribusi.index = distribusi.index.astype(str)
+    distribusi.name = "Kejadian"
+
+    return {
+        "total": int(len(df)),
+        "hari_terdampak": int(per_hari.size),
+        "kecamatan_terdampak": int(ev["kecamatan"].dropna().nunique()),
+        "tinggi_max": float(tinggi.max()) if not tinggi.empty else None,
+        "tinggi_median": float(tinggi.median()) if not tinggi.empty else None,
+        "per_hari": per_hari,
+        "per_bulan": per_bulan,
+        "tren": tren,
+        "top_kabupaten": top_kab,
+        "distribusi_tinggi": distribusi,
+    }
+
+
+# ======================== CACHE PER FILTER ========================
+def filter_fingerprint(filters, df, version=0):
+    """
+    Sidik jari murah: nilai filter + versi data (jumlah baris, max/sum
+    kolom No, penghitung tulis crud.data_version) → O(1) per kolom
+    numerik, tanpa hash isi seluruh baris di setiap rerun.
+    """
+    no = df["No"] if "No" in df.columns and len(df) else None
+
+    payload = {
+        "filters": {k: str(v) for k, v in sorted(filters.items())},
+        "rows": int(len(df)),
+        "no_max": int(no.max()) if no is not None else None,
+        "no_sum": int(no.sum()) if no is not None else None,
+        "version": version,
+    }
+    return hashlib.sha1(json.dumps(payload).encode()).hexdigest()
+
+
+@st.cache_data(ttl=600, max_entries=32, show_spinner=False)
+def cached_statistics(fingerprint, _df):
+    """compute_statistics ter-cache per fingerprint (df tidak di-hash)"""
+    return compute_statistics(_df)
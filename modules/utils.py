@@ -1,6 +1,9 @@
 import os
+import re
 from datetime import datetime, date
 from decimal import Decimal
+import numpy as np
+import pandas as pd
 import streamlit as st
 
 # ======================== KONFIGURASI UPLOAD ========================
@@ -57,7 +60,31 @@ def safe_float(value, default=0.0):
         return default
 
 
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+
+
+def parse_ketinggian(value):
+    """
+    Ambil ketinggian genangan (cm) dari teks bebas.
+    Contoh: "30-50 cm" -> 50.0, "± 20" -> 20.0, "" -> None.
+    Jika ada beberapa angka, diambil yang terbesar.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float, Decimal)):
+        return float(value)
+
+    nums = _NUMBER_RE.findall(str(value))
+    if not nums:
+        return None
+    return max(float(n.replace(",", ".")) for n in nums)
+
+
 # ======================== PARSE & FORMAT TANGGAL ========================
+# Urutan = prioritas (nilai ambigu seperti 01/02/2024 → format pertama yang cocok)
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%m/%d/%Y")
+
+
 def parse_date_safe(val):
     """
     Ubah berbagai format tanggal (string / date) menjadi objek date (Python).
@@ -69,7 +96,7 @@ def parse_date_safe(val):
         return None
 
     s = str(val).strip()
-    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%m/%d/%Y"):
+    for fmt in DATE_FORMATS:
         try:
             return datetime.strptime(s, fmt).date()
         except Exception:
@@ -85,4 +112,146 @@ def to_db_date_str(d):
         return d.strftime("%Y-%m-%d")
 
     parsed = parse_date_safe(d)
-    return parsed.strftime("%Y-%m-%d") if parsed else None
\ No newline at end of file
+    return parsed.strftime("%Y-%m-%d") if parsed else None
+
+
+# ======================== VERSI BATCH (VEKTOR) ========================
+# Padanan parse_date_safe / safe_float untuk seluruh kolom sekaligus
+# (pandas Series / NumPy array / list). Hasil identik dengan versi skalar,
+# tetapi tanpa loop Python per nilai.
+
+def _as_series(values):
+    return values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+
+
+def parse_date_series(values):
+    """
+    Versi batch parse_date_safe → Series datetime64 (NaT jika gagal).
+
+    Deteksi format per kolom: format di DATE_FORMATS dicoba berurutan
+    hanya pada sisa nilai yang belum ter-parse, dengan to_datetime
+    format eksplisit. Kolom seragam selesai dalam satu lintasan.
+    """
+    s = _as_series(values)
+
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+
+    result = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
+    kind = pd.api.types.infer_dtype(s, skipna=True)
+
+    # Objek date / datetime dipakai apa adanya (sama seperti versi skalar)
+    if kind in ("date", "datetime", "datetime64"):
+        return pd.to_datetime(s, errors="coerce")
+    if kind == "empty":
+        return result
+
+    if kind == "string":
+        text = s.dropna()
+    else:
+        # Kolom campuran → pisahkan objek date dari teks
+        is_date = s.map(lambda v: isinstance(v, date)).to_numpy(dtype=bool)
+        if is_date.any():
+            result[is_date] = pd.to_datetime(s[is_date], errors="coerce")
+        text = s[~is_date].dropna().astype(str)
+
+    text = text.str.strip()
+
+    for fmt in DATE_FORMATS:
+        if text.empty:
+            break
+        parsed = pd.to_datetime(text, format=fmt, errors="coerce")
+        ok = parsed.notna()
+        if ok.any():
+            result.loc[ok.index[ok]] = parsed[ok]
+        text = text[~ok]
+
+    return result
+
+
+_type_of = np.frompyfunc(type, 1, 1)
+
+
+def _text_to_float(default):
+    """
+    Konverter teks ringkas (tanpa cek tipe) untuk safe_float_series.
+    float() sendiri mengabaikan spasi di tepi seperti .strip() pada versi
+    skalar, dan hanya melempar ValueError untuk teks → hasil sama persis.
+    """
+    def convert(text):
+        try:
+            return float(text.replace(",", "."))
+        except ValueError:
+            return default
+    return convert
+
+
+# Tipe yang float(value) == safe_float(value) bila konversinya berhasil
+# (teks tanpa koma: strip/replace skalar tidak mengubah apa pun)
+_DIRECT_TYPES = {float, int, bool, Decimal, str, type(None)}
+
+
+def safe_float_series(values, default=np.nan):
+    """
+    Versi batch safe_float → Series float64, hasil identik per nilai.
+
+    - Kolom seragam (mis. Decimal dari MySQL, teks angka bersih): satu
+      lintasan C arr.astype(float64), None → default
+    - Campuran / ada yang gagal: float & int vektor, teks lewat
+      konverter ringkas (_text_to_float), sisanya safe_float skalar
+    """
+    s = _as_series(values)
+
+    if pd.api.types.is_numeric_dtype(s):
+        # bool → 1.0 / 0.0 seperti float(True) pada versi skalar
+        out = s.astype("float64")
+        if pd.api.types.is_extension_array_dtype(s):
+            out[s.isna().to_numpy()] = default
+        return out
+
+    arr = s.to_numpy(dtype=object)
+    if not len(arr):
+        return pd.Series(np.full(0, np.nan), index=s.index)
+
+    types = _type_of(arr)
+
+    if set(types.tolist()) <= _DIRECT_TYPES:
+        try:
+            out = arr.astype("float64")
+        except (TypeError, ValueError):
+            out = None
+        if out is not None:
+            nan = np.flatnonzero(np.isnan(out))
+            if len(nan):
+                out[nan[[v is None for v in arr[nan]]]] = default
+            return pd.Series(out, index=s.index)
+
+    out = np.full(len(arr), np.nan)
+    num = (types == float) | (types == int)
+    text = types == str
+
+    if num.any():
+        out[num] = arr[num].astype("float64")
+    if text.any():
+        out[text] = list(map(_text_to_float(default), arr[text]))
+
+    rest = np.flatnonzero(~(num | text))
+    if len(rest):
+        out[rest] = [safe_float(v, default) for v in arr[rest]]
+
+    return pd.Series(out, index=s.index)
+
+    types = _type_of(arr)
+    num = (types == float) | (types == int)
+    text = types == str
+
+    if num.any():
+        out[num] = arr[num].astype("float64")
+    if text.any():
+        out[text] = list(map(_text_to_float(default), arr[text]))
+
+    rest = np.flatnonzero(~(num | text))
+    if len(rest):
+        out[rest] = [safe_float(v, default) for v in arr[rest]]
+
+    return pd.Series(out, index=s.index)
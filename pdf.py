@@ -1,47 +1,43 @@
+import hashlib
 import io
 import os
+import re
+import tempfile
+import threading
+import time
+import zipfile
 import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
-
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import (
-    SimpleDocTemplate,
-    Paragraph,
-    Spacer,
-    Image,
-    HRFlowable
-)
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+from pathlib import Path
 
 from PIL import Image as PILImage, UnidentifiedImageError
 
+from modules.events import to_display_record
+from modules.pdf_template import build_pdf, event_story, rekap_story, safe
 
-# =====================================================
-# HELPER
-# =====================================================
-def safe(val, default="-"):
-    return val if val not in [None, ""] else default
 
+# Bundle sekecil ini dirender berurutan (overhead pool tidak sepadan);
+# thread dibatasi karena render ReportLab tetap memegang GIL
+BUNDLE_SEQUENTIAL_MAX = 4
+BUNDLE_MAX_WORKERS = 8
+
+# File ZIP kecil tetap di memori, besar otomatis pindah ke disk
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
 
-def load_image_from_url(url):
-    """
-    Ambil gambar dari URL dan kembalikan BytesIO
-    """
-    if not url:
-        return None
 
+# =====================================================
+# HELPER
+# =====================================================
+def _download_image(url):
     try:
         headers = {"User-Agent": "Mozilla/5.0"}
         response = requests.get(url, headers=headers, timeout=10)
         response.raise_for_status()
 
-        img_data = io.BytesIO(response.content)
-        img = PILImage.open(img_data)
+        img = PILImage.open(io.BytesIO(response.content))
         img.verify()
-
-        img_data.seek(0)
-        return img_data
+        return response.content
 
     except (requests.RequestException, UnidentifiedImageError):
         return None
@@ -49,158 +45,145 @@ def load_image_from_url(url):
         return None
 
 
-# =====================================================
-# PDF – SATU KEJADIAN
-# =====================================================
-def generate_event_pdf(record: dict):
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=40,
-        leftMargin=40,
-        topMargin=40,
-        bottomMargin=40
-    )
-
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(
-        name="Justify",
-        alignment=4,
-        leading=14
-    ))
-
-    story = []
-
-    # ================= HEADER =================
-    story.append(Paragraph(
-        "<b>LAPORAN KEJADIAN BANJIR ROB</b>",
-        styles["Title"]
-    ))
-    story.append(Spacer(1, 12))
-
-    story.append(Paragraph(
-        f"Tanggal Cetak: {datetime.now().strftime('%d %B %Y')}",
-        styles["Normal"]
-    ))
-    story.append(Spacer(1, 16))
-
-    # ================= IDENTITAS =================
-    identitas = f"""
-    <b>Lokasi</b>      : {safe(record.get('Lokasi'))}<br/>
-    <b>Kecamatan</b>   : {safe(record.get('Kecamatan'))}<br/>
-    <b>Kabupaten</b>   : {safe(record.get('Kabupaten'))}<br/>
-    <b>Provinsi</b>    : {safe(record.get('Provinsi'))}<br/><br/>
-
-    <b>Tanggal</b>     : {safe(record.get('Tanggal'))}<br/>
-    <b>Waktu</b>       : {safe(record.get('Waktu'))} WIB<br/>
-    <b>Koordinat</b>   : {safe(record.get('Latitude'))}, {safe(record.get('Longitude'))}
+def load_image_from_url(url, cache_dir=None):
     """
-
-    story.append(Paragraph("<b>IDENTITAS KEJADIAN</b>", styles["Heading2"]))
-    story.append(Spacer(1, 6))
-    story.append(Paragraph(identitas, styles["Justify"]))
-    story.append(Spacer(1, 14))
-
-    # ================= INFORMASI KEJADIAN =================
-    info = f"""
-    <b>Ketinggian Genangan</b> : {safe(record.get('Ketinggian'))} cm<br/><br/>
-    <b>Dampak Kejadian</b> :<br/>
-    {safe(record.get('Dampak'))}
+    Ambil gambar dari URL dan kembalikan BytesIO.
+    cache_dir: folder cache di disk (opsional, dipakai bersama worker
+    bundle PDF → tiap URL diunduh sekali). File kosong = URL gagal.
     """
+    if not url:
+        return None
 
-    story.append(Paragraph("<b>INFORMASI KEJADIAN</b>", styles["Heading2"]))
-    story.append(Spacer(1, 6))
-    story.append(Paragraph(info, styles["Justify"]))
-    story.append(Spacer(1, 14))
-
-    # ================= DOKUMENTASI =================
-    story.append(Paragraph("<b>DOKUMENTASI</b>", styles["Heading2"]))
-    story.append(Spacer(1, 8))
-
-    img_url = record.get("Gambar")
-    img_data = load_image_from_url(img_url)
+    if cache_dir is None:
+        data = _download_image(url)
+        return io.BytesIO(data) if data else None
 
-    if img_data:
-        story.append(Image(img_data, width=4.5 * inch, height=3 * inch))
+    cached = Path(cache_dir) / hashlib.sha1(url.encode("utf-8")).hexdigest()
+    if cached.exists():
+        data = cached.read_bytes()
     else:
-        story.append(Paragraph(
-            "Tidak tersedia dokumentasi foto.",
-            styles["Normal"]
-        ))
-
-    story.append(Spacer(1, 14))
+        data = _download_image(url) or b""
+        # Tulis atomik → worker lain tidak membaca file setengah jadi
+        tmp = cached.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, cached)
+        except OSError:
+            pass
 
-    # ================= SUMBER =================
-    story.append(Paragraph("<b>SUMBER INFORMASI</b>", styles["Heading2"]))
-    story.append(Spacer(1, 6))
-    story.append(Paragraph(
-        safe(record.get("Sumber")),
-        styles["Justify"]
-    ))
+    return io.BytesIO(data) if data else None
 
-    story.append(Spacer(1, 20))
-    story.append(HRFlowable(width="100%"))
 
-    story.append(Spacer(1, 6))
-    story.append(Paragraph(
-        "Dokumen ini dihasilkan secara otomatis oleh Sistem Peta Interaktif Banjir Rob BMKG.",
-        styles["Normal"]
-    ))
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+# =====================================================
+# PDF – SATU KEJADIAN
+# =====================================================
+def generate_event_pdf(record: dict, image_cache_dir=None):
+    # Terima baris frame bertipe (Timestamp, float32, kategori) maupun dict mentah
+    record = to_display_record(record)
+
+    story = event_story(
+        record,
+        load_image_from_url(record.get("Gambar"), image_cache_dir),
+        datetime.now().strftime('%d %B %Y')
+    )
+    return build_pdf(story, "event")
 
 
 # =====================================================
 # PDF – REKAP MULTI KEJADIAN (PER TANGGAL)
 # =====================================================
 def generate_multiple_events_pdf(records: list, tanggal):
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
-
-    story = []
-
-    story.append(Paragraph(
-        f"<b>LAPORAN KEJADIAN BANJIR ROB</b><br/>Tanggal: {tanggal}",
-        styles["Title"]
-    ))
-    story.append(Spacer(1, 20))
-
-    if not records:
-        story.append(Paragraph(
-            "Tidak terdapat kejadian banjir rob pada tanggal tersebut.",
-            styles["Normal"]
-        ))
-    else:
-        for i, rec in enumerate(records, start=1):
-            story.append(Paragraph(
-                f"<b>Kejadian {i}</b>",
-                styles["Heading3"]
+    story = rekap_story(
+        [to_display_record(rec) for rec in records],
+        tanggal
+    )
+    return build_pdf(story, "rekap")
+
+
+# =====================================================
+# BUNDLE ZIP – SATU PDF PER KEJADIAN (PARALEL)
+# =====================================================
+def _bundle_name(i, record):
+    lokasi = re.sub(r"[^\w.-]+", "_", str(safe(record.get("Lokasi"), ""))).strip("_")
+    return f"{i:04d}_laporan_{safe(record.get('No'), i)}_{lokasi or 'kejadian'}.pdf"
+
+
+def _bundle_worker(item, cache_dir):
+    """Render satu PDF; error dikembalikan (bukan dilempar) agar dilaporkan"""
+    i, record = item
+    name = _bundle_name(i, record)
+    try:
+        return i, name, generate_event_pdf(record, cache_dir).getvalue(), None
+    except Exception as e:
+        return i, name, None, str(e)
+
+
+def generate_events_zip(records: list, max_workers=None, image_cache_dir=None):
+    """
+    ZIP berisi satu PDF per kejadian, dirender paralel di ThreadPool
+    (tanpa fork dari proses server Streamlit yang multi-thread).
+
+    - Bundle kecil (≤ BUNDLE_SEQUENTIAL_MAX) dirender berurutan
+    - Hasil ditulis ke ZIP begitu selesai (maks. 2× jumlah worker PDF di
+      memori), ZIP di SpooledTemporaryFile (pindah ke disk jika besar)
+    - Gambar di-cache di disk bersama semua worker (image_cache_dir,
+      default folder sementara selama bundle dibuat)
+
+    Return: (file, laporan) — file sudah di-seek ke awal
+    laporan: {total, ok, failed: [{index, file_name, error}],
+              elapsed, pdf_per_second}
+    """
+    records = list(records)
+    workers = max_workers or min(BUNDLE_MAX_WORKERS, os.cpu_count() or 1)
+    items = enumerate(records, start=1)
+
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    failed = []
+    ok = 0
+    t0 = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as tmp_cache, \
+            zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        # Folder cache diteruskan eksplisit ke tiap worker (bukan state
+        # global) → bundle dari sesi lain tidak saling menimpa
+        cache_dir = Path(image_cache_dir or tmp_cache)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        def collect(result):
+            nonlocal ok
+            i, name, data, error = result
+            if data is None:
+                failed.append({"index": i, "file_name": name, "error": error})
+            else:
+                zf.writestr(name, data)
+                ok += 1
+
+        if workers <= 1 or len(records) <= BUNDLE_SEQUENTIAL_MAX:
+            for item in items:
+                collect(_bundle_worker(item, cache_dir))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                pending = set()
+                for item in items:
+                    pending.add(ex.submit(_bundle_worker, item, cache_dir))
+                    if len(pending) >= 2 * workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for fut in done:
+                            collect(fut.result())
+                for fut in pending:
+                    collect(fut.result())
+
+        if failed:
+            zf.writestr("GAGAL.txt", "\n".join(
+                f"{f['file_name']}: {f['error']}" for f in failed
             ))
-            story.append(Spacer(1, 6))
-
-            isi = f"""
-            Lokasi      : {safe(rec.get('Lokasi'))}<br/>
-            Kecamatan   : {safe(rec.get('Kecamatan'))}<br/>
-            Kabupaten   : {safe(rec.get('Kabupaten'))}<br/>
-            Provinsi    : {safe(rec.get('Provinsi'))}<br/>
-            Tanggal     : {safe(rec.get('Tanggal'))}<br/>
-            Waktu       : {safe(rec.get('Waktu'))} WIB<br/>
-            Koordinat   : {safe(rec.get('Latitude'))}, {safe(rec.get('Longitude'))}<br/>
-            Ketinggian  : {safe(rec.get('Ketinggian'))} cm<br/><br/>
-            Dampak      : {safe(rec.get('Dampak'))}<br/><br/>
-            Sumber      : {safe(rec.get('Sumber'))}
-            """
-
-            story.append(Paragraph(isi, styles["Normal"]))
-            story.append(Spacer(1, 12))
-            story.append(HRFlowable(width="100%"))
-            story.append(Spacer(1, 12))
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
 
+    elapsed = time.perf_counter() - t0
+    out.seek(0)
+    return out, {
+        "total": len(records),
+        "ok": ok,
+        "failed": failed,
+        "elapsed": elapsed,
+        "pdf_per_second": ok / elapsed if elapsed > 0 else 0.0,
+    }
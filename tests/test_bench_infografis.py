@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from bench_infografis import MIN_STAGE_SECONDS, compare  # noqa: E402
+
+
+def _result(size=10, total=1.0, rss=300.0):
+    return {
+        "engine": "harian",
+        "backend": "default",
+        "size": size,
+        "stages": {
+            "total": {"median": total},
+            "noise": {"median": MIN_STAGE_SECONDS / 2},
+        },
+        "peak_rss_mb": rss,
+    }
+
+
+BASELINE = {"results": [_result()]}
+
+
+def test_compare_passes_within_tolerance():
+    assert compare([_result(total=1.2, rss=360.0)], BASELINE, 0.25) == []
+
+
+def test_compare_fails_past_threshold():
+    regressions = compare([_result(total=1.3, rss=400.0)], BASELINE, 0.25)
+
+    assert len(regressions) == 2
+    assert "total" in regressions[0]
+    assert "peak_rss" in regressions[1]
+
+
+def test_compare_ignores_noise_stages():
+    res = _result()
+    res["stages"]["noise"]["median"] = MIN_STAGE_SECONDS * 10
+
+    assert compare([res], BASELINE, 0.25) == []
+
+
+def test_compare_fails_on_case_missing_from_baseline():
+    regressions = compare([_result(size=100)], BASELINE, 0.25)
+
+    assert regressions == ["harian:default:100: tidak ada di baseline"]
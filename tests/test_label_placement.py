@@ -0,0 +1,50 @@
+import random
+
+from modules.infografis.labels import label_offset, place_labels
+
+# Kanvas uji (piksel) & skala point → piksel
+W, H = 1600, 900
+PX_PER_PT = 150 / 72.0
+
+
+def _case(n, seed=3):
+    rng = random.Random(seed)
+    anchors = [(rng.uniform(100, W - 100), rng.uniform(100, H - 100))
+               for _ in range(n)]
+    sizes = [(rng.uniform(60, 180), rng.uniform(20, 40)) for _ in range(n)]
+    return anchors, sizes
+
+
+def _place(anchors, sizes, y_down):
+    return place_labels(
+        anchors,
+        sizes,
+        base_offset=label_offset(PX_PER_PT, y_down=y_down),
+        anchor_size=14 * PX_PER_PT,
+        bounds=(0, 0, W, H),
+    )
+
+
+def test_label_offset_points_up_in_both_backends():
+    assert label_offset(PX_PER_PT, y_down=False)[1] > 0  # matplotlib: y ke atas
+    assert label_offset(PX_PER_PT, y_down=True)[1] < 0   # raster: y ke bawah
+
+
+def test_single_label_sits_above_anchor_in_both_backends():
+    x, y = 800.0, 450.0
+    (_, ly_mpl), = _place([(x, H - y)], [(100, 30)], y_down=False)
+    (_, ly_ras), = _place([(x, y)], [(100, 30)], y_down=True)
+
+    assert ly_mpl > H - y  # di atas titik (display)
+    assert ly_ras < y      # di atas titik (gambar)
+
+
+def test_label_positions_match_across_backends():
+    # Anchor yang sama dalam koordinat gambar (raster) dan display (matplotlib)
+    anchors, sizes = _case(60)
+    raster = _place(anchors, sizes, y_down=True)
+    display = _place([(x, H - y) for x, y in anchors], sizes, y_down=False)
+
+    for (rx, ry), (dx, dy) in zip(raster, display):
+        assert abs(rx - dx) < 1e-6
+        assert abs(ry - (H - dy)) < 1e-6
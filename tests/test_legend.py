@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("PIL")
+pytest.importorskip("matplotlib")
+
+from modules.infografis.assets import get_font_path  # noqa: E402
+from modules.infografis.legend import (  # noqa: E402
+    COL_GUTTER,
+    DEFAULT_SIZES,
+    layout_legend,
+    measure_text,
+)
+
+WIDTH = 4000
+
+
+def test_short_labels_use_full_width_not_four_columns():
+    font_path = get_font_path()
+    labels = [f"Kec {i:03d}" for i in range(300)]
+
+    layout = layout_legend(labels, WIDTH, font_path, max_height=1400)
+
+    assert layout["cols"] > 4
+    assert len(layout["pages"]) == 1
+    assert layout["size"] > DEFAULT_SIZES[-1]
+
+
+def test_columns_never_narrower_than_widest_label():
+    font_path = get_font_path()
+    labels = [f"Kecamatan Pesisir Utara {i}" for i in range(400)]
+
+    layout = layout_legend(labels, WIDTH, font_path, max_height=1400)
+    widest = max(measure_text(t, layout["size"], font_path)[0] for t in labels)
+
+    assert layout["col_width"] >= widest + COL_GUTTER
@@ -0,0 +1,120 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from modules.utils import (  # noqa: E402
+    parse_date_safe,
+    parse_date_series,
+    safe_float,
+    safe_float_series,
+)
+
+# Nilai batas: versi batch WAJIB identik dengan skalar
+FLOAT_EDGE_CASES = [
+    "1_000", " 1_000 ", "1_0,5", True, False, "True", "nan", "NaN", "NA",
+    "inf", "-Infinity", "-6,2", " 12.5 ", "+3", ".5", "5.", "1e3", "١٢",
+    "", " ", None, "abc", "1.2.3", "1,2,3", Decimal("3.3"), 7, 2.5,
+    float("nan"), 10**20, "12345678901234567890", "-0.000001",
+]
+
+
+def _mixed_coords(n, seed=7):
+    """Campuran format koordinat seperti data lapangan"""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        v = round(rng.uniform(-11, 141), 6)
+        r = rng.random()
+        if r < 0.50:
+            out.append(str(v))
+        elif r < 0.70:
+            out.append(str(v).replace(".", ","))
+        elif r < 0.80:
+            out.append(v)
+        elif r < 0.88:
+            out.append(Decimal(str(v)))
+        elif r < 0.94:
+            out.append(f"  {v} ")
+        elif r < 0.97:
+            out.append(None)
+        else:
+            out.append(rng.choice(["", "abc", "1.2.3", "1_000", True]))
+    return out
+
+
+def _mixed_dates(n, seed=7):
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    out = []
+    for _ in range(n):
+        d = start + timedelta(days=rng.randrange(2000))
+        r = rng.random()
+        if r < 0.70:
+            out.append(d.strftime("%Y-%m-%d"))
+        elif r < 0.80:
+            out.append(d.strftime("%d/%m/%Y"))
+        elif r < 0.85:
+            out.append(d.strftime("%d-%m-%Y"))
+        elif r < 0.88:
+            out.append(f" {d.strftime('%m/%d/%Y')} ")
+        elif r < 0.93:
+            out.append(d)
+        elif r < 0.96:
+            out.append(None)
+        else:
+            out.append(rng.choice(["", "-", "kemarin", "2024-13-45"]))
+    return out
+
+
+def _assert_same_floats(values, default):
+    scalar = np.array([safe_float(v, default) for v in values], dtype="float64")
+    batch = safe_float_series(pd.Series(values, dtype=object), default).to_numpy()
+    same = (scalar == batch) | (np.isnan(scalar) & np.isnan(batch))
+    diff = [(values[i], scalar[i], batch[i]) for i in np.flatnonzero(~same)]
+    assert not diff
+
+
+@pytest.mark.parametrize("default", [np.nan, 0.0])
+def test_safe_float_series_edge_cases_match_scalar(default):
+    _assert_same_floats(FLOAT_EDGE_CASES, default)
+
+
+def test_safe_float_series_mixed_sample_matches_scalar():
+    _assert_same_floats(_mixed_coords(20_000), np.nan)
+
+
+@pytest.mark.parametrize("default", [np.nan, 0.0])
+def test_safe_float_series_uniform_columns_match_scalar(default):
+    # Jalur cepat astype: kolom seragam seperti hasil MySQL / teks bersih
+    columns = [
+        [Decimal("-6.2"), None, Decimal("106.816666"), Decimal("NaN")],
+        ["12.5", " 3 ", "nan", "1_000", "-inf", None],
+        [1, None, 10**20, True],
+        [np.float32(0.1), 0.1, None],
+    ]
+    for values in columns:
+        _assert_same_floats(values, default)
+
+
+def test_safe_float_series_numeric_dtypes_match_scalar():
+    for values in ([1.5, float("nan"), -2.0], [1, 2, 3], [True, False]):
+        s = pd.Series(values)
+        expected = [safe_float(v, np.nan) for v in values]
+        np.testing.assert_array_equal(safe_float_series(s).to_numpy(), expected)
+
+
+def test_parse_date_series_matches_scalar():
+    values = _mixed_dates(20_000)
+    scalar = [parse_date_safe(v) for v in values]
+    batch = parse_date_series(values)
+
+    for v, s, b in zip(values, scalar, batch):
+        if s is None:
+            assert pd.isna(b), v
+        else:
+            assert pd.Timestamp(s) == b, v